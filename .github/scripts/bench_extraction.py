@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Compare latency and peak memory of the tree-based and streaming extractors.
+
+Usage:
+    python .github/scripts/bench_extraction.py                 # synthetic 5 MB pom.xml
+    python .github/scripts/bench_extraction.py --size-mb 20 --deps-last
+    python .github/scripts/bench_extraction.py path/to/pom.xml path/to/ivy.xml
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from sharedlibs.config import SHARED_LIBRARIES
+from sharedlibs.dependency_stream import stream_ivy_versions, stream_pom_versions
+
+
+def tree_pom_versions(pom_path: Path) -> Dict[str, str]:
+    """The original ET.parse + findall extraction, kept as the baseline"""
+    versions = {}
+    root = ET.parse(pom_path).getroot()
+    ns = {'m': 'http://maven.apache.org/POM/4.0.0'}
+    for dep in root.findall('.//m:dependency', ns):
+        artifact_id = dep.find('m:artifactId', ns)
+        version = dep.find('m:version', ns)
+        if artifact_id is not None and version is not None:
+            aid = artifact_id.text.strip()
+            if aid in SHARED_LIBRARIES:
+                versions[aid] = version.text.strip()
+    return versions
+
+
+def tree_ivy_versions(ivy_path: Path) -> Dict[str, str]:
+    """The original ET.parse + findall extraction for ivy.xml"""
+    versions = {}
+    root = ET.parse(ivy_path).getroot()
+    for dep in root.findall('.//dependency'):
+        name = dep.attrib.get('name')
+        rev = dep.attrib.get('rev')
+        if name in SHARED_LIBRARIES and rev:
+            versions[name] = rev
+    return versions
+
+
+def write_synthetic_pom(path: Path, size_mb: float, deps_last: bool = False) -> None:
+    """
+    Write a pom.xml with the tracked dependencies and a large <build> section.
+
+    With deps_last the <dependencies> block comes after <build>, which is the
+    worst case for the streaming extractor since it cannot stop early.
+    """
+    dependencies = ['  <dependencies>\n']
+    for i, lib in enumerate(SHARED_LIBRARIES):
+        dependencies.append(f'    <dependency><groupId>com.example</groupId>'
+                            f'<artifactId>{lib}</artifactId><version>{i}.0.0</version></dependency>\n')
+    dependencies.append('  </dependencies>\n')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<project xmlns="http://maven.apache.org/POM/4.0.0">\n')
+        f.write('  <modelVersion>4.0.0</modelVersion>\n')
+        if not deps_last:
+            f.writelines(dependencies)
+        f.write('  <build>\n    <plugins>\n')
+        target = int(size_mb * 1024 * 1024)
+        n = 0
+        while f.tell() < target:
+            f.write(f'      <plugin><groupId>org.example.plugins</groupId>'
+                    f'<artifactId>plugin-{n}</artifactId><version>1.{n}</version>'
+                    f'<configuration><skip>false</skip><arg>value-{n}</arg></configuration></plugin>\n')
+            n += 1
+        f.write('    </plugins>\n  </build>\n')
+        if deps_last:
+            f.writelines(dependencies)
+        f.write('</project>\n')
+
+
+def measure(func: Callable, path: Path, repeat: int) -> Tuple[float, int, Dict[str, str]]:
+    """Return (median seconds, peak traced bytes, result) for func(path)"""
+    timings = []
+    result = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(path)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, result
+
+
+def compare(path: Path, repeat: int) -> bool:
+    """Print a side-by-side comparison for one file; return True if results match"""
+    if path.name == 'ivy.xml' or path.name.endswith('-ivy.xml'):
+        tree_func = tree_ivy_versions
+        stream_func = lambda p: stream_ivy_versions(p, SHARED_LIBRARIES)
+    else:
+        tree_func = tree_pom_versions
+        stream_func = lambda p: stream_pom_versions(p, SHARED_LIBRARIES)
+
+    size = path.stat().st_size
+    tree_time, tree_peak, tree_result = measure(tree_func, path, repeat)
+    stream_time, stream_peak, stream_result = measure(stream_func, path, repeat)
+
+    print(f"\n📄 {path} ({size / 1024:.1f} KiB)")
+    print(f"  {'extractor':<10} {'median ms':>10} {'peak KiB':>10}")
+    print(f"  {'tree':<10} {tree_time * 1000:>10.2f} {tree_peak / 1024:>10.1f}")
+    print(f"  {'stream':<10} {stream_time * 1000:>10.2f} {stream_peak / 1024:>10.1f}")
+    if stream_time > 0 and stream_peak > 0:
+        print(f"  speedup x{tree_time / stream_time:.1f}, memory x{tree_peak / stream_peak:.1f} smaller")
+
+    if tree_result != stream_result:
+        print(f"  ❌ results differ: tree={tree_result} stream={stream_result}")
+        return False
+    print(f"  ✅ identical results ({len(stream_result)} libraries)")
+    return True
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', type=Path, help="build files to compare (default: synthetic pom.xml)")
+    parser.add_argument('--size-mb', type=float, default=5.0, help="size of the synthetic pom.xml")
+    parser.add_argument('--deps-last', action='store_true',
+                        help="put <dependencies> after <build> (no early exit possible)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per extractor")
+    args = parser.parse_args(argv)
+
+    ok = True
+    if args.files:
+        for path in args.files:
+            ok &= compare(path, args.repeat)
+        return 0 if ok else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'pom.xml'
+        write_synthetic_pom(path, args.size_mb, args.deps_last)
+        ok = compare(path, args.repeat)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memoized Maven resolver on a synthetic deep reactor.
+
+The generated tree has a chain of --depth parent POMs (properties and
+<dependencyManagement> spread across levels, a BOM imported from a local
+repository at the top) and --modules leaf modules under the deepest parent.
+Each module is resolved with one shared resolver and with a fresh resolver
+per module, which is what resolving without memoization costs.
+
+Usage:
+    python .github/scripts/bench_maven_model.py --depth 8 --modules 500
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from sharedlibs.config import SHARED_LIBRARIES
+from sharedlibs.maven_model import MavenResolver
+
+POM_HEAD = '<project xmlns="http://maven.apache.org/POM/4.0.0"><modelVersion>4.0.0</modelVersion>'
+
+
+def _dep(artifact_id: str, version: str = None, extra: str = '') -> str:
+    version_xml = f'<version>{version}</version>' if version else ''
+    return (f'<dependency><groupId>com.example</groupId><artifactId>{artifact_id}</artifactId>'
+            f'{version_xml}{extra}</dependency>')
+
+
+def write_reactor(root: Path, depth: int, modules: int) -> List[Path]:
+    """Write the local repository and reactor; return the module pom.xml paths"""
+    bom = root / 'm2' / 'com' / 'example' / 'platform-bom' / '1.0' / 'platform-bom-1.0.pom'
+    bom.parent.mkdir(parents=True)
+    managed = ''.join(_dep(lib, f'${{bom.{lib}}}') for lib in SHARED_LIBRARIES)
+    props = ''.join(f'<bom.{lib}>7.{i}.0</bom.{lib}>' for i, lib in enumerate(SHARED_LIBRARIES))
+    bom.write_text(f'{POM_HEAD}<groupId>com.example</groupId><artifactId>platform-bom</artifactId>'
+                   f'<version>1.0</version><packaging>pom</packaging><properties>{props}</properties>'
+                   f'<dependencyManagement><dependencies>{managed}</dependencies></dependencyManagement></project>')
+
+    directory = root / 'reactor'
+    for level in range(depth):
+        directory.mkdir(parents=True, exist_ok=True)
+        parent = ''
+        if level:
+            parent = (f'<parent><groupId>com.example</groupId><artifactId>parent-{level - 1}</artifactId>'
+                      f'<version>1.0</version></parent>')
+        # The root defines every <lib>.version property; each level below
+        # overrides one of them and manages another library
+        lib = SHARED_LIBRARIES[level % len(SHARED_LIBRARIES)]
+        overridden = SHARED_LIBRARIES if level == 0 else [lib]
+        body = '<properties>' + ''.join(f'<{name}.version>{level}.0.0</{name}.version>'
+                                        for name in overridden) + '</properties>'
+        management = _dep(SHARED_LIBRARIES[(level + 1) % len(SHARED_LIBRARIES)], f'${{{lib}.version}}')
+        if level == 0:
+            management += _dep('platform-bom', '1.0', '<type>pom</type><scope>import</scope>')
+        body += f'<dependencyManagement><dependencies>{management}</dependencies></dependencyManagement>'
+        (directory / 'pom.xml').write_text(
+            f'{POM_HEAD}{parent}<groupId>com.example</groupId><artifactId>parent-{level}</artifactId>'
+            f'<version>1.0</version><packaging>pom</packaging>{body}</project>')
+        directory = directory / f'level-{level + 1}'
+
+    leaf_parent = directory.parent
+    paths = []
+    for i in range(modules):
+        module_dir = leaf_parent / f'module-{i}'
+        module_dir.mkdir()
+        deps = ''.join(_dep(lib) if (i + j) % 2 else _dep(lib, f'${{{lib}.version}}')
+                       for j, lib in enumerate(SHARED_LIBRARIES))
+        path = module_dir / 'pom.xml'
+        path.write_text(f'{POM_HEAD}<parent><groupId>com.example</groupId><artifactId>parent-{depth - 1}'
+                        f'</artifactId><version>1.0</version></parent><artifactId>module-{i}</artifactId>'
+                        f'<dependencies>{deps}</dependencies></project>')
+        paths.append(path)
+    return paths
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=8, help="length of the parent POM chain")
+    parser.add_argument('--modules', type=int, default=500, help="leaf modules under the deepest parent")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        paths = write_reactor(root, args.depth, args.modules)
+        local_repo = root / 'm2'
+
+        start = time.perf_counter()
+        shared = MavenResolver(local_repository=local_repo)
+        memoized = [shared.resolve_versions(str(p), SHARED_LIBRARIES) for p in paths]
+        memo_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parsed = 0
+        fresh = []
+        for p in paths:
+            resolver = MavenResolver(local_repository=local_repo)
+            fresh.append(resolver.resolve_versions(str(p), SHARED_LIBRARIES))
+            parsed += resolver.parsed
+        fresh_time = time.perf_counter() - start
+
+    print(f"🏗️  Reactor: depth {args.depth}, {args.modules} modules")
+    print(f"  {'resolver':<12} {'total ms':>10} {'ms/module':>10} {'POMs parsed':>12}")
+    print(f"  {'memoized':<12} {memo_time * 1000:>10.1f} {memo_time * 1000 / len(paths):>10.3f} {shared.parsed:>12}")
+    print(f"  {'per-module':<12} {fresh_time * 1000:>10.1f} {fresh_time * 1000 / len(paths):>10.3f} {parsed:>12}")
+
+    unresolved = [v for versions in memoized for v in versions.values() if '${' in v]
+    complete = all(len(versions) == len(SHARED_LIBRARIES) for versions in memoized)
+    if memoized != fresh or unresolved or not complete or shared.unresolved:
+        print(f"  ❌ resolution incomplete or inconsistent (unresolved: {sorted(shared.unresolved)})")
+        return 1
+    print(f"  ✅ every module resolved all {len(SHARED_LIBRARIES)} libraries; sample: {memoized[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Throughput and result parity of the parser backends (sharedlibs/backends.py).
+
+Every available backend extracts the tracked versions from the same corpus:
+seeded synthetic pom.xml/ivy.xml files (corpus.py) plus the repository's own
+pom.xml and sample build files, or the files given on the command line. The
+best of --repeat passes is reported as files/s and MB/s, and the run fails if
+any backend's results differ from etree's.
+
+Usage:
+    python .github/scripts/bench_parsers.py
+    python .github/scripts/bench_parsers.py --files 500 --size-kb 256
+    python .github/scripts/bench_parsers.py cl-*/pom.xml cl-*/ivy.xml
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from corpus import ivy_xml, pom_xml, random_versions
+from sharedlibs.backends import BACKENDS, Backend, available_backends
+from sharedlibs.config import SHARED_LIBRARIES
+from sharedlibs.org_scan import build_file_kind
+
+ROOT = Path(__file__).resolve().parents[2]
+SAMPLES = (('pom.xml', 'maven'), ('sample-pom.xml', 'maven'), ('sample-ivy.xml', 'ivy'))
+
+Document = Tuple[str, str, bytes]  # (name, kind, content)
+
+
+def synthetic_corpus(files: int, size_kb: float, seed: int = 0) -> List[Document]:
+    """Half pom.xml, half ivy.xml; sizes vary from bare to size_kb of build noise"""
+    rng = random.Random(seed)
+    documents = []
+    for i in range(files):
+        versions = random_versions(rng)
+        size = rng.choice((0, size_kb / 4, size_kb))
+        if i % 2:
+            documents.append((f'synthetic-{i}/ivy.xml', 'ivy', ivy_xml(versions, size_kb=size).encode()))
+        else:
+            documents.append((f'synthetic-{i}/pom.xml', 'maven',
+                              pom_xml(versions, size_kb=size, nesting=rng.randint(0, 4)).encode()))
+    return documents
+
+
+def read_documents(paths: List[Path]) -> List[Document]:
+    documents = []
+    for path in paths:
+        kind = build_file_kind(str(path))
+        if kind is None:
+            print(f"⚠️  Skipping {path}: not a pom.xml or ivy.xml", file=sys.stderr)
+            continue
+        documents.append((str(path), kind, path.read_bytes()))
+    return documents
+
+
+def extract_all(backend: Backend, documents: List[Document]) -> list:
+    results = []
+    for _, kind, content in documents:
+        extract = backend.pom_versions if kind == 'maven' else backend.ivy_versions
+        results.append(extract(content, SHARED_LIBRARIES))
+    return results
+
+
+def measure(backend: Backend, documents: List[Document], repeat: int) -> Tuple[float, list]:
+    """(best seconds for one pass over documents, results of that pass)"""
+    best, results = float('inf'), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = extract_all(backend, documents)
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', type=Path, help="build files to use instead of the synthetic corpus")
+    parser.add_argument('--files', type=int, default=200, help="synthetic files to generate")
+    parser.add_argument('--size-kb', type=float, default=128, help="largest synthetic file")
+    parser.add_argument('--repeat', type=int, default=3, help="passes per backend (best is reported)")
+    args = parser.parse_args(argv)
+
+    if args.paths:
+        documents = read_documents(args.paths)
+    else:
+        documents = synthetic_corpus(args.files, args.size_kb)
+        documents += [(name, kind, (ROOT / name).read_bytes()) for name, kind in SAMPLES if (ROOT / name).exists()]
+    total = sum(len(content) for _, _, content in documents)
+    print(f"📚 {len(documents)} build files, {total / 1e6:.1f} MB")
+
+    print(f"\n  {'backend':<8} {'files/s':>10} {'MB/s':>8}")
+    backends = available_backends()
+    reference = None
+    ok = True
+    for backend in backends:
+        seconds, results = measure(backend, documents, args.repeat)
+        print(f"  {backend.name:<8} {len(documents) / seconds:>10.0f} {total / seconds / 1e6:>8.1f}")
+        if reference is None:
+            reference = (backend.name, results)
+            continue
+        for (name, _, _), expected, got in zip(documents, reference[1], results):
+            if expected != got:
+                print(f"  ❌ {backend.name} differs from {reference[0]} on {name}: {got} != {expected}")
+                ok = False
+    missing = sorted(set(BACKENDS) - {backend.name for backend in backends})
+    if missing:
+        print(f"\n  (not installed: {', '.join(missing)})")
+    print("\n✅ identical results from every backend" if ok else "\n❌ backends disagree")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Stage benchmarks for the shared library checks, with JSON baselines.
+
+A synthetic corpus (see corpus.py) is generated in a temporary directory and
+each stage the checks run is timed on it:
+
+    parse      stream_versions() over every pom.xml/ivy.xml of the org corpus
+    git_read   pipelined `git cat-file` reads of pom.xml across a bump history
+    mismatch   VersionMatrix and CompactMatrix builds plus find_mismatches() over all rows
+    render     diff, classification and PR comment/email rendering per row
+
+Each stage is sampled --repeat times. The best sample, which is the least
+disturbed by other load, is compared with the baseline's; the run fails when
+a stage is slower than baseline * (1 + --threshold).
+Baselines are only comparable on the same machine and corpus parameters; the
+committed baseline.json is a local reference, CI (benchmarks.yml) measures the
+base branch in the same job.
+
+Usage:
+    python .github/scripts/bench_suite.py --save-baseline          # record
+    python .github/scripts/bench_suite.py                          # compare
+    python .github/scripts/bench_suite.py --repos 200 --modules 4 --size-kb 32 --output result.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from corpus import write_history, write_org
+from sharedlibs.check_version_changes import (classify_changes, diff_versions, generate_email_body,
+                                              generate_notification_message)
+from sharedlibs.compare_shared_lib_versions import find_mismatches
+from sharedlibs.config import SHARED_LIBRARIES
+from sharedlibs.dependency_stream import stream_versions
+from sharedlibs.git_blobs import GitBlobReader
+from sharedlibs.org_scan import load_manifest
+from sharedlibs.version_matrix import CompactMatrix, VersionMatrix
+
+RESULT_FORMAT = 1
+DEFAULT_BASELINE = Path('.github/benchmarks/baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+
+def time_stage(fn: Callable[[], object], repeat: int, number: int = 1) -> Dict[str, float]:
+    """Median and best time per call of fn; each of the repeat samples averages number calls"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {'median_s': statistics.median(samples), 'min_s': min(samples)}
+
+
+def run_stages(args, root: Path) -> Dict[str, Dict[str, float]]:
+    manifest = write_org(root / 'org', args.repos, args.modules, args.deps, args.size_kb, args.nesting,
+                         seed=args.seed)
+    write_history(root / 'history', args.commits, args.deps, seed=args.seed)
+    tasks = load_manifest(manifest)
+
+    rows: Dict[str, Dict[str, str]] = {}
+
+    def parse():
+        rows.clear()
+        for task in tasks:
+            rows[task.row] = stream_versions(task.path, task.kind, SHARED_LIBRARIES)
+
+    refs = [f'main~{i}' for i in range(args.commits)]
+
+    def git_read():
+        with GitBlobReader(root / 'history') as reader:
+            reader.read_many((ref, 'pom.xml') for ref in refs)
+
+    def mismatch():
+        VersionMatrix.build(rows, SHARED_LIBRARIES).mismatches()
+        CompactMatrix.build(rows, SHARED_LIBRARIES).mismatches()
+        find_mismatches(rows, SHARED_LIBRARIES)
+
+    def render():
+        base = next(iter(rows.values()))
+        for versions in rows.values():
+            changes = diff_versions(versions, base)
+            if changes:
+                kinds = classify_changes(changes)
+                generate_notification_message(changes, kinds)
+                generate_email_body(changes, 'bench', 'https://example.com/pull/1', kinds)
+
+    # Millisecond stages are looped so one sample isn't dominated by timer noise
+    results = {}
+    for name, fn, number in (('parse', parse, 1), ('git_read', git_read, 1), ('mismatch', mismatch, 20),
+                             ('render', render, 20)):
+        results[name] = time_stage(fn, args.repeat, number)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: dict, threshold: float) -> List[str]:
+    """Names of stages whose best time regressed past the threshold"""
+    regressions = []
+    for name, stage in results.items():
+        base = baseline.get('stages', {}).get(name)
+        if base and stage['min_s'] > base['min_s'] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repos', type=int, default=100)
+    parser.add_argument('--modules', type=int, default=2, help="modules per maven repository")
+    parser.add_argument('--deps', type=int, default=80, help="dependencies per build file")
+    parser.add_argument('--size-kb', type=float, default=16, help="extra <build> content per pom.xml")
+    parser.add_argument('--nesting', type=int, default=3)
+    parser.add_argument('--commits', type=int, default=500, help="commits in the git history corpus")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown of a stage's best sample (0.25 = 25%%)")
+    parser.add_argument('--output', type=Path, help="also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    params = {name: getattr(args, name) for name in ('repos', 'modules', 'deps', 'size_kb', 'nesting',
+                                                     'commits', 'seed')}
+    with tempfile.TemporaryDirectory() as tmp:
+        stages = run_stages(args, Path(tmp))
+    result = {'format': RESULT_FORMAT, 'params': params, 'python': platform.python_version(),
+              'machine': platform.machine(), 'stages': stages}
+
+    baseline = None
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('format') != RESULT_FORMAT or baseline.get('params') != params:
+            print(f"⚠️  Baseline {args.baseline} was recorded with other parameters; not comparing")
+            baseline = None
+
+    print(f"📏 Stage timings ({args.repeat} samples)")
+    print(f"  {'stage':<10} {'median ms':>10} {'best ms':>10} {'baseline ms':>12} {'change':>8}")
+    for name, stage in stages.items():
+        base = baseline['stages'].get(name) if baseline else None
+        base_ms = f"{base['min_s'] * 1000:>12.2f}" if base else f"{'-':>12}"
+        change = f"{(stage['min_s'] / base['min_s'] - 1) * 100:>+7.1f}%" if base else f"{'-':>8}"
+        print(f"  {name:<10} {stage['median_s'] * 1000:>10.2f} {stage['min_s'] * 1000:>10.2f} {base_ms} {change}")
+
+    for path in filter(None, (args.output, args.baseline if args.save_baseline else None)):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {path}")
+
+    if baseline:
+        regressions = compare(stages, baseline, args.threshold)
+        if regressions:
+            print(f"❌ Regressed past {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"✅ No stage regressed past {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
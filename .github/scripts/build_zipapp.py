@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Build the sharedlibs zipapp: one file that runs every sharedlibs command.
+
+The package is copied with a __main__.py that exits with the command's
+status, and each module is precompiled next to its source (zipimport can't
+write bytecode caches, so without this every run would recompile whatever it
+imports). The bytecode is hash-based and unchecked, so zip timestamps don't
+matter; on another Python version zipimport ignores it and uses the source.
+
+Usage:
+    python .github/scripts/build_zipapp.py                        # dist/sharedlibs.pyz
+    python .github/scripts/build_zipapp.py --output /tmp/sharedlibs.pyz
+    python /tmp/sharedlibs.pyz check-changes
+"""
+
+import argparse
+import py_compile
+import shutil
+import sys
+import tempfile
+import zipapp
+from pathlib import Path
+from typing import List
+
+PACKAGE = Path(__file__).resolve().parent / 'sharedlibs'
+DEFAULT_OUTPUT = Path('dist/sharedlibs.pyz')
+
+MAIN = """import sys
+
+from sharedlibs.cli import main
+
+sys.exit(main())
+"""
+
+
+def build(output: Path, interpreter: str = '/usr/bin/env python3', compile_bytecode: bool = True) -> Path:
+    """Write the zipapp to output and return its path"""
+    with tempfile.TemporaryDirectory() as tmp:
+        staging = Path(tmp)
+        shutil.copytree(PACKAGE, staging / 'sharedlibs', ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
+        (staging / '__main__.py').write_text(MAIN, encoding='utf-8')
+        if compile_bytecode:
+            for source in staging.rglob('*.py'):
+                # Legacy location (foo.pyc beside foo.py) is the only one zipimport reads
+                py_compile.compile(str(source), cfile=str(source.with_suffix('.pyc')),
+                                   dfile=str(source.relative_to(staging)), doraise=True,
+                                   invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        zipapp.create_archive(staging, output, interpreter=interpreter, compressed=True)
+    return output
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the sharedlibs zipapp")
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument('--python', default='/usr/bin/env python3', help="interpreter for the #! line")
+    parser.add_argument('--no-compile', action='store_true', help="ship sources only")
+    args = parser.parse_args(argv)
+
+    output = build(args.output, args.python, not args.no_compile)
+    print(f"Wrote {output} ({output.stat().st_size / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
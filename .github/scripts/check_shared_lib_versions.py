@@ -1,79 +1,15 @@
-import os
-import sys
-import xml.etree.ElementTree as ET
-import subprocess
-from pathlib import Path
-
-SHARED_LIBRARIES = [
-    "Util",           # CL_Util
-    "common",         # Clpss_Common
-    "occupancy",      # Clpss_Occupancy
-    "fire-rating",    # FireRating
-    "csm",            # CSM
-    "rating",         # Clpss_RateCLPolicy
-    "compose-print"   # Clpss_ComposePrint
-]
-
-# Helper to parse Maven pom.xml
-def get_pom_lib_versions(pom_path):
-    versions = {}
-    if not Path(pom_path).exists():
-        return versions
-    tree = ET.parse(pom_path)
-    root = tree.getroot()
-    ns = {'m': 'http://maven.apache.org/POM/4.0.0'}
-    for dep in root.findall('.//m:dependency', ns):
-        artifact_id = dep.find('m:artifactId', ns)
-        version = dep.find('m:version', ns)
-        if artifact_id is not None and version is not None:
-            aid = artifact_id.text.strip()
-            if aid in SHARED_LIBRARIES:
-                versions[aid] = version.text.strip()
-    return versions
-
-# Helper to parse Ivy ivy.xml
-def get_ivy_lib_versions(ivy_path):
-    versions = {}
-    if not Path(ivy_path).exists():
-        return versions
-    tree = ET.parse(ivy_path)
-    root = tree.getroot()
-    for dep in root.findall('.//dependency'):
-        name = dep.attrib.get('name')
-        rev = dep.attrib.get('rev')
-        if name in SHARED_LIBRARIES and rev:
-            versions[name] = rev
-    return versions
+#!/usr/bin/env python3
+"""
+Entry point kept for existing workflows and docs: `sharedlibs check-versions`.
+The code lives in sharedlibs/check_shared_lib_versions.py; importing this module gives that one.
+"""
 
-def main():
-    # Repository configurations
-    repos = {
-        'cl-clpss': {'type': 'maven', 'file': 'cl-clpss/pom.xml'},
-        'cl-ccl1': {'type': 'maven', 'file': 'cl-ccl1/pom.xml'},
-        'cl-jobserver': {'type': 'ivy', 'file': 'cl-jobserver/ivy.xml'},
-        'cl-jobschedular': {'type': 'ivy', 'file': 'cl-jobschedular/ivy.xml'},
-    }
-    all_versions = {}
-    for repo, info in repos.items():
-        if info['type'] == 'maven':
-            all_versions[repo] = get_pom_lib_versions(info['file'])
-        elif info['type'] == 'ivy':
-            all_versions[repo] = get_ivy_lib_versions(info['file'])
+import sys
 
-    mismatches = []
-    for lib in SHARED_LIBRARIES:
-        lib_versions = {repo: vers.get(lib) for repo, vers in all_versions.items() if lib in vers}
-        if len(set(lib_versions.values())) > 1:
-            mismatches.append((lib, lib_versions))
+if __name__ == "__main__":
+    from sharedlibs.cli import main
+    sys.exit(main(['check-versions', *sys.argv[1:]]))
 
-    if mismatches:
-        print("LIB_VERSION_MISMATCH")
-        for lib, vers in mismatches:
-            print(f"Mismatch for {lib}:")
-            for repo, v in vers.items():
-                print(f"  {repo}: {v}")
-    else:
-        print("All shared library versions are aligned.")
+from sharedlibs import check_shared_lib_versions
 
-if __name__ == "__main__":
-    main()
+sys.modules[__name__] = check_shared_lib_versions
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Synthetic build-file corpora for benchmarks.
+
+Generates pom.xml and ivy.xml files of a chosen size, dependency count and
+element nesting, multi-module repositories, an org-wide layout with an
+org_scan manifest, and git histories of version bumps (written with
+`git fast-import`, so thousands of commits take well under a second).
+Everything is seeded, so the same arguments always give the same corpus.
+
+Usage:
+    python .github/scripts/corpus.py /tmp/corpus --repos 20 --modules 5 --deps 200 --size-kb 64
+    python .github/scripts/corpus.py /tmp/corpus --repos 4 --commits 2000
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sharedlibs.config import SHARED_LIBRARIES
+
+POM_NS = "http://maven.apache.org/POM/4.0.0"
+
+
+def random_versions(rng: random.Random, spread: int = 2) -> Dict[str, str]:
+    """One version per shared library; a small spread makes some repos disagree"""
+    return {lib: f"{i + 1}.{rng.randint(0, spread)}.{rng.randint(0, spread)}"
+            for i, lib in enumerate(SHARED_LIBRARIES)}
+
+
+def _filler(size_bytes: int, nesting: int) -> str:
+    """Plugin configuration nested `nesting` levels deep, repeated up to size_bytes"""
+    opening = ''.join(f'<level{d}>' for d in range(nesting))
+    closing = ''.join(f'</level{d}>' for d in reversed(range(nesting)))
+    block = (f'      <plugin><groupId>org.example.plugins</groupId><artifactId>plugin-{{i}}</artifactId>'
+             f'<configuration>{opening}<value>{"x" * 48}</value>{closing}</configuration></plugin>\n')
+    out = []
+    written = 0
+    i = 0
+    while written < size_bytes:
+        chunk = block.format(i=i)
+        out.append(chunk)
+        written += len(chunk)
+        i += 1
+    return ''.join(out)
+
+
+def pom_xml(versions: Dict[str, str], deps: int = 50, size_kb: float = 0, nesting: int = 0,
+            modules: Optional[List[str]] = None, artifact_id: str = 'app') -> str:
+    """A pom.xml declaring the shared libraries among `deps` dependencies"""
+    lines = [f'<project xmlns="{POM_NS}">\n  <modelVersion>4.0.0</modelVersion>\n',
+             f'  <groupId>com.example</groupId>\n  <artifactId>{artifact_id}</artifactId>\n'
+             f'  <version>1.0.0</version>\n']
+    if modules:
+        lines.append('  <packaging>pom</packaging>\n  <modules>\n')
+        lines.extend(f'    <module>{m}</module>\n' for m in modules)
+        lines.append('  </modules>\n')
+    lines.append('  <dependencies>\n')
+    others = max(0, deps - len(versions))
+    for i in range(others):
+        lines.append(f'    <dependency><groupId>org.thirdparty</groupId><artifactId>lib-{i}</artifactId>'
+                     f'<version>{i % 9}.{i % 7}.{i % 5}</version></dependency>\n')
+    for lib, version in versions.items():
+        lines.append(f'    <dependency>\n      <groupId>com.example</groupId>\n      <artifactId>{lib}</artifactId>\n'
+                     f'      <version>{version}</version>\n    </dependency>\n')
+    lines.append('  </dependencies>\n')
+    if size_kb:
+        lines.append(f'  <build>\n    <plugins>\n{_filler(int(size_kb * 1024), nesting)}    </plugins>\n  </build>\n')
+    lines.append('</project>\n')
+    return ''.join(lines)
+
+
+def ivy_xml(versions: Dict[str, str], deps: int = 50, size_kb: float = 0) -> str:
+    """An ivy.xml declaring the shared libraries among `deps` dependencies"""
+    lines = ['<ivy-module version="2.0">\n  <info organisation="com.example" module="app"/>\n']
+    if size_kb:
+        lines.append('  <configurations>\n')
+        line = '    <conf name="conf-{i}" description="' + 'x' * 64 + '"/>\n'
+        i = 0
+        written = 0
+        while written < size_kb * 1024:
+            chunk = line.format(i=i)
+            lines.append(chunk)
+            written += len(chunk)
+            i += 1
+        lines.append('  </configurations>\n')
+    lines.append('  <dependencies>\n')
+    for i in range(max(0, deps - len(versions))):
+        lines.append(f'    <dependency org="org.thirdparty" name="lib-{i}" rev="{i % 9}.{i % 7}"/>\n')
+    for lib, version in versions.items():
+        lines.append(f'    <dependency org="com.example" name="{lib}" rev="{version}"/>\n')
+    lines.append('  </dependencies>\n</ivy-module>\n')
+    return ''.join(lines)
+
+
+def write_repo(root: Path, kind: str, versions: Dict[str, str], modules: int = 0, deps: int = 50,
+               size_kb: float = 0, nesting: int = 0) -> List[str]:
+    """Write one repository (a multi-module reactor for maven); return its build file paths"""
+    root.mkdir(parents=True, exist_ok=True)
+    if kind == 'ivy':
+        (root / 'ivy.xml').write_text(ivy_xml(versions, deps, size_kb), encoding='utf-8')
+        return ['ivy.xml']
+    names = [f'module-{i}' for i in range(modules)]
+    (root / 'pom.xml').write_text(pom_xml(versions, deps, size_kb, nesting, names, root.name), encoding='utf-8')
+    files = ['pom.xml']
+    for name in names:
+        (root / name).mkdir(exist_ok=True)
+        (root / name / 'pom.xml').write_text(pom_xml(versions, deps, size_kb, nesting, artifact_id=name),
+                                             encoding='utf-8')
+        files.append(f'{name}/pom.xml')
+    return files
+
+
+def write_org(root: Path, repos: int, modules: int = 0, deps: int = 50, size_kb: float = 0,
+              nesting: int = 0, ivy_share: float = 0.3, seed: int = 0) -> Path:
+    """Write `repos` repositories and an org_scan manifest; return the manifest path"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(repos):
+        kind = 'ivy' if rng.random() < ivy_share else 'maven'
+        name = f'repo-{i:04d}'
+        files = write_repo(root / name, kind, random_versions(rng), modules, deps, size_kb, nesting)
+        entries.append({'name': name, 'root': name, 'files': files})
+    manifest = root / 'manifest.json'
+    manifest.write_text(json.dumps({'repos': entries}, indent=1), encoding='utf-8')
+    return manifest
+
+
+def write_history(repo: Path, commits: int, deps: int = 50, bump_rate: float = 0.3, seed: int = 0,
+                  start_time: int = 1_600_000_000) -> None:
+    """
+    Create a git repository whose pom.xml has `commits` revisions; about
+    bump_rate of them bump one shared library, the rest touch other lines.
+    """
+    rng = random.Random(seed)
+    repo.mkdir(parents=True, exist_ok=True)
+    subprocess.run(['git', 'init', '-q', '-b', 'main', str(repo)], check=True)
+    versions = {lib: f"{i + 1}.0.0" for i, lib in enumerate(SHARED_LIBRARIES)}
+    proc = subprocess.Popen(['git', '-C', str(repo), 'fast-import', '--quiet'], stdin=subprocess.PIPE)
+    timestamp = start_time
+    for n in range(commits):
+        if rng.random() < bump_rate:
+            lib = rng.choice(SHARED_LIBRARIES)
+            major, minor, patch = (int(p) for p in versions[lib].split('.'))
+            versions[lib] = f"{major}.{minor}.{patch + 1}" if rng.random() < 0.8 else f"{major}.{minor + 1}.0"
+        data = pom_xml(versions, deps + n % 3).encode('utf-8')
+        timestamp += rng.randint(600, 86_400)
+        proc.stdin.write(f"commit refs/heads/main\ncommitter Bench <bench@example.com> {timestamp} +0000\n"
+                         f"data 9\nrevision\nM 644 inline pom.xml\ndata {len(data)}\n".encode() + data + b"\n")
+    proc.stdin.close()
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, 'git fast-import')
+    subprocess.run(['git', '-C', str(repo), 'checkout', '-q', '-f', 'main'], check=True)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic build-file corpus")
+    parser.add_argument('output', type=Path, help="directory to create")
+    parser.add_argument('--repos', type=int, default=20)
+    parser.add_argument('--modules', type=int, default=0, help="modules per maven repository")
+    parser.add_argument('--deps', type=int, default=50, help="dependencies per build file")
+    parser.add_argument('--size-kb', type=float, default=0, help="extra <build> content per pom.xml")
+    parser.add_argument('--nesting', type=int, default=0, help="element depth of the extra content")
+    parser.add_argument('--commits', type=int, default=0, help="also write a history repo with this many commits")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    manifest = write_org(args.output, args.repos, args.modules, args.deps, args.size_kb, args.nesting,
+                         seed=args.seed)
+    print(f"Wrote {args.repos} repositories, manifest {manifest}")
+    if args.commits:
+        write_history(args.output / 'history', args.commits, args.deps, seed=args.seed)
+        print(f"Wrote {args.commits} commits to {args.output / 'history'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,8 @@ import shutil
 from pathlib import Path
 import xml.etree.ElementTree as ET
 
+from sharedlibs.rewriter import rewrite_file
+
 def create_demo_scenario():
     """Create a demo scenario with version changes"""
     
@@ -39,20 +41,13 @@ def create_demo_scenario():
     print("   Changing 'common' from 3.0.5 to 3.1.0")
     print("   Changing 'fire-rating' from 4.2.0 to 4.3.0")
     
-    # Create modified version
-    for dep in dependencies:
-        artifact_id = dep.find('m:artifactId', ns)
-        version = dep.find('m:version', ns)
-        if artifact_id is not None and version is not None:
-            if artifact_id.text == 'common':
-                version.text = '3.1.0'
-            elif artifact_id.text == 'fire-rating':
-                version.text = '4.3.0'
-    
-    # Save modified pom.xml to temporary file
-    temp_pom = tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False)
-    tree.write(temp_pom.name, encoding='utf-8', xml_declaration=True)
+    # Create modified version in a copy, changing only the version tokens
+    temp_pom = tempfile.NamedTemporaryFile(suffix='.xml', delete=False)
     temp_pom.close()
+    shutil.copyfile(pom_path, temp_pom.name)
+    result = rewrite_file(temp_pom.name, 'maven', {'common': '3.1.0', 'fire-rating': '4.3.0'})
+    for edit, line in zip(result.edits, result.lines):
+        print(f"   line {line}: {edit.slot.library} {edit.slot.value} → {edit.new}")
     
     print(f"\n📝 Modified pom.xml saved to: {temp_pom.name}")
     
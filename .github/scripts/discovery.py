@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Entry point kept for existing workflows and docs: `sharedlibs discover`.
+The code lives in sharedlibs/discovery.py; importing this module gives that one.
+"""
+
+import sys
+
+if __name__ == "__main__":
+    from sharedlibs.cli import main
+    sys.exit(main(['discover', *sys.argv[1:]]))
+
+from sharedlibs import discovery
+
+sys.modules[__name__] = discovery
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Entry point kept for existing workflows and docs: `sharedlibs serve`.
+The code lives in sharedlibs/event_server.py; importing this module gives that one.
+"""
+
+import sys
+
+if __name__ == "__main__":
+    from sharedlibs.cli import main
+    sys.exit(main(['serve', *sys.argv[1:]]))
+
+from sharedlibs import event_server
+
+sys.modules[__name__] = event_server
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Entry point kept for existing workflows and docs: `sharedlibs notify`.
+The code lives in sharedlibs/notifier.py; importing this module gives that one.
+"""
+
+import sys
+
+if __name__ == "__main__":
+    from sharedlibs.cli import main
+    sys.exit(main(['notify', *sys.argv[1:]]))
+
+from sharedlibs import notifier
+
+sys.modules[__name__] = notifier
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Entry point kept for existing workflows and docs: `sharedlibs title-check`.
+The code lives in sharedlibs/pr_title_check.py; importing this module gives that one.
+"""
+
+import sys
+
+if __name__ == "__main__":
+    from sharedlibs.cli import main
+    sys.exit(main(['title-check', *sys.argv[1:]]))
+
+from sharedlibs import pr_title_check
+
+sys.modules[__name__] = pr_title_check
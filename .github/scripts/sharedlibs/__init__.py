@@ -0,0 +1,9 @@
+"""
+Shared library version checks for the cl-clpss repositories.
+
+Run `python -m sharedlibs <command>` (or the sharedlibs.pyz zipapp); see
+sharedlibs.cli for the commands. Submodules are imported only by the command
+that needs them, so importing the package itself costs nothing.
+"""
+
+__version__ = '1.0.0'
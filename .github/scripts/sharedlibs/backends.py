@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Interchangeable XML parser backends for version extraction.
+
+Every backend extracts the same {library: version} maps with the same rules
+as dependency_stream (first declaration wins, early exit once every tracked
+library is found, names resolved through identity.py); only the parser
+underneath differs:
+
+    etree   ElementTree iterparse, the element tree pruned as it goes
+            (dependency_stream.py)
+    expat   expat SAX callbacks; no element objects are created at all, only
+            the text of the <dependency> children being read is kept
+    lxml    lxml's libxml2 iterparse with the etree rules, when lxml is
+            installed
+
+Malformed XML raises xml.etree.ElementTree.ParseError whichever backend is
+used, so callers keep catching ET.ParseError.
+
+SHAREDLIBS_PARSER selects the backend: 'auto' (the default) takes lxml when
+it can be imported and falls back to expat. On typical build files expat
+does about 1.6x the files/s of etree, since nothing is allocated per element
+and no tree has to be set up or pruned; on multi-MB files read to the end the
+two are even (bench_parsers.py prints files/s and MB/s of each). Naming an
+unavailable backend falls back the same way, with a warning.
+"""
+
+import os
+import sys
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from xml.parsers import expat
+
+from .dependency_stream import (POM_NS, Source, _open_source, merge_managed, stream_ivy_versions,
+                                stream_pom_versions)
+from .identity import identity_index
+
+Extractor = Callable[[Source, Iterable[str]], Dict[str, str]]
+
+AUTO_ORDER = ('lxml', 'expat')
+
+
+class Backend(NamedTuple):
+    name: str
+    pom_versions: Extractor
+    ivy_versions: Extractor
+
+
+# expat reports a namespaced name as 'uri}local' with this separator
+_NS = POM_NS[1:]
+_DEPENDENCIES = frozenset(('dependencies', _NS + 'dependencies'))
+_DEPENDENCY = frozenset(('dependency', _NS + 'dependency'))
+_DEPENDENCY_MANAGEMENT = frozenset(('dependencyManagement', _NS + 'dependencyManagement'))
+_FIELDS = {'groupId': 0, _NS + 'groupId': 0, 'artifactId': 1, _NS + 'artifactId': 1,
+           'version': 2, _NS + 'version': 2}
+
+
+class _Done(Exception):
+    """Raised from a handler to stop expat once every tracked library is found"""
+
+
+def _parse_error(e: expat.ExpatError) -> ET.ParseError:
+    """The ET.ParseError ElementTree raises for the same document"""
+    error = ET.ParseError(f"{expat.ErrorString(e.code)}: line {e.lineno}, column {e.offset}")
+    error.code = e.code
+    error.position = (e.lineno, e.offset)
+    return error
+
+
+def _run_expat(source: Source, parser) -> None:
+    with _open_source(source) as f:
+        try:
+            parser.ParseFile(f)
+        except _Done:
+            pass
+        except expat.ExpatError as e:
+            raise _parse_error(e) from None
+
+
+def expat_pom_versions(source: Source, tracked: Iterable[str]) -> Dict[str, str]:
+    """
+    stream_pom_versions() on expat callbacks. A <dependency> is read when it
+    closes while the last <dependency> opened had a <dependencies> parent,
+    from the text of its groupId/artifactId/version children up to their
+    first nested element, as ElementTree's child.text would give.
+    """
+    wanted = set(tracked)
+    versions: Dict[str, str] = {}
+    if not wanted:
+        return versions
+    resolve = identity_index().resolve
+    managed_versions: Dict[str, str] = {}
+
+    parser = expat.ParserCreate(namespace_separator='}')
+    parser.buffer_text = True
+    stack: List[str] = []
+    frames: List[list] = []  # one [depth, groupId, artifactId, version] per open <dependency>
+    field: Optional[int] = None  # index in frames[-1] of the child being read
+    chunks: List[str] = []
+    reading = False
+    in_dependency = managed = False
+
+    def start(tag, attrs):
+        nonlocal field, chunks, reading, in_dependency, managed
+        depth = len(stack)
+        reading = False
+        if tag in _DEPENDENCY:
+            if depth and stack[-1] in _DEPENDENCIES:
+                in_dependency = True
+                managed = not _DEPENDENCY_MANAGEMENT.isdisjoint(stack)
+            frames.append([depth, None, None, None])
+        elif frames and depth == frames[-1][0] + 1 and tag in _FIELDS:
+            field, chunks, reading = _FIELDS[tag] + 1, [], True
+        stack.append(tag)
+
+    def text(data):
+        if reading:
+            chunks.append(data)
+
+    def end(tag):
+        nonlocal field, reading, in_dependency
+        stack.pop()
+        reading = False
+        if field is not None and frames and len(stack) == frames[-1][0] + 1:
+            # Later children overwrite earlier ones, as in the etree loop
+            frames[-1][field] = ''.join(chunks) or None
+            field = None
+        if tag not in _DEPENDENCY:
+            return
+        _, group_id, artifact_id, version = frames.pop()
+        if not in_dependency:
+            return
+        in_dependency = False
+        if artifact_id and version:
+            aid = artifact_id.strip()
+            lib = resolve(aid, group_id) or aid
+            found = managed_versions if managed else versions
+            if lib in wanted and lib not in found:
+                found[lib] = version.strip()
+                if len(versions) == len(wanted):
+                    raise _Done
+
+    parser.StartElementHandler = start
+    parser.CharacterDataHandler = text
+    parser.EndElementHandler = end
+    _run_expat(source, parser)
+    return merge_managed(versions, managed_versions)
+
+
+def expat_ivy_versions(source: Source, tracked: Iterable[str]) -> Dict[str, str]:
+    """stream_ivy_versions() on expat callbacks: only start tags are looked at"""
+    wanted = set(tracked)
+    versions: Dict[str, str] = {}
+    if not wanted:
+        return versions
+    resolve = identity_index().resolve
+
+    parser = expat.ParserCreate(namespace_separator='}')
+
+    def start(tag, attrs):
+        if tag == 'dependency':
+            name = attrs.get('name')
+            rev = attrs.get('rev')
+            lib = resolve(name, attrs.get('org')) or name
+            if lib in wanted and rev and lib not in versions:
+                versions[lib] = rev
+                if len(versions) == len(wanted):
+                    raise _Done
+
+    parser.StartElementHandler = start
+    _run_expat(source, parser)
+    return versions
+
+
+def _lxml_backend() -> Backend:
+    """The etree rules on lxml.etree.iterparse; raises ImportError without lxml"""
+    from lxml import etree
+
+    def iterparse(f, events):
+        try:
+            yield from etree.iterparse(f, events=events)
+        except etree.XMLSyntaxError as e:
+            error = ET.ParseError(str(e))
+            error.code = e.code
+            error.position = e.position
+            raise error from None
+
+    return Backend('lxml', lambda source, tracked: stream_pom_versions(source, tracked, iterparse),
+                   lambda source, tracked: stream_ivy_versions(source, tracked, iterparse))
+
+
+BACKENDS: Dict[str, Callable[[], Backend]] = {
+    'etree': lambda: Backend('etree', stream_pom_versions, stream_ivy_versions),
+    'expat': lambda: Backend('expat', expat_pom_versions, expat_ivy_versions),
+    'lxml': _lxml_backend,
+}
+
+
+def load_backend(name: str) -> Backend:
+    """The named backend; ImportError if its parser isn't installed, KeyError if unknown"""
+    return BACKENDS[name]()
+
+
+def available_backends() -> List[Backend]:
+    """Every backend that can run in this environment"""
+    backends = []
+    for name in BACKENDS:
+        try:
+            backends.append(load_backend(name))
+        except ImportError:
+            pass
+    return backends
+
+
+@lru_cache(maxsize=None)
+def select_backend(name: Optional[str] = None) -> Backend:
+    """
+    The backend named (default: $SHAREDLIBS_PARSER, else 'auto'); an unknown or
+    unavailable one falls back to the first available of AUTO_ORDER
+    """
+    name = (name or os.environ.get('SHAREDLIBS_PARSER') or 'auto').strip().lower()
+    if name != 'auto':
+        try:
+            return load_backend(name)
+        except (ImportError, KeyError) as e:
+            reason = "unknown" if isinstance(e, KeyError) else f"unavailable ({e})"
+            print(f"⚠️  Parser backend {name!r} is {reason}; using the default", file=sys.stderr)
+    for candidate in AUTO_ORDER:
+        try:
+            return load_backend(candidate)
+        except ImportError:
+            continue
+    return load_backend('etree')
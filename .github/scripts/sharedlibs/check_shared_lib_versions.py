@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from .compare_shared_lib_versions import (add_scan_arguments, find_mismatches, print_mismatch_report,
+                                          resolve_dynamic_versions)
+from .config import SHARED_LIBRARIES
+from .parse_cache import cached_versions, report_cache_stats
+from .repo_index import add_resolve_argument
+from .spans import add_profile_argument, emit, profiled, span
+
+# Helper to parse Maven pom.xml
+def get_pom_lib_versions(pom_path):
+    versions = {}
+    if not Path(pom_path).exists():
+        return versions
+    return cached_versions(pom_path, 'maven', SHARED_LIBRARIES)
+
+# Helper to parse Ivy ivy.xml
+def get_ivy_lib_versions(ivy_path):
+    versions = {}
+    if not Path(ivy_path).exists():
+        return versions
+    return cached_versions(ivy_path, 'ivy', SHARED_LIBRARIES)
+
+def check(args):
+    """Run the check selected by the parsed command line"""
+    if args.manifest:
+        from .org_scan import scan_manifest
+
+        with span('scan'):
+            all_versions = scan_manifest(args.manifest, SHARED_LIBRARIES, workers=args.workers, executor=args.executor)
+        if args.resolve:
+            resolve_dynamic_versions(all_versions)
+        with span('mismatches'):
+            mismatches = find_mismatches(all_versions, SHARED_LIBRARIES)
+        print_mismatch_report(mismatches)
+        return
+
+    # Repository configurations
+    repos = {
+        'cl-clpss': {'type': 'maven', 'file': 'cl-clpss/pom.xml'},
+        'cl-ccl1': {'type': 'maven', 'file': 'cl-ccl1/pom.xml'},
+        'cl-jobserver': {'type': 'ivy', 'file': 'cl-jobserver/ivy.xml'},
+        'cl-jobschedular': {'type': 'ivy', 'file': 'cl-jobschedular/ivy.xml'},
+    }
+    all_versions = {}
+    with span('read versions'):
+        for repo, info in repos.items():
+            if info['type'] == 'maven':
+                all_versions[repo] = get_pom_lib_versions(info['file'])
+            elif info['type'] == 'ivy':
+                all_versions[repo] = get_ivy_lib_versions(info['file'])
+    report_cache_stats()
+    if args.resolve:
+        resolve_dynamic_versions(all_versions)
+
+    with span('mismatches'):
+        mismatches = []
+        for lib in SHARED_LIBRARIES:
+            lib_versions = {repo: vers.get(lib) for repo, vers in all_versions.items() if lib in vers}
+            if len(set(lib_versions.values())) > 1:
+                mismatches.append((lib, lib_versions))
+
+    if mismatches:
+        print("LIB_VERSION_MISMATCH")
+        for lib, vers in mismatches:
+            print(f"Mismatch for {lib}:")
+            for repo, v in vers.items():
+                print(f"  {repo}: {v}")
+    else:
+        print("All shared library versions are aligned.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check shared library versions across repositories")
+    add_scan_arguments(parser)
+    add_resolve_argument(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+
+    with profiled(args.profile):
+        check(args)
+    emit("Shared library version check timings")
+
+if __name__ == "__main__":
+    main()
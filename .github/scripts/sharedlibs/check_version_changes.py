@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Script to check for shared library version changes in PR and send notifications.
+This script is designed to run in GitHub Actions CI/CD pipeline.
+"""
+
+import argparse
+import os
+import sys
+import time
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional, Union
+
+from .config import SHARED_LIBRARIES
+from .diff_hunks import dependency_lines, pom_diff_report
+from .email_config import ESCALATION_EMAILS
+from .impact_index import Target
+from .maven_model import FileLoader, GitLoader, MavenResolver, default_local_repository, needs_resolution
+from .messages import (_target_rows, _targets_for, classify_changes, escalated_libraries, find_update_targets,
+                       generate_email_body, generate_notification_message, get_pr_info)
+from .parse_cache import cached_versions, report_cache_stats
+from .report_writer import add_format_arguments, structured_output
+from .spans import add_profile_argument, emit, profiled, record_file, span
+from .versioning import library_display_name, needs_escalation
+
+def get_pom_versions(pom_path: Union[Path, bytes], sha: Optional[str] = None) -> Dict[str, str]:
+    """
+    Parse Maven pom.xml (a path or raw blob bytes) for dependency versions,
+    consulting the parse cache first
+    """
+    versions = {}
+    if isinstance(pom_path, Path) and not pom_path.exists():
+        return versions
+    
+    try:
+        versions = cached_versions(pom_path, 'maven', SHARED_LIBRARIES, sha=sha)
+    except ET.ParseError as e:
+        name = pom_path if isinstance(pom_path, Path) else 'pom.xml blob'
+        print(f"Error parsing {name}: {e}")
+    
+    return versions
+
+def get_effective_pom_versions(resolver: MavenResolver, location: str, data: bytes,
+                               sha: Optional[str] = None) -> Dict[str, str]:
+    """
+    Effective dependency versions of a POM: the literal (cached) extraction
+    unless it has a parent, ${...} placeholders or BOM imports, in which case
+    the Maven model is resolved offline through resolver
+    """
+    if not needs_resolution(data):
+        return get_pom_versions(data, sha=sha)
+    
+    start = time.perf_counter()
+    try:
+        versions = resolver.resolve_versions(location, SHARED_LIBRARIES)
+    except ET.ParseError as e:
+        print(f"Error parsing {location}: {e}")
+        return {}
+    record_file(f"{location} (effective model)", time.perf_counter() - start)
+    if resolver.unresolved:
+        print(f"Could not resolve: {', '.join(sorted(resolver.unresolved))}")
+    return versions
+
+def diff_versions(current_versions: Dict[str, str], base_versions: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """(library_name, old_version, new_version) for every tracked library that differs"""
+    changed_libs = []
+    for lib in SHARED_LIBRARIES:
+        current_ver = current_versions.get(lib)
+        base_ver = base_versions.get(lib)
+        
+        if current_ver and base_ver and current_ver != base_ver:
+            changed_libs.append((lib, base_ver, current_ver))
+        elif current_ver and not base_ver:
+            changed_libs.append((lib, "NOT_FOUND", current_ver))
+        elif not current_ver and base_ver:
+            changed_libs.append((lib, base_ver, "REMOVED"))
+    
+    return changed_libs
+
+def get_changed_libraries() -> List[Tuple[str, str, str]]:
+    """
+    Compare current branch with base branch to find changed shared libraries.
+    Returns list of (library_name, old_version, new_version) tuples.
+    """
+    # git is only needed here, not by the renderers other commands import
+    import subprocess
+    from .git_blobs import GitBlobReader
+
+    changed_libs = []
+    
+    pom_path = Path('pom.xml')
+    current_data = pom_path.read_bytes() if pom_path.exists() else None
+    local_repo = default_local_repository()
+    
+    # Get base branch versions straight from the object database so the
+    # worktree (and any uncommitted edit to pom.xml) is never touched
+    base_ref = os.environ.get('GITHUB_BASE_REF', 'main')
+    base_spec = f'origin/{base_ref}'
+    try:
+        with GitBlobReader() as reader:
+            with span('git read'):
+                base_pom = reader.read_blob(base_spec, 'pom.xml')
+            if base_pom is None:
+                print(f"Git operation failed: pom.xml not found at {base_spec}")
+                return changed_libs
+            
+            current_versions = None
+            # Fast path: nothing to parse if no changed line can affect a tracked version
+            if current_data is not None and os.environ.get('SHAREDLIBS_DIFF_FAST_PATH', '1') != '0':
+                with span('diff hunks'):
+                    report = pom_diff_report(base_spec, base_pom.data, current_data, SHARED_LIBRARIES)
+                if report is not None and not report.relevant:
+                    if not needs_resolution(current_data):
+                        print("No tracked dependency, property or parent lines changed in pom.xml; "
+                              "skipping XML parsing", file=sys.stderr)
+                        return changed_libs
+                    # A parent or BOM elsewhere in the repo may still have changed
+                    current_resolver = MavenResolver(FileLoader(), local_repo)
+                    with span('current versions'):
+                        current_versions = get_effective_pom_versions(current_resolver, str(pom_path), current_data)
+                    changed_files = changed_model_files(reader, base_spec, current_resolver, str(pom_path))
+                    if not changed_files:
+                        print("No tracked dependency, property or parent lines changed in pom.xml or the POMs "
+                              "it inherits from; skipping the base branch", file=sys.stderr)
+                        return changed_libs
+                    print(f"pom.xml unchanged where it matters, but {', '.join(changed_files)} changed",
+                          file=sys.stderr)
+            
+            if current_versions is None:
+                current_versions = {}
+                with span('current versions'):
+                    if current_data is not None:
+                        current_versions = get_effective_pom_versions(
+                            MavenResolver(FileLoader(), local_repo), str(pom_path), current_data)
+            
+            with span('base versions'):
+                base_resolver = MavenResolver(GitLoader(reader, base_spec), local_repo)
+                base_versions = get_effective_pom_versions(base_resolver, 'pom.xml', base_pom.data,
+                                                           sha=base_pom.sha)
+        
+        with span('compare'):
+            changed_libs = diff_versions(current_versions, base_versions)
+                
+    except subprocess.CalledProcessError as e:
+        print(f"Git operation failed: {e}")
+    
+    return changed_libs
+
+def changed_model_files(reader, base_spec: str, resolver: MavenResolver, pom_location: str) -> List[str]:
+    """
+    Repository files other than pom_location that resolver read (parents
+    through <relativePath>, BOMs among the modules) and that differ from
+    base_spec; files outside the repository can't be part of the PR
+    """
+    changed = []
+    for location in resolver.loaded_locations():
+        relative = Path(location).as_posix()
+        if location == pom_location or relative.startswith('../') or os.path.isabs(location):
+            continue
+        base = reader.read(base_spec, relative)
+        if base != resolver.loader.read(location):
+            changed.append(relative)
+    return changed
+
+def generate_annotations(changed_libs: List[Tuple[str, str, str]], kinds: Dict[str, str],
+                         targets: Optional[List[Target]] = None, pom_path: Path = Path('pom.xml')) -> List[str]:
+    """
+    GitHub workflow commands annotating each changed library on its
+    <dependency> lines in the PR diff (warnings for escalated changes), naming
+    the rows that consume it (targets from find_update_targets)
+    """
+    text = pom_path.read_text(encoding='utf-8', errors='replace') if pom_path.exists() else ''
+    lines = dependency_lines(text, [lib for lib, _, _ in changed_libs])
+    targets = _targets_for(changed_libs, targets)
+    commands = []
+    for lib, old_ver, new_ver in changed_libs:
+        level = 'warning' if needs_escalation(lib, kinds[lib]) else 'notice'
+        location = f"file={pom_path.as_posix()}"
+        if lib in lines:
+            location += f",line={lines[lib][0]},endLine={lines[lib][1]}"
+        # Property values in workflow commands can't contain raw ',' or ':'
+        title = f"Shared library {library_display_name(lib)} changed ({kinds[lib]})"
+        title = title.replace('%', '%25').replace(',', '%2C').replace(':', '%3A')
+        rows = _target_rows(lib, targets)
+        follow = f" Align {', '.join(rows)}." if rows else " No other repository consumes it."
+        commands.append(f"::{level} {location},title={title}::{lib}: {old_ver} → {new_ver}.{follow}")
+    return commands
+
+def write_change_records(report, changed_libs: List[Tuple[str, str, str]], kinds: Dict[str, str],
+                         targets: Optional[List[Target]], pom_path: Path = Path('pom.xml')) -> None:
+    """Stream one change record per changed library, located on its <dependency> lines"""
+    text = pom_path.read_text(encoding='utf-8', errors='replace') if pom_path.exists() else ''
+    lines = dependency_lines(text, [lib for lib, _, _ in changed_libs])
+    targets = _targets_for(changed_libs, targets)
+    for lib, old_ver, new_ver in changed_libs:
+        rows = _target_rows(lib, targets)
+        report.change(lib, old_ver, new_ver, kinds[lib], needs_escalation(lib, kinds[lib]),
+                      pom_path.as_posix(), lines[lib][0] if lib in lines else None, rows)
+
+def check_changes(report=None) -> int:
+    """
+    Check for changes and output results; 1 when shared libraries changed.
+    With a report writer, change records are written besides the text output.
+    """
+    with span('detect changes'):
+        changed_libs = get_changed_libraries()
+    report_cache_stats()
+    
+    if not changed_libs:
+        print("No shared library version changes detected.")
+        if report is not None:
+            report.close(changes=0, escalated=0)
+        return 0
+    
+    print("LIB_VERSION_CHANGED")
+    print(f"Found {len(changed_libs)} changed libraries:")
+    
+    with span('classify'):
+        kinds = classify_changes(changed_libs)
+    for lib, old_ver, new_ver in changed_libs:
+        print(f"  {lib}: {old_ver} → {new_ver} ({kinds[lib]})")
+    
+    with span('impact'):
+        targets = find_update_targets(changed_libs)
+    for command in generate_annotations(changed_libs, kinds, targets):
+        print(command)
+    if report is not None:
+        with span('write records'):
+            write_change_records(report, changed_libs, kinds, targets)
+            report.close(changes=len(changed_libs), escalated=len(escalated_libraries(kinds)))
+    
+    # Generate notification content
+    pr_author, pr_url = get_pr_info()
+    with span('render'):
+        notification_message = generate_notification_message(changed_libs, kinds, targets)
+        email_body = generate_email_body(changed_libs, pr_author, pr_url, kinds, targets)
+        escalated = escalated_libraries(kinds)
+    
+    # Output for GitHub Actions
+    print(f"\n--- PR Comment ---")
+    print(notification_message)
+    
+    print(f"\n--- Email Body ---")
+    print(email_body)
+    
+    # Set GitHub Actions outputs
+    if 'GITHUB_OUTPUT' in os.environ:
+        with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+            f.write(f"pr_comment<<EOF\n{notification_message}\nEOF\n")
+            f.write(f"email_body<<EOF\n{email_body}\nEOF\n")
+            f.write(f"changes={json.dumps(changed_libs)}\n")
+            f.write(f"change_kinds={json.dumps(kinds)}\n")
+            if targets is not None:
+                f.write(f"update_targets={json.dumps([t.row for t in targets])}\n")
+            f.write(f"escalate={'true' if escalated else 'false'}\n")
+            f.write(f"escalation_emails={','.join(ESCALATION_EMAILS) if escalated else ''}\n")
+    
+    return 1  # Return 1 to indicate changes were found
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main function: run the check (optionally profiled) and emit stage timings"""
+    parser = argparse.ArgumentParser(description="Check for shared library version changes in a PR")
+    add_format_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    
+    with profiled(args.profile), structured_output(args.format, args.output) as report:
+        status = check_changes(report)
+    emit("Shared library change check timings")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
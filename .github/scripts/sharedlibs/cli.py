@@ -0,0 +1,59 @@
+"""
+Command-line entry point: `sharedlibs <command> [options]`.
+
+Each command maps to the main() of one module, which is imported only when
+that command runs; `sharedlibs --help` and an unknown command import nothing
+beyond this file. The old .github/scripts/*.py entry points forward here, and
+the LIB_VERSION_CHANGED / LIB_VERSION_MISMATCH lines the workflows grep for
+are printed by the same code as before.
+"""
+
+import importlib
+import sys
+from typing import List, Optional
+
+from . import __version__
+
+# command: (module, summary)
+COMMANDS = {
+    'check-changes': ('check_version_changes', "shared library changes between this PR and its base branch"),
+    'compare': ('compare_shared_lib_versions', "version mismatches across repositories or an org manifest"),
+    'check-versions': ('check_shared_lib_versions', "mismatch report of the four cl-* checkouts"),
+    'history': ('version_history', "version timelines and misaligned periods from git history"),
+    'notify': ('notifier', "email and Teams notifications for a list of changes"),
+    'serve': ('event_server', "warm server for pull request events"),
+    'title-check': ('pr_title_check', "PR title format and Jira ticket check"),
+    'align': ('rewriter', "rewrite build files to target versions, changing only the version tokens"),
+    'repo-index': ('repo_index', "index the local Maven repository and Ivy cache for resolving dynamic versions"),
+    'watch': ('watch', "re-check alignment as build files are saved, printing only what changed"),
+    'discover': ('discovery', "build files of a repository, honouring .gitignore"),
+    'selftest': ('selftest', "check that the parsers and comparison work in this environment"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = [f"usage: sharedlibs <command> [options]   (sharedlibs {__version__})", "", "commands:"]
+    lines += [f"  {name:<{width}}  {summary}" for name, (_, summary) in COMMANDS.items()]
+    lines += ["", "Run `sharedlibs <command> --help` for the options of a command."]
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0 if argv else 2
+    if argv[0] == '--version':
+        print(__version__)
+        return 0
+
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"sharedlibs: unknown command {command!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    module = importlib.import_module(f'.{COMMANDS[command][0]}', __package__)
+    # argparse takes the program name for --help and errors from argv[0]
+    sys.argv[0] = f'sharedlibs {command}'
+    status = module.main(args)
+    return status if isinstance(status, int) else 0
@@ -0,0 +1,310 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from .config import DEFAULT_IMPACT_INDEX, SHARED_LIBRARIES
+from .identity import report_near_misses
+from .parse_cache import cached_versions, report_cache_stats
+from .repo_index import add_resolve_argument
+from .report_writer import add_format_arguments, structured_output
+from .spans import add_profile_argument, emit, profiled, span
+
+# List of repo paths (relative to this script's location)
+REPOS = [
+    Path("cl-clpss/pom.xml"),  # current repo
+    Path("cl-ccl1/pom.xml"),
+    Path("cl-jobserver/ivy.xml"),
+    Path("cl-jobschedular/ivy.xml"),
+]
+
+# List of shared library artifactIds to check
+SHARED_LIBS = SHARED_LIBRARIES
+
+def get_versions(file_path):
+    """Get versions from either pom.xml or ivy.xml files"""
+    versions = {}
+    if not file_path.exists():
+        return versions
+    
+    if file_path.name == "pom.xml":
+        return get_pom_versions(file_path)
+    elif file_path.name == "ivy.xml":
+        return get_ivy_versions(file_path)
+    
+    return versions
+
+def get_versions_at_ref(repo_files, ref):
+    """
+    Get versions for every build file as committed at ref, read from each
+    repo's object database (no checkout, one cat-file round trip per repo)
+    """
+    from .git_blobs import read_build_files
+
+    all_versions = {}
+    blobs = read_build_files(repo_files, ref)
+    for repo_file in repo_files:
+        blob = blobs.get(repo_file)
+        if blob is None:
+            all_versions[repo_file] = {}
+        elif repo_file.name == "pom.xml":
+            all_versions[repo_file] = get_pom_versions(blob.data, sha=blob.sha)
+        elif repo_file.name == "ivy.xml":
+            all_versions[repo_file] = get_ivy_versions(blob.data, sha=blob.sha)
+        else:
+            all_versions[repo_file] = {}
+    return all_versions
+
+def get_pom_versions(pom_path, sha=None):
+    """Parse Maven pom.xml file for dependency versions (parse cache first)"""
+    return cached_versions(pom_path, 'maven', SHARED_LIBS, sha=sha)
+
+def get_ivy_versions(ivy_path, sha=None):
+    """Parse Ivy ivy.xml file for dependency versions (parse cache first)"""
+    return cached_versions(ivy_path, 'ivy', SHARED_LIBS, sha=sha)
+
+def find_mismatches(all_versions, libs):
+    """Return [(lib, {repo: version})] for every library with more than one version"""
+    mismatches = []
+    for lib in libs:
+        lib_versions = {repo: vers.get(lib) for repo, vers in all_versions.items() if lib in vers}
+        if len(set(lib_versions.values())) > 1:
+            mismatches.append((lib, lib_versions))
+    return mismatches
+
+def print_mismatch_report(mismatches, checked=None, unchecked=()):
+    """
+    Print the LIB_VERSION_MISMATCH report; return 1 if there are mismatches.
+    checked names the libraries an incremental run re-checked, when it isn't
+    all, and unchecked the other libraries that are still mismatched: they
+    are listed by name and fail the run just like a full rebuild would.
+    """
+    if mismatches or unchecked:
+        print("LIB_VERSION_MISMATCH")
+        for lib, vers in mismatches:
+            print(f"Mismatch for {lib}:")
+            for repo, v in vers.items():
+                print(f"  {repo}: {v}")
+        if unchecked:
+            print(f"Still mismatched (not re-checked this run): {', '.join(unchecked)}")
+        return 1
+    elif checked is not None:
+        print(f"All {len(checked)} re-checked shared library versions are aligned.")
+        return 0
+    else:
+        print("All shared library versions are aligned.")
+        return 0
+
+def write_mismatch_records(report, mismatches, files, rows):
+    """Stream one record per row of every mismatched library, then the summary"""
+    with span('write records'):
+        for lib, vers in mismatches:
+            report.mismatch(lib, vers, files)
+        report.close(mismatches=len(mismatches), rows=rows)
+
+def add_scan_arguments(parser):
+    """Add the --manifest/--workers/--executor options for org-wide scans"""
+    parser.add_argument('--manifest', type=Path, help="JSON manifest of repos and build files to scan")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="pool size for --manifest scans (default: CPU count, 1 = serial)")
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help="pool type for --manifest scans")
+
+def scan_into_matrix(manifest, matrix_path=None, changed=None, workers=None, executor='process',
+                     impact_path=None, resolve=False, report=None, files=None):
+    """
+    Scan a manifest into a VersionMatrix; return it and the libraries that
+    were re-checked (None after a full scan). With a saved snapshot and a
+    list of changed build files, the snapshot maps the files to their rows
+    (files it doesn't know are placed by the manifest's repo roots, without
+    walking any repo), only those rows are rescanned and only their library
+    columns are re-checked; otherwise the matrix is rebuilt from a full scan.
+    The snapshot is saved back when a path is given; without one the full
+    scan goes into a CompactMatrix. With impact_path the reverse-dependency
+    index is refreshed from the same rows and saved. With resolve, dynamic
+    versions are resolved (repo_index.py) before they are stored, so a saved
+    matrix holds the versions as resolved when each row was last scanned. A
+    report writer gets each scanned row as declared while the scan runs, and
+    files is filled with row → build file.
+    """
+    # Org-wide scans pull in the process pool and the matrix; plain runs never do
+    from .org_scan import ScanTask, iter_manifest_tasks, load_manifest, tasks_for_paths
+    from .version_matrix import CompactMatrix, VersionMatrix
+
+    with span('load matrix'):
+        matrix = VersionMatrix.load(matrix_path, SHARED_LIBS) if matrix_path else None
+
+    affected = None
+    if matrix is not None and changed:
+        with span('changed rows'):
+            rows_by_path = {os.path.abspath(path): row for row, entries in matrix.files.items()
+                            for path, _ in entries}
+            changed_paths = {os.path.abspath(p) for p in changed}
+            rows = {rows_by_path[p] for p in changed_paths if p in rows_by_path}
+            for task in tasks_for_paths(manifest, sorted(changed_paths - rows_by_path.keys())):
+                matrix.files.setdefault(task.row, []).append((task.path, task.kind))
+                rows.add(task.row)
+            tasks = [ScanTask(row, path, kind) for row, entries in matrix.files.items() if row in rows
+                     for path, kind in entries]
+        if files is not None:
+            files.update((row, entries[0][0]) for row, entries in matrix.files.items())
+        affected = set()
+        with span('scan'):
+            scanned = _scan_rows(tasks, workers, executor, report)
+        if resolve:
+            resolve_dynamic_versions(scanned)
+        with span('update matrix'):
+            for row, versions in scanned.items():
+                affected |= matrix.update_repo(row, versions)
+        print(f"Version matrix: rescanned {len(rows)} rows, re-checked {len(affected)} libraries",
+              file=sys.stderr)
+    else:
+        # The index needs every task's file name; otherwise tasks stream into the pool
+        tasks = load_manifest(manifest) if impact_path else iter_manifest_tasks(manifest)
+        row_files = {}
+        with span('scan'):
+            scanned = _scan_rows(_noting_files(tasks, row_files), workers, executor, report)
+        if files is not None:
+            files.update((row, entries[0][0]) for row, entries in row_files.items())
+        if resolve:
+            resolve_dynamic_versions(scanned)
+        with span('build matrix'):
+            # Without a snapshot to keep updating, the interned read-only form is enough
+            matrix_type = VersionMatrix if matrix_path else CompactMatrix
+            matrix = matrix_type.build(scanned, SHARED_LIBS)
+            if matrix_path:
+                matrix.files = row_files
+
+    if matrix_path:
+        with span('save matrix'):
+            matrix.save(matrix_path)
+    if impact_path:
+        with span('impact index'):
+            if affected is not None:
+                # Every row's file name, in case the index has to be rebuilt
+                tasks = [ScanTask(row, entries[0][0], entries[0][1]) for row, entries in matrix.files.items()]
+            refresh_impact_index(impact_path, manifest, tasks, scanned,
+                                 matrix.rows if affected is not None else None)
+    return matrix, affected
+
+def _scan_rows(tasks, workers, executor, report):
+    """
+    org_scan.scan() into {row: {library: version}}; with a report writer each
+    shard's rows are also written while the rest of the scan runs
+    """
+    from .org_scan import scan
+
+    if report is None:
+        return scan(tasks, SHARED_LIBS, workers=workers, executor=executor)
+    scanned = {}
+
+    def on_result(result):
+        for row, versions in result.items():
+            row_versions = scanned.setdefault(row, {})
+            for lib, version in versions.items():
+                row_versions.setdefault(lib, version)
+        report.rows(result)
+
+    scan(tasks, SHARED_LIBS, workers=workers, executor=executor, on_result=on_result)
+    return scanned
+
+def _noting_files(tasks, row_files):
+    """Pass tasks through, recording every row's build files as (path, kind)"""
+    for task in tasks:
+        row_files.setdefault(task.row, []).append((task.path, task.kind))
+        yield task
+
+def resolve_dynamic_versions(all_versions):
+    """Resolve ranges, latest.* and -SNAPSHOT versions in place through the local repository index"""
+    from .repo_index import report_resolutions, resolve_rows
+
+    with span('resolve versions'):
+        report_resolutions(resolve_rows(all_versions))
+
+def refresh_impact_index(path, manifest, tasks, scanned, all_rows=None):
+    """
+    Apply scanned rows to the impact index snapshot at path. all_rows (the
+    whole matrix) rebuilds the index when there is no usable snapshot; without
+    it, scanned is taken to be every row.
+    """
+    from .impact_index import ImpactIndex
+    from .org_scan import load_provides
+
+    index = ImpactIndex.load(path, SHARED_LIBS) if all_rows is not None else None
+    rows = scanned
+    if index is None:
+        index = ImpactIndex(SHARED_LIBS)
+        rows = all_rows if all_rows is not None else scanned
+    files = {}
+    for task in tasks:
+        files.setdefault(task.row, os.path.basename(task.path))
+    provides = load_provides(manifest)
+    for row, versions in rows.items():
+        index.update_row(row, versions, files.get(row, 'pom.xml'), provides.get(row.split('/', 1)[0], ()))
+    index.save(path)
+
+def compare(args, report=None):
+    """
+    Run the comparison selected by the parsed command line; return the report
+    status. With a report writer, records are written besides the text report.
+    """
+    if args.manifest:
+        files = {} if report is not None else None
+        matrix, affected = scan_into_matrix(args.manifest, args.matrix, args.changed, args.workers, args.executor,
+                                            args.impact, args.resolve, report, files)
+        with span('mismatches'):
+            mismatches = matrix.mismatches(affected)
+        unchecked = []
+        if affected is not None:
+            unchecked = [lib for lib in SHARED_LIBS if lib not in affected and matrix.is_mismatched(lib)]
+        if report is not None:
+            write_mismatch_records(report, mismatches, files, len(files))
+        return print_mismatch_report(mismatches, affected, unchecked)
+
+    with span('read versions'):
+        if args.ref:
+            file_versions = get_versions_at_ref(REPOS, args.ref)
+        else:
+            file_versions = {repo_file: get_versions(repo_file) for repo_file in REPOS}
+
+    all_versions = {}
+    files = {}
+    for repo_file in REPOS:
+        repo_name = repo_file.parts[-2] if len(repo_file.parts) > 1 else "main"
+        all_versions[repo_name] = file_versions[repo_file]
+        files[repo_name] = str(repo_file)
+
+    report_cache_stats()
+    if args.resolve:
+        resolve_dynamic_versions(all_versions)
+    with span('mismatches'):
+        mismatches = find_mismatches(all_versions, SHARED_LIBS)
+    if report is not None:
+        report.rows(all_versions)
+        write_mismatch_records(report, mismatches, files, len(all_versions))
+    return print_mismatch_report(mismatches)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare shared library versions across repositories")
+    parser.add_argument('--ref', help="read build files from this git ref in each repo instead of the worktree")
+    add_scan_arguments(parser)
+    parser.add_argument('--matrix', type=Path,
+                        help="version matrix snapshot to load and save for --manifest scans")
+    parser.add_argument('--changed', nargs='+', metavar='FILE',
+                        help="with --matrix: only rescan these build files and the libraries they touch")
+    parser.add_argument('--impact', type=Path, nargs='?', const=DEFAULT_IMPACT_INDEX, metavar='PATH',
+                        help=f"also refresh the reverse-dependency index for check-changes "
+                             f"(default path: {DEFAULT_IMPACT_INDEX})")
+    add_resolve_argument(parser)
+    add_format_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+
+    with profiled(args.profile), structured_output(args.format, args.output) as report:
+        status = compare(args, report)
+    report_near_misses()
+    emit("Shared library comparison timings")
+    return status
+
+if __name__ == "__main__":
+    main()
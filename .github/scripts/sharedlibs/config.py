@@ -0,0 +1,46 @@
+"""
+Settings shared by every sharedlibs command.
+
+SHARED_LIBRARIES is the single list of tracked artifactIds; add or remove a
+library here. Notification recipients live in email_config.
+
+Build files don't all spell a library the way SHARED_LIBRARIES does: names
+are matched case-insensitively, the email_config.ARTIFACT_LIBRARIES display
+names (CL_Util, Clpss_Common, ...) are accepted everywhere, and any other
+spelling goes in LIBRARY_ALIASES (see identity.py).
+"""
+
+from pathlib import Path
+
+# Shared library artifactIds tracked across repositories
+SHARED_LIBRARIES = [
+    "Util",           # CL_Util
+    "common",         # Clpss_Common
+    "occupancy",      # Clpss_Occupancy
+    "fire-rating",    # FireRating
+    "csm",            # CSM
+    "rating",         # Clpss_RateCLPolicy
+    "compose-print"   # Clpss_ComposePrint
+]
+
+# Other names of a tracked library, beyond its display name. "group:name"
+# only matches a dependency with that Maven groupId / Ivy org, e.g.
+#     "Util": ["cl-util", "com.shared:util-core"],
+LIBRARY_ALIASES = {}
+
+# Parse cache, Jira ticket cache and other per-run state (restored by actions/cache)
+DEFAULT_CACHE_DIR = Path('.cache/sharedlibs')
+
+# Reverse-dependency index written by `compare --manifest ... --impact`
+DEFAULT_IMPACT_INDEX = DEFAULT_CACHE_DIR / 'impact.json'
+
+# Local Maven repository / Ivy cache index written by `repo-index` and read
+# when resolving ranges, latest.* and -SNAPSHOT versions
+DEFAULT_REPO_INDEX = DEFAULT_CACHE_DIR / 'repo-index.json'
+
+# Repos to update when no impact index is available: (row, build file)
+DEFAULT_TARGETS = [
+    ("cl-ccl1", "pom.xml"),
+    ("cl-jobserver", "ivy.xml"),
+    ("cl-jobschedular", "ivy.xml"),
+]
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Streaming, early-exit extraction of shared library versions from build files.
+
+The tree-based parsers build the whole document before looking at a single
+<dependency>. Effective POMs and generated ivy files are often several MB of
+<build>/<profiles> noise, so this module walks the document with iterparse,
+only materialises <dependency> elements, clears everything else as soon as it
+is closed and stops reading once every tracked library has been seen.
+Dependency names are mapped to canonical library IDs through the shared
+identity index (identity.py), so Cl_Util in an ivy.xml is reported as Util.
+Files that don't mention any tracked library at all are dropped by a byte
+search before they reach the parser (prefilter.py).
+
+The functions here are the 'etree' parser backend; stream_versions() uses
+whichever backend backends.select_backend() picks (see backends.py).
+"""
+
+import io
+from contextlib import contextmanager
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Union
+
+from . import prefilter
+from .identity import identity_index
+
+Source = Union[str, Path, bytes, BinaryIO]
+
+# Bump whenever a change here can alter extracted results; it invalidates
+# every entry in the on-disk parse cache.
+EXTRACTION_RULES_VERSION = 3
+
+
+POM_NS = '{http://maven.apache.org/POM/4.0.0}'
+
+# Accept both namespaced and bare POMs without stripping every tag
+_DEPENDENCIES = frozenset(('dependencies', POM_NS + 'dependencies'))
+_DEPENDENCY = frozenset(('dependency', POM_NS + 'dependency'))
+_DEPENDENCY_MANAGEMENT = frozenset(('dependencyManagement', POM_NS + 'dependencyManagement'))
+_GROUP_ID = frozenset(('groupId', POM_NS + 'groupId'))
+_ARTIFACT_ID = frozenset(('artifactId', POM_NS + 'artifactId'))
+_VERSION = frozenset(('version', POM_NS + 'version'))
+
+
+@contextmanager
+def _open_source(source: Source):
+    """
+    Yield a binary file object for iterparse.
+
+    Paths are opened here rather than by iterparse so the handle is released
+    immediately when we stop early instead of waiting for garbage collection.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, Path)):
+        with open(source, 'rb') as f:
+            yield f
+    else:
+        yield source
+
+
+def stream_pom_versions(source: Source, tracked: Iterable[str], iterparse: Callable = ET.iterparse) -> Dict[str, str]:
+    """
+    Extract {library: version} for tracked libraries from a Maven pom.xml.
+
+    Only <dependency> elements whose parent is a <dependencies> block are
+    inspected. The first declaration of a library wins, except that one under
+    <dependencyManagement> only counts when the project doesn't declare the
+    library itself; parsing stops as soon as every tracked library has been
+    found outside <dependencyManagement>. iterparse may be any function with
+    ElementTree's iterparse(file, events) interface.
+    """
+    wanted = set(tracked)
+    versions = {}
+    if not wanted:
+        return versions
+    resolve = identity_index().resolve
+
+    managed_versions = {}
+    root = None
+    stack = []
+    in_dependency = managed = False
+    with _open_source(source) as f:
+        for event, elem in iterparse(f, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if root is None:
+                    root = elem
+                elif tag in _DEPENDENCY and stack[-1] in _DEPENDENCIES:
+                    in_dependency = True
+                    managed = not _DEPENDENCY_MANAGEMENT.isdisjoint(stack)
+                stack.append(tag)
+                continue
+
+            stack.pop()
+            if in_dependency:
+                if tag not in _DEPENDENCY:
+                    continue
+                in_dependency = False
+                group_id = artifact_id = version = None
+                for child in elem:
+                    if child.tag in _ARTIFACT_ID:
+                        artifact_id = child.text
+                    elif child.tag in _VERSION:
+                        version = child.text
+                    elif child.tag in _GROUP_ID:
+                        group_id = child.text
+                if artifact_id and version:
+                    aid = artifact_id.strip()
+                    lib = resolve(aid, group_id) or aid
+                    found = managed_versions if managed else versions
+                    if lib in wanted and lib not in found:
+                        found[lib] = version.strip()
+                        if len(versions) == len(wanted):
+                            break
+            elem.clear()
+            if len(stack) == 1:
+                # Drop finished top-level sections (<build>, <profiles>...)
+                # from the root so they can be garbage collected.
+                root.clear()
+    return merge_managed(versions, managed_versions)
+
+
+def merge_managed(versions: Dict[str, str], managed_versions: Dict[str, str]) -> Dict[str, str]:
+    """Declared versions, plus managed versions of libraries the project doesn't declare itself"""
+    for lib, version in managed_versions.items():
+        versions.setdefault(lib, version)
+    return versions
+
+
+def stream_ivy_versions(source: Source, tracked: Iterable[str], iterparse: Callable = ET.iterparse) -> Dict[str, str]:
+    """
+    Extract {library: rev} for tracked libraries from an Ivy ivy.xml.
+
+    Ivy carries everything on attributes, so the start event is enough and no
+    element content is ever kept. Parsing stops once every tracked library has
+    been found.
+    """
+    wanted = set(tracked)
+    versions = {}
+    if not wanted:
+        return versions
+    resolve = identity_index().resolve
+
+    root = None
+    depth = 0
+    with _open_source(source) as f:
+        for event, elem in iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                if elem.tag == 'dependency':
+                    name = elem.attrib.get('name')
+                    rev = elem.attrib.get('rev')
+                    lib = resolve(name, elem.attrib.get('org')) or name
+                    if lib in wanted and rev and lib not in versions:
+                        versions[lib] = rev
+                        if len(versions) == len(wanted):
+                            break
+                continue
+            depth -= 1
+            elem.clear()
+            if depth == 1:
+                root.clear()
+    return versions
+
+
+def stream_versions(source: Source, kind: str, tracked: Iterable[str]) -> Dict[str, str]:
+    """
+    Dispatch to the pom or ivy extractor ('maven'/'pom' or 'ivy') of the
+    selected parser backend. Paths and bytes that can't contain a tracked name
+    (see prefilter.py) are never parsed.
+    """
+    from .backends import select_backend
+
+    backend = select_backend()
+    if kind in ('maven', 'pom', 'pom.xml'):
+        extract = backend.pom_versions
+    elif kind in ('ivy', 'ivy.xml'):
+        extract = backend.ivy_versions
+    else:
+        raise ValueError(f"Unknown build file type: {kind}")
+
+    tracked = list(tracked)
+    if prefilter.ENABLED and tracked:
+        if isinstance(source, (str, Path)):
+            found, data = prefilter.prefilter_file(source, tracked)
+            if not found:
+                return {}
+            source = source if data is None else data
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            if not prefilter.may_contain(bytes(source), prefilter.tracked_needles(tracked)):
+                return {}
+    return extract(source, tracked)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Map `git diff` hunks of a pom.xml onto its dependency declarations.
+
+A PR that only edits <build> plugins, descriptions or whitespace still
+triggers the workflow. Before any XML is parsed, the zero-context diff
+between the base and the worktree is read and every changed line is placed
+in the element span that contains it, found with a few regex
+passes (no parser, no tree). The change is relevant only if some changed
+line lies in:
+
+    a <dependency> of a tracked library, or a BOM import (<scope>import</scope>)
+    <properties>, <parent> or any other element outside IRRELEVANT_ELEMENTS
+
+Anything else (an untracked dependency, a plugin, <build>, <scm>, ...) can't
+alter a tracked version, so the check can stop with "no change". The spans
+also give the line of each tracked dependency for PR annotations.
+
+Versions of a POM with a parent or BOM import can also come from other
+files; for those check-changes resolves the current model anyway and only
+skips the base branch when none of the repository files it read changed.
+SHAREDLIBS_DIFF_FAST_PATH=0 makes check-changes always compare parsed versions.
+"""
+
+import re
+import subprocess
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .identity import canonical
+
+# Children of <project> (or <profile>) whose content never feeds a dependency
+# version; a changed line in one is irrelevant unless a tracked <dependency>
+# inside it (e.g. a plugin dependency) encloses the line
+IRRELEVANT_ELEMENTS = (
+    'build', 'reporting', 'description', 'name', 'url', 'inceptionYear', 'organization', 'licenses',
+    'developers', 'contributors', 'mailingLists', 'scm', 'issueManagement', 'ciManagement',
+    'distributionManagement', 'repositories', 'pluginRepositories', 'modelVersion', 'packaging',
+    'prerequisites', 'modules',
+)
+
+_HUNK = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+# Each pattern starts with a literal so the regex engine can skip ahead with a
+# fast substring search; POMs don't prefix their elements, so neither do these
+_COMMENTS = (('<!--', re.compile(r'<!--.*?-->', re.S)), ('<?', re.compile(r'<\?.*?\?>', re.S)),
+             ('<![CDATA[', re.compile(r'<!\[CDATA\[.*?\]\]>', re.S)))
+_DEPENDENCY = re.compile(r'<dependency[\s>](.*?)</dependency\s*>', re.S)
+_PROPERTIES = re.compile(r'<properties[\s>].*?</properties\s*>', re.S)
+_SECTION = re.compile(r'<(%s)[\s>/]' % '|'.join(IRRELEVANT_ELEMENTS))
+_ARTIFACT_ID = re.compile(r'<artifactId\s*>\s*([^<]*?)\s*<')
+_GROUP_ID = re.compile(r'<groupId\s*>\s*([^<]*?)\s*<')
+_SCOPE = re.compile(r'<scope\s*>\s*([^<]*?)\s*<')
+
+Range = Tuple[int, int]  # first and last line, 1-based, inclusive
+MAX_REASONS = 5
+
+
+class Element(NamedTuple):
+    tag: str
+    start: int
+    end: int
+    artifact_id: Optional[str] = None
+    scope: Optional[str] = None
+
+
+class HunkReport(NamedTuple):
+    """Which tracked libraries a diff touched, and whether anything relevant changed"""
+    relevant: bool
+    touched: List[str]
+    reasons: List[str]
+
+
+def changed_ranges(diff: str) -> Tuple[List[Range], List[Range]]:
+    """Removed (old-side) and added (new-side) line ranges of a -U0 diff"""
+    old, new = [], []
+    for line in diff.splitlines():
+        match = _HUNK.match(line)
+        if not match:
+            continue
+        old_start, old_count, new_start, new_count = match.groups()
+        old_count = 1 if old_count is None else int(old_count)
+        new_count = 1 if new_count is None else int(new_count)
+        if old_count:
+            old.append((int(old_start), int(old_start) + old_count - 1))
+        if new_count:
+            new.append((int(new_start), int(new_start) + new_count - 1))
+    return old, new
+
+
+def _blank(match: 're.Match') -> str:
+    return '\n' * match.group(0).count('\n')
+
+
+def strip_comments(text: str) -> str:
+    """Blank comments, processing instructions and CDATA, keeping newlines so line numbers still match"""
+    for marker, pattern in _COMMENTS:
+        if marker in text:
+            text = pattern.sub(_blank, text)
+    return text
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    return [0, *accumulate(len(line) + 1 for line in lines)]
+
+
+def _section_spans(text: str, skip: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Offsets of IRRELEVANT_ELEMENTS sections. The search resumes after each
+    section found, so the names nested inside (<build><plugins>...<name>)
+    are never looked at; openers inside a skip span (<properties>, where
+    these names can be user-defined properties) are passed over.
+    """
+    spans = []
+    match = _SECTION.search(text)
+    while match:
+        pos, tag = match.start(), match.group(1)
+        enclosing = next((end for start, end in skip if start <= pos < end), None)
+        if enclosing is not None:
+            match = _SECTION.search(text, enclosing)
+            continue
+        close = text.find('>', pos)
+        if close > 0 and text[close - 1] == '/':
+            end = close
+        else:
+            end = text.find('</' + tag, pos)
+            end = len(text) if end < 0 else end
+        spans.append((pos, end))
+        match = _SECTION.search(text, end)
+    return spans
+
+
+def scan_elements(text: str, line_starts: Optional[List[int]] = None) -> List[Element]:
+    """
+    Line spans of every <dependency> and IRRELEVANT_ELEMENTS section in
+    comment-free text. Only these spans decide whether a line matters, so
+    they are located with a few regex passes rather than by walking every
+    tag, which would cost more than parsing.
+    """
+    if line_starts is None:
+        line_starts = _line_starts(text.split('\n'))
+
+    def line_of(offset: int) -> int:
+        return bisect_right(line_starts, offset)
+
+    elements = []
+    for match in _DEPENDENCY.finditer(text):
+        body = match.group(1)
+        artifact_id = _ARTIFACT_ID.search(body)
+        group_id = _GROUP_ID.search(body)
+        scope = _SCOPE.search(body)
+        # The groupId picks out group-qualified aliases ("com.shared:util-core")
+        library = canonical(artifact_id.group(1), group_id.group(1) if group_id else None) if artifact_id else None
+        elements.append(Element('dependency', line_of(match.start()), line_of(match.end() - 1),
+                                library, scope.group(1) if scope else None))
+
+    properties = [m.span() for m in _PROPERTIES.finditer(text)] if '<properties' in text else []
+    for start, end in _section_spans(text, properties):
+        elements.append(Element('section', line_of(start), line_of(end)))
+    return elements
+
+
+def _classify_line(line: int, elements: Sequence[Element], tracked: frozenset) -> Tuple[bool, Optional[str]]:
+    """(relevant, tracked library) for one changed line"""
+    for element in elements:
+        if element.tag == 'dependency' and element.start <= line <= element.end:
+            if element.artifact_id in tracked:
+                return True, element.artifact_id
+            return element.scope == 'import', None
+    if any(e.start <= line <= e.end for e in elements):
+        return False, None
+    # <properties>, <parent>, the project's own coordinates, ...: assume it matters
+    return True, None
+
+
+def map_changes(old_text: str, new_text: str, diff: str, tracked: Iterable[str]) -> HunkReport:
+    """Classify every changed line of diff against the element spans of both sides"""
+    tracked = frozenset(tracked)
+    old_ranges, new_ranges = changed_ranges(diff)
+    touched: Dict[str, None] = {}
+    reasons = []
+    for side, ranges, text in (('-', old_ranges, old_text), ('+', new_ranges, new_text)):
+        if not ranges:
+            continue
+        lines = strip_comments(text).split('\n')
+        starts = _line_starts(lines)
+        elements = scan_elements('\n'.join(lines), starts)
+        for first, last in ranges:
+            for line in range(first, last + 1):
+                content = lines[line - 1].strip() if line <= len(lines) else ''
+                if not content:
+                    continue
+                is_relevant, library = _classify_line(line, elements, tracked)
+                if library:
+                    touched[library] = None
+                if is_relevant and len(reasons) < MAX_REASONS:
+                    reasons.append(f"{side}{line}: {content[:80]}")
+    return HunkReport(bool(reasons), list(touched), reasons)
+
+
+def dependency_lines(text: str, tracked: Iterable[str]) -> Dict[str, Range]:
+    """Line span of the first <dependency> of each tracked library (for annotations)"""
+    tracked = frozenset(tracked)
+    found: Dict[str, Range] = {}
+    for element in scan_elements(strip_comments(text)):
+        if element.tag == 'dependency' and element.artifact_id in tracked:
+            found.setdefault(element.artifact_id, (element.start, element.end))
+    return found
+
+
+def git_diff(base: str, path: str, repo: Optional[str] = None) -> Optional[str]:
+    """
+    Zero-context diff of path between base and the worktree, ignoring
+    whitespace-only changes; None if git can't produce it (unknown ref, ...).
+    """
+    cmd = ['git'] + (['-C', repo] if repo else []) + [
+        'diff', '-U0', '--no-color', '--no-ext-diff', '-w', '--ignore-blank-lines', base, '--', path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return result.stdout if result.returncode == 0 else None
+
+
+def pom_diff_report(base: str, old_data: bytes, new_data: bytes, tracked: Iterable[str], path: str = 'pom.xml',
+                    repo: Optional[str] = None) -> Optional[HunkReport]:
+    """
+    HunkReport for path between base (whose content is old_data) and the
+    worktree (new_data); None when the diff isn't available, in which case
+    the caller must fall back to comparing parsed versions.
+    """
+    diff = git_diff(base, path, repo)
+    if diff is None:
+        return None
+    return map_changes(old_data.decode('utf-8', errors='replace'), new_data.decode('utf-8', errors='replace'),
+                       diff, tracked)
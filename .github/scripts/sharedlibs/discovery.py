@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Discover every pom.xml and ivy.xml in a repository checkout.
+
+The walk uses os.scandir with an explicit stack (no recursion, no stat calls
+for the common case since scandir exposes the entry type), prunes target/,
+build/, .git/ and node_modules/ and honours .gitignore files as they are met.
+It is a generator, so callers such as org_scan can start parsing the first
+build files while the rest of the tree is still being walked.
+
+Usage:
+    python .github/scripts/discovery.py path/to/repo [more/repos ...]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Iterator, List, Optional, Pattern, Tuple
+
+PRUNED_DIRS = frozenset(('.git', 'target', 'build', 'node_modules'))
+BUILD_FILE_NAMES = frozenset(('pom.xml', 'ivy.xml'))
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regex body (no anchors)"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif c == '*':
+            out.append('[^/]*')
+            i += 1
+        elif c == '?':
+            out.append('[^/]')
+            i += 1
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end + 1
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return ''.join(out)
+
+
+class IgnoreRules:
+    """Compiled rules of one .gitignore, matched against paths relative to its directory"""
+
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple[Pattern, bool, bool]] = []
+        bodies = []
+        for line in lines:
+            line = line.rstrip('\n').rstrip('\r')
+            if not line.strip() or line.startswith('#'):
+                continue
+            line = line.rstrip(' ') if not line.endswith('\\ ') else line
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            anchored = '/' in line
+            line = line.lstrip('/')
+            body = ('' if anchored else '(?:.*/)?') + _translate(line)
+            self.rules.append((re.compile(f'^{body}$'), negate, dir_only))
+            bodies.append(body)
+        # One alternation answers "could any rule match?" for the common case
+        self._any = re.compile('^(?:' + '|'.join(bodies) + ')$') if bodies else None
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional['IgnoreRules']:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                rules = cls(f.readlines())
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, relative: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by '!', None if no rule applies"""
+        if self._any is None or not self._any.match(relative):
+            return None
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative):
+                return not negate
+        return None
+
+
+def _ignored(ignores: List[Tuple[str, IgnoreRules]], path: str, is_dir: bool) -> bool:
+    """Apply .gitignore files from the deepest directory outwards; deepest match wins"""
+    for base, rules in reversed(ignores):
+        result = rules.match(path[len(base):], is_dir)
+        if result is not None:
+            return result
+    return False
+
+
+def walk_build_files(root: str, names=BUILD_FILE_NAMES, pruned=PRUNED_DIRS,
+                     use_gitignore: bool = True) -> Iterator[str]:
+    """
+    Yield the path of every build file under root, relative to root with '/'
+    separators, in directory order as they are found.
+    """
+    root = os.path.abspath(root)
+    # Stack of (absolute dir, relative dir prefix, .gitignore chain)
+    stack: List[Tuple[str, str, List[Tuple[str, IgnoreRules]]]] = [(root, '', [])]
+    while stack:
+        directory, prefix, ignores = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        if use_gitignore:
+            for entry in entries:
+                if entry.name == '.gitignore':
+                    rules = IgnoreRules.from_file(entry.path)
+                    if rules is not None:
+                        ignores = ignores + [(prefix, rules)]
+                    break
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if name in pruned:
+                    continue
+                relative = prefix + name
+                if ignores and _ignored(ignores, relative, True):
+                    continue
+                subdirs.append((entry.path, relative + '/', ignores))
+            elif name in names:
+                relative = prefix + name
+                if ignores and _ignored(ignores, relative, False):
+                    continue
+                yield relative
+        # Reverse so directories are visited in scandir order
+        stack.extend(reversed(subdirs))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="List every pom.xml and ivy.xml in repository checkouts")
+    parser.add_argument('roots', nargs='+', help="repository checkouts to walk")
+    parser.add_argument('--no-gitignore', action='store_true', help="don't honour .gitignore files")
+    args = parser.parse_args(argv)
+
+    for root in args.roots:
+        start = time.perf_counter()
+        found = 0
+        for relative in walk_build_files(root, use_gitignore=not args.no_gitignore):
+            print(os.path.join(root, relative))
+            found += 1
+        elapsed = time.perf_counter() - start
+        print(f"Found {found} build files under {root} in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
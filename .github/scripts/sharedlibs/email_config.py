@@ -21,6 +21,21 @@ LIBRARY_TEAMS = {
     "Clpss_ComposePrint": ["print-team@company.com"]
 }
 
+# Teams incoming webhooks that should get the changes of one library
+# (TEAMS_WEBHOOK_URL channels always get every change)
+LIBRARY_WEBHOOKS = {}
+
+# Artifact name (as it appears in pom.xml/ivy.xml) of each library above
+ARTIFACT_LIBRARIES = {
+    "Util": "CL_Util",
+    "common": "Clpss_Common",
+    "occupancy": "Clpss_Occupancy",
+    "fire-rating": "FireRating",
+    "csm": "CSM",
+    "rating": "Clpss_RateCLPolicy",
+    "compose-print": "Clpss_ComposePrint"
+}
+
 # Escalation emails (for critical libraries)
 ESCALATION_EMAILS = [
     "manager@company.com",
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Long-running event server that keeps shared library state warm between PRs.
+
+Every PR event normally costs a fresh interpreter, fresh imports, a new
+`git cat-file` process and a re-parse of every build file. This server
+accepts GitHub `pull_request` payloads (see .github/workflows/test-events/)
+over HTTP on a TCP port or a unix socket and answers each one from warm
+state: one persistent GitBlobReader, an in-memory memo of extracted versions
+(by blob SHA, or by root tree SHA for POMs that need Maven resolution) in
+front of the SQLite parse cache, and a VersionMatrix with one row per open PR
+and base branch. Events are handled on worker threads, so the asyncio loop
+keeps accepting connections while git and the parsers run. A malformed
+payload or request header gets a 400; any other failure while handling an
+event gets a 500, and the server keeps serving.
+
+Endpoints:
+    POST /events   pull_request payload -> {"status": "LIB_VERSION_CHANGED", "changes": [...]}
+    GET  /stats    event count and p50/p99 handling latency
+    GET  /matrix   libraries on which open PRs and base branches disagree
+
+Usage:
+    python .github/scripts/event_server.py --repo . --port 8787
+    python .github/scripts/event_server.py --repo . --socket /tmp/sharedlibs.sock
+    python .github/scripts/event_server.py --repo . --bench 200 --base-ref main
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .check_version_changes import (SHARED_LIBRARIES, classify_changes, diff_versions, get_effective_pom_versions,
+                                   get_pom_versions)
+from .git_blobs import GitBlobReader
+from .maven_model import FileLoader, GitLoader, MavenResolver, default_local_repository, needs_resolution
+from .parse_cache import blob_sha, get_cache
+from . import spans
+from .version_matrix import VersionMatrix
+
+DEFAULT_PORT = 8787
+DEFAULT_WORKERS = 4
+DEFAULT_MEMO_ENTRIES = 4096
+TEST_EVENTS = Path(__file__).resolve().parents[2] / 'workflows' / 'test-events'
+# Directory (or zipapp) the sharedlibs package is imported from, for the cold runs
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
+_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+
+
+class PayloadError(ValueError):
+    """The event payload doesn't have the shape of a pull_request event"""
+
+
+def _object(parent: dict, key: str, what: str) -> dict:
+    """parent[key] as a dict ({} when absent)"""
+    value = parent.get(key)
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise PayloadError(f"{what} is not an object")
+    return value
+
+
+def _string(parent: dict, key: str, what: str) -> Optional[str]:
+    """parent[key] as a non-empty string, or None when absent or empty"""
+    value = parent.get(key)
+    if value is not None and not isinstance(value, str):
+        raise PayloadError(f"{what} is not a string")
+    return value or None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class WarmState:
+    """Everything kept between events for one repository checkout"""
+
+    def __init__(self, repo: Path, memo_entries: int = DEFAULT_MEMO_ENTRIES):
+        self.repo = Path(repo)
+        self.reader = GitBlobReader(self.repo)
+        self.local_repo = default_local_repository()
+        self.matrix = VersionMatrix(SHARED_LIBRARIES)
+        self.latencies: deque = deque(maxlen=10_000)
+        self.events = 0
+        self.memo_hits = 0
+        self._memo: 'OrderedDict[str, Dict[str, str]]' = OrderedDict()
+        self._memo_entries = memo_entries
+        self._memo_lock = threading.Lock()
+
+    def _memoized(self, key: str, compute) -> Dict[str, str]:
+        with self._memo_lock:
+            versions = self._memo.get(key)
+            if versions is not None:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return versions
+        versions = compute()
+        with self._memo_lock:
+            self._memo[key] = versions
+            while len(self._memo) > self._memo_entries:
+                self._memo.popitem(last=False)
+        return versions
+
+    def resolve_ref(self, ref: str) -> Optional[str]:
+        """origin/<ref> when it exists (as in the workflow), else the local ref"""
+        for candidate in (f'origin/{ref}', ref):
+            if self.reader.object_id(candidate) is not None:
+                return candidate
+        return None
+
+    def versions_at(self, ref: str) -> Optional[Dict[str, str]]:
+        """Effective versions of pom.xml at ref, None if the file doesn't exist there"""
+        blob = self.reader.read_blob(ref, 'pom.xml')
+        if blob is None:
+            return None
+        if not needs_resolution(blob.data):
+            return self._memoized(f'blob:{blob.sha}', lambda: get_pom_versions(blob.data, sha=blob.sha))
+        # Parents and BOMs live elsewhere in the tree: the root tree SHA pins them all
+        tree = self.reader.object_id(f'{ref}^{{tree}}')
+        resolver = MavenResolver(GitLoader(self.reader, ref), self.local_repo)
+        return self._memoized(f'tree:{tree}', lambda: get_effective_pom_versions(
+            resolver, 'pom.xml', blob.data, sha=blob.sha))
+
+    def worktree_versions(self) -> Dict[str, str]:
+        path = self.repo / 'pom.xml'
+        if not path.exists():
+            return {}
+        data = path.read_bytes()
+        if not needs_resolution(data):
+            sha = blob_sha(data)
+            return self._memoized(f'blob:{sha}', lambda: get_pom_versions(data, sha=sha))
+        return get_effective_pom_versions(MavenResolver(FileLoader(), self.local_repo), str(path), data)
+
+    def handle(self, payload: dict) -> Tuple[int, dict]:
+        """Compare the PR head with its base; runs on a worker thread"""
+        try:
+            return self._compare(payload)
+        finally:
+            # The process never exits between events: commit new cache entries
+            # so one-shot runs sharing the database aren't locked out
+            cache = get_cache()
+            if cache is not None:
+                cache.flush()
+
+    def _compare(self, payload: dict) -> Tuple[int, dict]:
+        pr = payload.get('pull_request')
+        if not isinstance(pr, dict):
+            raise PayloadError('not a pull_request payload')
+        number = pr.get('number', 0)
+        if not isinstance(number, int) or isinstance(number, bool):
+            raise PayloadError('pull_request.number is not an integer')
+        base_ref = _string(_object(pr, 'base', 'pull_request.base'), 'ref', 'pull_request.base.ref')
+        head_sha = _string(_object(pr, 'head', 'pull_request.head'), 'sha', 'pull_request.head.sha')
+        action = _string(payload, 'action', 'action')
+        for what, ref in (('pull_request.base.ref', base_ref), ('pull_request.head.sha', head_sha)):
+            # One object name per line on the cat-file pipe: whitespace would desynchronise it
+            if ref is not None and any(c.isspace() for c in ref):
+                raise PayloadError(f"{what} is not a git ref")
+        base = self.resolve_ref(base_ref or 'main')
+        if base is None:
+            return 200, {'pr': number, 'status': 'ERROR', 'error': 'base branch not found'}
+        base_versions = self.versions_at(base)
+        if base_versions is None:
+            return 200, {'pr': number, 'status': 'ERROR', 'error': f'pom.xml not found at {base}'}
+
+        head_versions = self.versions_at(head_sha) if head_sha else self.worktree_versions()
+        if head_versions is None:
+            return 200, {'pr': number, 'status': 'ERROR', 'error': f'pom.xml not found at {head_sha}'}
+
+        changes = diff_versions(head_versions, base_versions)
+        return 200, {
+            'pr': number,
+            'base': base,
+            'status': 'LIB_VERSION_CHANGED' if changes else 'NO_CHANGES',
+            'changes': changes,
+            'kinds': classify_changes(changes),
+            '_rows': (f'pr-{number}', head_versions, base, base_versions, action),
+        }
+
+    def stats(self) -> dict:
+        latencies = list(self.latencies)
+        cache = get_cache()
+        return {
+            'events': self.events,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'memo_entries': len(self._memo),
+            'memo_hits': self.memo_hits,
+            'parse_cache': {'hits': cache.hits, 'misses': cache.misses} if cache else None,
+        }
+
+    def close(self) -> None:
+        self.reader.close()
+
+
+class EventServer:
+    """asyncio HTTP/1.1 front end; event work runs on a thread pool"""
+
+    def __init__(self, state: WarmState, workers: int = DEFAULT_WORKERS):
+        self.state = state
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sharedlibs-event')
+        self._matrix_lock = asyncio.Lock()
+
+    async def _process_event(self, body: bytes) -> Tuple[int, dict]:
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError as e:
+            return 400, {'error': f'invalid JSON: {e}'}
+        if not isinstance(payload, dict):
+            return 400, {'error': 'payload is not a JSON object'}
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            status, result = await loop.run_in_executor(self.executor, self.state.handle, payload)
+        except PayloadError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            return 500, {'error': f'{type(e).__name__}: {e}'}
+
+        rows = result.pop('_rows', None)
+        if rows is not None:
+            pr_row, head_versions, base_row, base_versions, action = rows
+            async with self._matrix_lock:
+                if action == 'closed':
+                    self.state.matrix.remove_repo(pr_row)
+                else:
+                    self.state.matrix.update_repo(pr_row, head_versions)
+                self.state.matrix.update_repo(base_row, base_versions)
+        elapsed = time.perf_counter() - start
+        if status == 200:
+            self.state.events += 1
+            self.state.latencies.append(elapsed)
+        result['elapsed_ms'] = round(elapsed * 1000, 3)
+        return status, result
+
+    async def _route(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, dict]:
+        if method == 'POST' and path == '/events':
+            event = headers.get('x-github-event', 'pull_request')
+            if event != 'pull_request':
+                return 202, {'ignored': event}
+            return await self._process_event(body)
+        if method == 'GET' and path == '/stats':
+            return 200, self.state.stats()
+        if method == 'GET' and path == '/matrix':
+            async with self._matrix_lock:
+                return 200, {'rows': list(self.state.matrix.rows),
+                             'mismatches': self.state.matrix.mismatches()}
+        if method == 'GET' and path == '/healthz':
+            return 200, {'ok': True}
+        return 404, {'error': f'no route for {method} {path}'}
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve keep-alive HTTP/1.1 requests until the client closes"""
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    headers = {}
+                    while request_line:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                except (asyncio.LimitOverrunError, ValueError):
+                    # readline() gives up on a line past the stream limit, so the rest can't be framed
+                    await self._respond(writer, 400, {'error': 'request line or header too long'}, close=True)
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    # Without a usable length the next request can't be found: answer and hang up
+                    await self._respond(writer, 400, {'error': 'invalid Content-Length'}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, result = await self._route(method, path.split('?', 1)[0], headers, body)
+                close = headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0'
+                await self._respond(writer, status, result, close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, result: dict, close: bool) -> None:
+        payload = json.dumps(result).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                     f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode('latin-1') + payload)
+        await writer.drain()
+
+    async def start(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                    socket_path: Optional[str] = None) -> asyncio.AbstractServer:
+        if socket_path:
+            server = await asyncio.start_unix_server(self.serve_connection, path=socket_path)
+        else:
+            server = await asyncio.start_server(self.serve_connection, host, port)
+        return server
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.state.close()
+
+
+def load_test_events(base_ref: Optional[str] = None) -> List[dict]:
+    """The sample payloads, optionally pointed at another base branch"""
+    events = []
+    for path in sorted(TEST_EVENTS.glob('*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            event = json.load(f)
+        if base_ref:
+            event['pull_request'].setdefault('base', {})['ref'] = base_ref
+        event.setdefault('action', 'synchronize')
+        events.append(event)
+    return events
+
+
+async def _bench_client(socket_path: str, events: List[dict], count: int, concurrency: int) -> List[float]:
+    """Send count events over `concurrency` keep-alive connections; return client-side latencies"""
+    latencies = []
+    bodies = [json.dumps(e).encode('utf-8') for e in events]
+    queue = iter(range(count))
+
+    async def connection():
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        try:
+            for i in queue:
+                body = bodies[i % len(bodies)]
+                start = time.perf_counter()
+                writer.write(f"POST /events HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                             f"X-GitHub-Event: pull_request\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+                length = 0
+                status = await reader.readline()
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':')[1])
+                result = json.loads(await reader.readexactly(length))
+                latencies.append(time.perf_counter() - start)
+                if not status.startswith(b'HTTP/1.1 200') or result.get('status') == 'ERROR':
+                    raise RuntimeError(f"event failed: {status.decode().strip()} {result}")
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return latencies
+
+
+def _cold_runs(repo: Path, base_ref: str, runs: int) -> List[float]:
+    """Wall time of the one-shot script, one fresh interpreter per event"""
+    env = dict(os.environ, GITHUB_BASE_REF=base_ref, PYTHONPATH=str(PACKAGE_ROOT))
+    env.pop('GITHUB_OUTPUT', None)
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'sharedlibs', 'check-changes'], cwd=repo, env=env,
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _bench(args) -> int:
+    events = load_test_events(args.base_ref)
+    if not events:
+        print(f"No test events found in {TEST_EVENTS}")
+        return 1
+    state = WarmState(args.repo)
+    server_side = EventServer(state, args.workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, 'sharedlibs.sock')
+        server = await server_side.start(socket_path=socket_path)
+        try:
+            warm = await _bench_client(socket_path, events, args.bench, args.concurrency)
+        finally:
+            server.close()
+            await server.wait_closed()
+            server_side.close()
+
+    base = args.base_ref or events[0]['pull_request']['base']['ref']
+    cold = await asyncio.get_running_loop().run_in_executor(None, _cold_runs, args.repo, base, args.cold_runs)
+
+    print(f"⏱️  {args.bench} warm events ({args.concurrency} concurrent connections) vs "
+          f"{args.cold_runs} cold one-shot runs")
+    print(f"  {'mode':<10} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, values in (('warm', warm), ('cold', cold)):
+        print(f"  {name:<10} {percentile(values, 50) * 1000:>10.2f} {percentile(values, 99) * 1000:>10.2f}")
+    speedup = percentile(cold, 50) / max(percentile(warm, 50), 1e-9)
+    print(f"  p50 speedup: {speedup:.1f}x; server-side {json.dumps(state.stats())}")
+    return 0
+
+
+async def _serve(args) -> int:
+    server_side = EventServer(WarmState(args.repo), args.workers)
+    server = await server_side.start(args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"Shared library event server listening on {where}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        server_side.close()
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Warm event server for shared library checks")
+    parser.add_argument('--repo', type=Path, default=Path('.'), help="repository checkout to check")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help="listen on a unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="event worker threads")
+    parser.add_argument('--bench', type=int, metavar='N',
+                        help="send N test events to an in-process server and compare with cold runs")
+    parser.add_argument('--concurrency', type=int, default=4, help="concurrent connections for --bench")
+    parser.add_argument('--cold-runs', type=int, default=10, help="one-shot script runs for --bench")
+    parser.add_argument('--base-ref', help="override the base branch of the test events for --bench")
+    args = parser.parse_args(argv)
+
+    # Per-run spans would grow without bound in a long-lived process; the
+    # server keeps its own latency stats instead
+    spans.ENABLED = False
+    try:
+        return asyncio.run(_bench(args) if args.bench else _serve(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Read build files straight from git objects without touching the worktree.
+
+A single long-lived `git cat-file --batch` process serves every (ref, path)
+lookup, so comparing a file against the base branch costs one pipe round trip
+instead of two `git checkout` subprocesses and two worktree writes.
+"""
+
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+
+class GitBlob(NamedTuple):
+    """A blob read from the object database"""
+    sha: str
+    data: bytes
+
+
+class GitBlobReader:
+    """
+    Persistent `git cat-file --batch` pipe for one repository.
+
+    Lookups are pipelined: read_many() writes every request before reading the
+    answers back, so any number of files and refs cost a single round trip.
+    A missing ref or path yields None rather than an exception.
+    """
+
+    def __init__(self, repo: Union[str, Path] = '.'):
+        self.repo = Path(repo)
+        self._cmd = ['git', '-C', str(self.repo), 'cat-file', '--batch']
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'GitBlobReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _start(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(self._cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                          stderr=subprocess.PIPE)
+        return self._proc
+
+    def _fail(self) -> None:
+        """Raise CalledProcessError for a cat-file process that went away"""
+        proc = self._proc
+        self._proc = None
+        stderr = b''
+        if proc is not None:
+            proc.kill()
+            stderr = proc.stderr.read()
+            proc.wait()
+        returncode = proc.returncode if proc is not None else -1
+        raise subprocess.CalledProcessError(returncode, self._cmd, stderr=stderr)
+
+    def _request(self, specs: List[str]) -> List[Optional[Tuple[str, bytes, bytes]]]:
+        """(sha, type, data) for each object name, in order; None when missing"""
+        request = b''.join(f"{spec}\n".encode() for spec in specs)
+        with self._lock:
+            proc = self._start()
+            # Feed requests from a thread: git starts answering before it has
+            # read everything, and a full stdout pipe would otherwise deadlock.
+            writer = threading.Thread(target=self._write, args=(proc, request), daemon=True)
+            writer.start()
+            try:
+                return [self._read_one(proc) for _ in specs]
+            finally:
+                writer.join()
+
+    def read_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[GitBlob]]:
+        """Fetch every (ref, path) pair in one pipelined round trip"""
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
+        objects = self._request([f"{ref}:{path}" for ref, path in pairs])
+        return {pair: GitBlob(obj[0], obj[2]) if obj is not None and obj[1] == b'blob' else None
+                for pair, obj in zip(pairs, objects)}
+
+    def object_id(self, spec: str) -> Optional[str]:
+        """SHA of any object name (e.g. 'origin/main^{tree}'), or None if it doesn't exist"""
+        obj = self._request([spec])[0]
+        return obj[0] if obj is not None else None
+
+    @staticmethod
+    def _write(proc: subprocess.Popen, request: bytes) -> None:
+        try:
+            proc.stdin.write(request)
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass
+
+    def _read_one(self, proc: subprocess.Popen) -> Optional[Tuple[str, bytes, bytes]]:
+        header = proc.stdout.readline()
+        if not header:
+            self._fail()
+        # A missing object echoes the requested name, which may contain spaces
+        if header.rstrip(b'\n').endswith((b' missing', b' ambiguous')):
+            return None
+        fields = header.rstrip(b'\n').rsplit(b' ', 2)
+        if len(fields) != 3:
+            self._fail()
+        sha, kind, size = fields
+        data = proc.stdout.read(int(size) + 1)[:-1]  # drop the trailing LF
+        return sha.decode(), kind, data
+
+    def read_blob(self, ref: str, path: str) -> Optional[GitBlob]:
+        """Return the blob (sha and bytes) of path at ref, or None if missing"""
+        return self.read_many([(ref, path)])[(ref, path)]
+
+    def read(self, ref: str, path: str) -> Optional[bytes]:
+        """Return the bytes of path at ref, or None if missing"""
+        blob = self.read_blob(ref, path)
+        return blob.data if blob is not None else None
+
+    def close(self) -> None:
+        """Stop the cat-file process"""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+
+def split_repo_path(build_file: Path) -> Tuple[Path, str]:
+    """
+    Split 'cl-ccl1/module/pom.xml' into the repository checkout and the path
+    inside it, e.g. (Path('cl-ccl1'), 'module/pom.xml').
+    """
+    parts = build_file.parts
+    if len(parts) < 2:
+        return Path('.'), build_file.as_posix()
+    return Path(parts[0]), Path(*parts[1:]).as_posix()
+
+
+def read_build_files(build_files: Iterable[Path], ref: str) -> Dict[Path, Optional[GitBlob]]:
+    """
+    Read many '<repo>/<path>' build files at ref, one cat-file process and one
+    round trip per repository. Repositories that aren't checked out map to None.
+    """
+    by_repo: Dict[Path, List[Tuple[Path, str]]] = {}
+    for build_file in build_files:
+        repo, path = split_repo_path(build_file)
+        by_repo.setdefault(repo, []).append((build_file, path))
+
+    blobs = {}
+    for repo, entries in by_repo.items():
+        if not repo.is_dir():
+            # Same as a missing file in worktree mode: the repo isn't mirrored here
+            blobs.update((build_file, None) for build_file, _ in entries)
+            continue
+        with GitBlobReader(repo) as reader:
+            found = reader.read_many((ref, path) for _, path in entries)
+        for build_file, path in entries:
+            blobs[build_file] = found[(ref, path)]
+    return blobs
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Canonical identity of the tracked libraries.
+
+The same library is spelled differently across the org: the Maven artifactId
+is `Util`, Ivy modules and the sample build files say `Cl_Util`, and
+email_config keys its teams by `CL_Util`; `Clpss_RateCLpolicy` and
+`Clpss_RateCLPolicy` differ only in case. Every spelling is folded into one
+canonical ID, the entry of config.SHARED_LIBRARIES, by a dict compiled once
+from:
+
+    SHARED_LIBRARIES                       the canonical IDs themselves
+    email_config.ARTIFACT_LIBRARIES        the display name of each ID
+    config.LIBRARY_ALIASES                 any other spelling; "group:name"
+                                           only applies to that Maven
+                                           groupId / Ivy org
+
+Matching is case-insensitive (str.casefold). resolve() is one dict lookup
+for a name seen before and never scans the alias list, so it can run on
+every dependency of every file. Names that don't resolve are remembered, and
+near_misses() reports the ones that look like a tracked library but aren't
+configured as one (a separator or a letter off), so a rename in some build
+file shows up instead of silently dropping the library from the scan.
+
+Parsers and the notifier share the index returned by identity_index().
+"""
+
+import difflib
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+_SEPARATORS = re.compile(r'[\W_]+')
+
+# Bounds on the per-process memo of raw spellings and on the unknown names kept for near_misses()
+MAX_SEEN = 100_000
+MAX_UNKNOWN = 10_000
+
+
+def _loose(name: str) -> str:
+    """Casefolded name without separators, for near-miss detection only"""
+    return _SEPARATORS.sub('', name.casefold())
+
+
+class IdentityIndex:
+    """Spelling (or groupId/org + spelling) -> canonical library ID"""
+    __slots__ = ('libraries', '_folded', '_qualified', '_seen', '_unknown')
+
+    def __init__(self, libraries: Iterable[str], aliases: Optional[Mapping[str, Iterable[str]]] = None):
+        self.libraries = list(libraries)
+        self._folded: Dict[str, str] = {}
+        self._qualified: Dict[Tuple[str, str], str] = {}
+        for library in self.libraries:
+            self._add(library, library)
+        for library, names in (aliases or {}).items():
+            if library not in self.libraries:
+                raise ValueError(f"alias for untracked library {library!r}")
+            for name in ([names] if isinstance(names, str) else names):
+                self._add(name, library)
+        # Raw spelling -> result, so a repeated name skips casefold(); unknown names map to None
+        self._seen: Dict[str, Optional[str]] = {}
+        self._unknown: Dict[str, None] = {}
+
+    def _add(self, name: str, library: str) -> None:
+        group, sep, bare = name.rpartition(':')
+        if sep:
+            key = (group.strip().casefold(), bare.strip().casefold())
+            table, existing = self._qualified, self._qualified.get(key)
+        else:
+            key = name.strip().casefold()
+            table, existing = self._folded, self._folded.get(key)
+        if existing is not None and existing != library:
+            raise ValueError(f"{name!r} is an alias of both {existing!r} and {library!r}")
+        table[key] = library
+
+    def resolve(self, name: Optional[str], group: Optional[str] = None) -> Optional[str]:
+        """Canonical ID for a dependency name (and its groupId/org), or None if it isn't tracked"""
+        if not name:
+            return None
+        if group and self._qualified:
+            library = self._qualified.get((group.strip().casefold(), name.strip().casefold()))
+            if library is not None:
+                return library
+        try:
+            return self._seen[name]
+        except KeyError:
+            pass
+        library = self._folded.get(name.strip().casefold())
+        if len(self._seen) >= MAX_SEEN:
+            self._seen.clear()
+        self._seen[name] = library
+        if library is None and len(self._unknown) < MAX_UNKNOWN:
+            self._unknown[name] = None
+        return library
+
+    def take_unknown(self) -> list:
+        """The unresolved names recorded so far, forgetting them (a worker hands them to its parent)"""
+        names = list(self._unknown)
+        self._unknown.clear()
+        return names
+
+    def add_unknown(self, names: Iterable[str]) -> None:
+        """Record unresolved names seen elsewhere, e.g. in a worker process"""
+        for name in names:
+            if len(self._unknown) >= MAX_UNKNOWN:
+                break
+            self._unknown[name] = None
+
+    def fingerprint(self) -> str:
+        """Short hash of every spelling -> library mapping, which changes whenever the aliases do"""
+        entries = sorted(self._folded.items()) + sorted(f"{group}:{name}\0{library}"
+                                                        for (group, name), library in self._qualified.items())
+        return hashlib.sha1(repr(entries).encode()).hexdigest()[:16]
+
+    def spellings(self, library: str) -> Tuple[str, ...]:
+        """Every casefolded name that resolves to library (the library itself if it isn't tracked)"""
+        names = {name for name, lib in self._folded.items() if lib == library}
+        names.update(bare for (_, bare), lib in self._qualified.items() if lib == library)
+        return tuple(sorted(names or {library.casefold()}))
+
+    def _loose_spellings(self) -> Dict[str, str]:
+        loose = {}
+        for spelling, library in self._folded.items():
+            loose.setdefault(_loose(spelling), library)
+        return loose
+
+    @staticmethod
+    def _closest(name: str, loose: Dict[str, str], cutoff: float) -> Optional[str]:
+        key = _loose(name)
+        if not key:
+            return None
+        library = loose.get(key)
+        if library is None:
+            close = difflib.get_close_matches(key, loose, n=1, cutoff=cutoff)
+            library = loose[close[0]] if close else None
+        return library
+
+    def suggest(self, name: str, cutoff: float = 0.6) -> Optional[str]:
+        """The tracked library an unresolved name most resembles, or None (for "did you mean" hints)"""
+        return self._closest(name, self._loose_spellings(), cutoff)
+
+    def near_misses(self, cutoff: float = 0.85) -> Dict[str, str]:
+        """{unresolved name seen so far: tracked library it probably means}"""
+        loose = self._loose_spellings()
+        misses = {}
+        for name in self._unknown:
+            library = self._closest(name, loose, cutoff)
+            if library is not None:
+                misses[name] = library
+        return misses
+
+    def rekey(self, mapping: Mapping[str, list]) -> Dict[str, list]:
+        """
+        A dict of lists keyed by any spelling (like LIBRARY_TEAMS) keyed by
+        canonical ID instead; the lists of two spellings of one library are joined
+        """
+        rekeyed: Dict[str, list] = {}
+        for name, values in mapping.items():
+            rekeyed.setdefault(self.resolve(name) or name, []).extend(values)
+        return rekeyed
+
+
+@lru_cache(maxsize=1)
+def identity_index() -> IdentityIndex:
+    """The index compiled from the configuration, shared by every parser"""
+    from .config import LIBRARY_ALIASES, SHARED_LIBRARIES
+    from .email_config import ARTIFACT_LIBRARIES
+
+    aliases: Dict[str, list] = {library: [] for library in SHARED_LIBRARIES}
+    for library, display in ARTIFACT_LIBRARIES.items():
+        if library in aliases:
+            aliases[library].append(display)
+    for library, names in LIBRARY_ALIASES.items():
+        aliases.setdefault(library, []).extend([names] if isinstance(names, str) else names)
+    return IdentityIndex(SHARED_LIBRARIES, aliases)
+
+
+def canonical(name: Optional[str], group: Optional[str] = None) -> Optional[str]:
+    """identity_index().resolve(), or the name itself when it isn't a tracked library"""
+    return identity_index().resolve(name, group) or name
+
+
+def report_near_misses(stream=None) -> Dict[str, str]:
+    """Print the unknown names that look like tracked libraries (to stderr by default)"""
+    import sys
+
+    misses = identity_index().near_misses()
+    for name, library in sorted(misses.items()):
+        print(f"⚠️  Dependency {name!r} looks like tracked library {library!r} but isn't configured as one; "
+              f"add it to LIBRARY_ALIASES if it is", file=stream or sys.stderr)
+    return misses
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Reverse-dependency index: which repos and modules must follow a library bump.
+
+For every tracked library the index keeps the rows (repo or repo/module, as
+in the comparison report) that declare it. A manifest repo that builds a
+shared library lists it under "provides":
+
+    {"name": "cl-common", "root": "cl-common", "provides": ["common"]}
+
+so a bump of a library it consumes also reaches everyone consuming what it
+provides. targets() answers "who must be updated" with a breadth-first walk
+over these edges; nothing is parsed at query time.
+
+The index is refreshed from scan results row by row (update_row only
+touches the libraries whose consumers changed) and persisted as a JSON
+snapshot, like the version matrix, by `compare --manifest ... --impact`.
+check-changes reads the snapshot at SHAREDLIBS_IMPACT_INDEX (default
+.cache/sharedlibs/impact.json) and falls back to DEFAULT_TARGETS without one.
+"""
+
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+SNAPSHOT_FORMAT = 1
+
+
+class Target(NamedTuple):
+    """A row that must be updated, for which changed libraries, and through which shared libraries"""
+    row: str
+    file: str
+    libraries: Tuple[str, ...] = ()  # empty: every changed library
+    via: Tuple[str, ...] = ()
+
+
+class _Row:
+    """What one row declares and builds"""
+    __slots__ = ('file', 'uses', 'provides')
+
+    def __init__(self, file: str, uses: Set[str], provides: Tuple[str, ...]):
+        self.file = file
+        self.uses = uses
+        self.provides = provides
+
+
+class ImpactIndex:
+    """library -> consuming rows, plus the libraries each row provides"""
+
+    def __init__(self, libraries: Iterable[str]):
+        self.libraries = list(libraries)
+        self._tracked = set(self.libraries)
+        self.rows: Dict[str, _Row] = {}
+        self._consumers: Dict[str, Dict[str, None]] = {lib: {} for lib in self.libraries}
+
+    def update_row(self, row: str, uses: Iterable[str], file: str = 'pom.xml',
+                   provides: Iterable[str] = ()) -> Set[str]:
+        """Replace one row's edges; returns the libraries whose consumers changed"""
+        old = self.rows.get(row)
+        new_uses = {lib for lib in uses if lib in self._tracked}
+        old_uses = old.uses if old else set()
+        for lib in old_uses - new_uses:
+            del self._consumers[lib][row]
+        for lib in new_uses - old_uses:
+            self._consumers[lib][row] = None
+        self.rows[row] = _Row(file, new_uses, tuple(lib for lib in provides if lib in self._tracked))
+        return old_uses ^ new_uses
+
+    def remove_row(self, row: str) -> Set[str]:
+        if row not in self.rows:
+            return set()
+        affected = self.update_row(row, ())
+        del self.rows[row]
+        return affected
+
+    def consumers(self, lib: str) -> List[str]:
+        """Rows that declare lib directly"""
+        return list(self._consumers.get(lib, ()))
+
+    def targets(self, libraries: Iterable[str], exclude: Iterable[str] = ()) -> List[Target]:
+        """
+        Every row reached from libraries, directly or through rows that
+        provide another shared library, in index order. Rows and repos in
+        exclude (the repository the change is made in) are walked through
+        but not listed.
+        """
+        excluded = set(exclude)
+        reached: Dict[str, Tuple[Dict[str, None], Tuple[str, ...]]] = {}
+        for root in libraries:
+            seen = {root}
+            queue = deque([(root, ())])
+            while queue:
+                lib, via = queue.popleft()
+                for row in self._consumers.get(lib, ()):
+                    # The first (shortest) path to a row is the one reported
+                    reached.setdefault(row, ({}, via))[0][root] = None
+                    for provided in self.rows[row].provides:
+                        if provided not in seen:
+                            seen.add(provided)
+                            queue.append((provided, via + (provided,)))
+        order = {row: index for index, row in enumerate(self.rows)}
+        return [Target(row, self.rows[row].file, tuple(libs), via)
+                for row, (libs, via) in sorted(reached.items(), key=lambda item: order[item[0]])
+                if row not in excluded and row.split('/', 1)[0] not in excluded]
+
+    def to_json(self) -> dict:
+        rows = {row: {'file': entry.file, 'uses': sorted(entry.uses), 'provides': list(entry.provides)}
+                for row, entry in self.rows.items()}
+        return {'format': SNAPSHOT_FORMAT, 'libraries': self.libraries, 'rows': rows}
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the snapshot atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], libraries: Iterable[str]) -> Optional['ImpactIndex']:
+        """Read a snapshot; None if it is missing, unreadable or for another library list"""
+        libraries = list(libraries)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('format') != SNAPSHOT_FORMAT or data.get('libraries') != libraries:
+            return None
+        index = cls(libraries)
+        for row, entry in data.get('rows', {}).items():
+            index.update_row(row, entry.get('uses', ()), entry.get('file', 'pom.xml'), entry.get('provides', ()))
+        return index
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Offline Maven model resolution for shared library versions.
+
+get_pom_versions reads <version> text literally, so `${common.version}`, a
+version managed by a parent's <dependencyManagement> or one imported from a
+BOM is reported verbatim or missed. MavenResolver builds the effective
+dependency versions from local files or git blobs, without running Maven:
+
+- parent POMs through <relativePath> (default ../pom.xml), then by GAV among
+  the POMs already seen and in a local repository (~/.m2/repository layout)
+- ${property} interpolation with project.*/parent properties, child wins
+- <dependencyManagement> inheritance and scope=import BOMs
+
+Inheritance is memoized per POM, so a reactor of hundreds of modules that
+share one parent parses and merges that parent exactly once. Profiles and
+settings.xml are not evaluated.
+"""
+
+import os
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .identity import canonical
+
+_PLACEHOLDER = re.compile(r'\$\{([^}]+)\}')
+_MAX_INTERPOLATION_DEPTH = 10
+_M2 = 'm2:'
+
+Key = Tuple[str, str]
+
+
+class Dependency(NamedTuple):
+    """A <dependency> as written, before interpolation"""
+    group_id: str
+    artifact_id: str
+    version: Optional[str]
+    type: str
+    scope: Optional[str]
+
+
+class ParentRef(NamedTuple):
+    group_id: Optional[str]
+    artifact_id: Optional[str]
+    version: Optional[str]
+    relative_path: Optional[str]
+
+
+class RawModel(NamedTuple):
+    """The parts of one pom.xml the resolver needs"""
+    group_id: Optional[str]
+    artifact_id: Optional[str]
+    version: Optional[str]
+    parent: Optional[ParentRef]
+    properties: Dict[str, str]
+    dependencies: List[Dependency]
+    managed: List[Dependency]
+
+
+class InheritedModel(NamedTuple):
+    """A POM merged with its ancestors, still uninterpolated"""
+    group_id: Optional[str]
+    artifact_id: Optional[str]
+    version: Optional[str]
+    properties: Dict[str, str]
+    dependencies: Dict[Key, Dependency]
+    managed: Dict[Key, Dependency]
+    imports: List[Dependency]
+
+
+class EffectiveModel(NamedTuple):
+    """Interpolated model: managed and declared (groupId, artifactId) -> version"""
+    group_id: Optional[str]
+    artifact_id: Optional[str]
+    version: Optional[str]
+    managed: Dict[Key, str]
+    dependencies: Dict[Key, Optional[str]]
+
+
+def _text(elem: Optional[ET.Element], tag: str) -> Optional[str]:
+    if elem is None:
+        return None
+    child = elem.find(tag)
+    if child is None or child.text is None:
+        return None
+    return child.text.strip()
+
+
+def _dependencies(container: Optional[ET.Element], ns: str) -> List[Dependency]:
+    deps = []
+    if container is None:
+        return deps
+    for dep in container.findall(f'{ns}dependency'):
+        artifact_id = _text(dep, f'{ns}artifactId')
+        if not artifact_id:
+            continue
+        deps.append(Dependency(_text(dep, f'{ns}groupId') or '', artifact_id, _text(dep, f'{ns}version'),
+                               _text(dep, f'{ns}type') or 'jar', _text(dep, f'{ns}scope')))
+    return deps
+
+
+def parse_model(data: bytes) -> RawModel:
+    """Parse the coordinates, parent, properties and dependency sections of a POM"""
+    root = ET.fromstring(data)
+    ns = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+
+    parent = None
+    parent_elem = root.find(f'{ns}parent')
+    if parent_elem is not None:
+        relative = parent_elem.find(f'{ns}relativePath')
+        if relative is None:
+            relative_path = '../pom.xml'
+        else:
+            relative_path = (relative.text or '').strip() or None
+        parent = ParentRef(_text(parent_elem, f'{ns}groupId'), _text(parent_elem, f'{ns}artifactId'),
+                           _text(parent_elem, f'{ns}version'), relative_path)
+
+    properties = {}
+    props_elem = root.find(f'{ns}properties')
+    if props_elem is not None:
+        for prop in props_elem:
+            name = prop.tag[len(ns):] if prop.tag.startswith(ns) else prop.tag
+            properties[name] = (prop.text or '').strip()
+
+    management = root.find(f'{ns}dependencyManagement')
+    managed = _dependencies(management.find(f'{ns}dependencies') if management is not None else None, ns)
+
+    return RawModel(_text(root, f'{ns}groupId'), _text(root, f'{ns}artifactId'), _text(root, f'{ns}version'),
+                    parent, properties, _dependencies(root.find(f'{ns}dependencies'), ns), managed)
+
+
+def interpolate(value: Optional[str], properties: Dict[str, str]) -> Optional[str]:
+    """Expand ${name} placeholders recursively; unknown ones are left as written"""
+    if value is None or '${' not in value:
+        return value
+    for _ in range(_MAX_INTERPOLATION_DEPTH):
+        expanded = _PLACEHOLDER.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+        if expanded == value or '${' not in expanded:
+            return expanded
+        value = expanded
+    return value
+
+
+class FileLoader:
+    """Reads POMs from the filesystem; locations are paths"""
+
+    def read(self, location: str) -> Optional[bytes]:
+        try:
+            with open(location, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def join(self, base: str, relative: str) -> str:
+        path = os.path.normpath(os.path.join(os.path.dirname(base), relative))
+        return path if path.endswith('.xml') or path.endswith('.pom') else os.path.join(path, 'pom.xml')
+
+
+class GitLoader:
+    """Reads POMs from git objects at a ref; locations are repo-relative paths"""
+
+    def __init__(self, reader, ref: str):
+        self.reader = reader
+        self.ref = ref
+
+    def read(self, location: str) -> Optional[bytes]:
+        return self.reader.read(self.ref, location)
+
+    def join(self, base: str, relative: str) -> str:
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(base), relative))
+        return path if path.endswith('.xml') or path.endswith('.pom') else posixpath.join(path, 'pom.xml')
+
+
+class MavenResolver:
+    """
+    Memoizing effective-model resolver over one loader plus an optional local
+    repository for parents and BOMs that are not next to the module.
+    """
+
+    def __init__(self, loader=None, local_repository: Union[str, Path, None] = None):
+        self.loader = loader or FileLoader()
+        self.local_repository = Path(local_repository) if local_repository else None
+        self._raw: Dict[str, Optional[RawModel]] = {}
+        self._inherited: Dict[str, InheritedModel] = {}
+        self._effective: Dict[str, EffectiveModel] = {}
+        self._by_gav: Dict[Tuple[str, str, str], str] = {}
+        self._in_progress: Set[str] = set()
+        self._importing: Set[str] = set()
+        self.unresolved: Set[str] = set()
+        self.parsed = 0
+        self.memo_hits = 0
+
+    def _read(self, location: str) -> Optional[bytes]:
+        if location.startswith(_M2):
+            try:
+                with open(location[len(_M2):], 'rb') as f:
+                    return f.read()
+            except OSError:
+                return None
+        return self.loader.read(location)
+
+    def raw_model(self, location: str) -> Optional[RawModel]:
+        """Parsed POM at location (memoized), None if it doesn't exist"""
+        if location in self._raw:
+            return self._raw[location]
+        data = self._read(location)
+        model = parse_model(data) if data is not None else None
+        if model is not None:
+            self.parsed += 1
+            group_id = model.group_id or (model.parent.group_id if model.parent else None)
+            version = model.version or (model.parent.version if model.parent else None)
+            if group_id and model.artifact_id and version:
+                self._by_gav.setdefault((group_id, model.artifact_id, version), location)
+        self._raw[location] = model
+        return model
+
+    def loaded_locations(self) -> List[str]:
+        """Locations read through the loader so far (not the local repository), found or not"""
+        return [location for location in self._raw if not location.startswith(_M2)]
+
+    def locate(self, group_id: str, artifact_id: str, version: str) -> Optional[str]:
+        """Location of a POM by coordinates: POMs seen so far, then the local repository"""
+        location = self._by_gav.get((group_id, artifact_id, version))
+        if location is not None:
+            return location
+        if self.local_repository is not None and group_id and artifact_id and version:
+            path = (self.local_repository / group_id.replace('.', '/') / artifact_id / version
+                    / f'{artifact_id}-{version}.pom')
+            if path.exists():
+                return _M2 + str(path)
+        return None
+
+    def _parent_location(self, location: str, parent: ParentRef) -> Optional[str]:
+        if parent.relative_path and not location.startswith(_M2):
+            candidate = self.loader.join(location, parent.relative_path)
+            model = self.raw_model(candidate)
+            if model is not None and model.artifact_id == parent.artifact_id:
+                return candidate
+        return self.locate(parent.group_id or '', parent.artifact_id or '', parent.version or '')
+
+    def inherited(self, location: str) -> Optional[InheritedModel]:
+        """The POM at location merged with its ancestors (memoized)"""
+        if location in self._inherited:
+            self.memo_hits += 1
+            return self._inherited[location]
+        raw = self.raw_model(location)
+        if raw is None or location in self._in_progress:
+            return None
+
+        self._in_progress.add(location)
+        try:
+            base = None
+            if raw.parent is not None:
+                parent_location = self._parent_location(location, raw.parent)
+                base = self.inherited(parent_location) if parent_location else None
+                if base is None:
+                    self.unresolved.add(f"{raw.parent.group_id}:{raw.parent.artifact_id}:{raw.parent.version}")
+        finally:
+            self._in_progress.discard(location)
+
+        group_id = raw.group_id or (base.group_id if base else None) or (raw.parent.group_id if raw.parent else None)
+        version = raw.version or (base.version if base else None) or (raw.parent.version if raw.parent else None)
+
+        properties = dict(base.properties) if base else {}
+        if base is not None:
+            properties.update({'project.parent.groupId': base.group_id or '',
+                               'project.parent.artifactId': base.artifact_id or '',
+                               'project.parent.version': base.version or ''})
+        properties.update(raw.properties)
+        properties.update({'project.groupId': group_id or '', 'project.artifactId': raw.artifact_id or '',
+                           'project.version': version or '', 'pom.groupId': group_id or '',
+                           'pom.artifactId': raw.artifact_id or '', 'pom.version': version or ''})
+
+        dependencies = dict(base.dependencies) if base else {}
+        dependencies.update(((d.group_id, d.artifact_id), d) for d in raw.dependencies)
+        managed = dict(base.managed) if base else {}
+        imports = []
+        for dep in raw.managed:
+            if dep.scope == 'import' and dep.type == 'pom':
+                imports.append(dep)
+            else:
+                managed[(dep.group_id, dep.artifact_id)] = dep
+        if base is not None:
+            imports.extend(base.imports)
+
+        model = InheritedModel(group_id, raw.artifact_id, version, properties, dependencies, managed, imports)
+        self._inherited[location] = model
+        return model
+
+    def effective(self, location: str) -> Optional[EffectiveModel]:
+        """Interpolated model with BOM imports applied (memoized)"""
+        if location in self._effective:
+            self.memo_hits += 1
+            return self._effective[location]
+        model = self.inherited(location)
+        if model is None or location in self._importing:
+            return None
+
+        props = model.properties
+        managed = {}
+        for (group_id, artifact_id), dep in model.managed.items():
+            managed[(interpolate(group_id, props), interpolate(artifact_id, props))] = interpolate(dep.version, props)
+
+        # Imported entries never override what is already managed; the
+        # nearest, first-declared import wins among BOMs.
+        self._importing.add(location)
+        try:
+            for dep in model.imports:
+                gav = (interpolate(dep.group_id, props), interpolate(dep.artifact_id, props),
+                       interpolate(dep.version, props) or '')
+                bom_location = self.locate(*gav)
+                bom = self.effective(bom_location) if bom_location else None
+                if bom is None:
+                    self.unresolved.add(':'.join(gav))
+                    continue
+                for key, version in bom.managed.items():
+                    managed.setdefault(key, version)
+        finally:
+            self._importing.discard(location)
+
+        dependencies = {}
+        for (group_id, artifact_id), dep in model.dependencies.items():
+            key = (interpolate(group_id, props), interpolate(artifact_id, props))
+            version = interpolate(dep.version, props) if dep.version else managed.get(key)
+            dependencies[key] = version
+
+        effective = EffectiveModel(model.group_id, model.artifact_id, model.version, managed, dependencies)
+        self._effective[location] = effective
+        return effective
+
+    def resolve_versions(self, location: str, tracked: Iterable[str]) -> Dict[str, str]:
+        """
+        {artifactId: effective version} for tracked libraries declared (directly
+        or through a parent) by the POM at location, then managed ones, like
+        get_pom_versions
+        """
+        wanted = set(tracked)
+        versions = {}
+        model = self.effective(location)
+        if model is None:
+            return versions
+        # Parent/aggregator POMs often only manage versions; report those too,
+        # as the literal extractor does for <dependencyManagement> entries
+        for declared in (model.dependencies, model.managed):
+            for (group_id, artifact_id), version in declared.items():
+                library = canonical(artifact_id, group_id)
+                if library in wanted and version and library not in versions:
+                    versions[library] = version
+        return versions
+
+
+def needs_resolution(data: bytes) -> bool:
+    """
+    Cheap byte check for POMs whose versions can't be read literally: ones
+    with a parent, ${...} placeholders or BOM imports
+    """
+    return b'<parent>' in data or b'${' in data or b'<scope>import</scope>' in data
+
+
+def default_local_repository() -> Optional[Path]:
+    """$SHAREDLIBS_MAVEN_REPO, else ~/.m2/repository if it exists"""
+    configured = os.environ.get('SHAREDLIBS_MAVEN_REPO')
+    if configured:
+        return Path(configured)
+    path = Path.home() / '.m2' / 'repository'
+    return path if path.is_dir() else None
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Text of the shared library change notifications: the PR comment / Teams
+message, the email body and the change classification they share.
+
+Split from check_version_changes so the notifier renders its messages
+without importing the parsers, the parse cache or git plumbing; only the
+standard library and the configuration modules are loaded here.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .config import DEFAULT_IMPACT_INDEX, DEFAULT_TARGETS, SHARED_LIBRARIES
+from .impact_index import ImpactIndex, Target
+from .versioning import classify_change, library_display_name, needs_escalation
+
+
+def classify_changes(changed_libs: List[Tuple[str, str, str]]) -> Dict[str, str]:
+    """Bump kind (major, minor, patch, downgrade, range-satisfied, ...) per changed library"""
+    return {lib: classify_change(old_ver, new_ver) for lib, old_ver, new_ver in changed_libs}
+
+
+def escalated_libraries(kinds: Dict[str, str]) -> List[str]:
+    """Changed critical libraries whose change kind requires escalation"""
+    return [lib for lib, kind in kinds.items() if needs_escalation(lib, kind)]
+
+
+def find_update_targets(changed_libs: List[Tuple[str, str, str]]) -> Optional[List[Target]]:
+    """
+    Repos and modules that consume the changed libraries, directly or through
+    another shared library, from the impact index; None without an index
+    """
+    path = os.environ.get('SHAREDLIBS_IMPACT_INDEX') or DEFAULT_IMPACT_INDEX
+    index = ImpactIndex.load(path, SHARED_LIBRARIES)
+    if index is None:
+        return None
+    this_repo = os.environ.get('GITHUB_REPOSITORY', '').rsplit('/', 1)[-1]
+    return index.targets([lib for lib, _, _ in changed_libs], exclude=[this_repo] if this_repo else [])
+
+
+def _targets_for(changed_libs: List[Tuple[str, str, str]], targets: Optional[List[Target]]) -> List[Target]:
+    """targets restricted to changed_libs, or DEFAULT_TARGETS when there is no index"""
+    if targets is None:
+        return [Target(row, file) for row, file in DEFAULT_TARGETS]
+    wanted = {lib for lib, _, _ in changed_libs}
+    return [t for t in targets if wanted.intersection(t.libraries)]
+
+
+def _describe_target(target: Target, changed_libs: List[Tuple[str, str, str]]) -> str:
+    """'(file)', plus the changed libraries that reach the target when not all do, and through what"""
+    text = f"({target.file})"
+    libraries = [lib for lib in target.libraries if any(lib == changed[0] for changed in changed_libs)]
+    if libraries and len(libraries) < len(changed_libs):
+        text += f": {', '.join(libraries)}"
+    if target.via:
+        text += f" via {' → '.join(target.via)}"
+    return text
+
+
+def generate_notification_message(changed_libs: List[Tuple[str, str, str]],
+                                  kinds: Optional[Dict[str, str]] = None,
+                                  targets: Optional[List[Target]] = None) -> str:
+    """Generate notification message for changed libraries (targets from find_update_targets)"""
+    kinds = kinds if kinds is not None else classify_changes(changed_libs)
+    targets = _targets_for(changed_libs, targets)
+    message = "🚨 **Shared Library Version Changes Detected** 🚨\n\n"
+    message += "The following shared libraries have been updated in `pom.xml`:\n\n"
+    
+    for lib, old_ver, new_ver in changed_libs:
+        message += f"• **{lib}**: `{old_ver}` → `{new_ver}` ({kinds[lib]})\n"
+    
+    escalated = escalated_libraries(kinds)
+    if escalated:
+        names = ", ".join(f"{library_display_name(lib)} ({kinds[lib]})" for lib in escalated)
+        message += f"\n🔺 **Escalated:** critical library change: {names}\n"
+    
+    if targets:
+        message += "\n⚠️ **Action Required:**\n"
+        message += "Please ensure you also update the corresponding versions in:\n"
+        for target in targets:
+            message += f"- **{target.row}** {_describe_target(target, changed_libs)}\n"
+        message += "\nKeeping these aligned prevents runtime incompatibilities.\n"
+    else:
+        message += "\nNo other repository consumes these libraries, so nothing else needs updating.\n"
+    message += "Thank you for keeping our dependencies in sync! 🙏\n\n"
+    message += "---\n"
+    message += "*This is an automated notification from the CI/CD pipeline.*"
+    
+    return message
+
+
+def generate_email_body(changed_libs: List[Tuple[str, str, str]], pr_author: str, pr_url: str,
+                        kinds: Optional[Dict[str, str]] = None, targets: Optional[List[Target]] = None) -> str:
+    """Generate email body for notifications (targets from find_update_targets)"""
+    kinds = kinds if kinds is not None else classify_changes(changed_libs)
+    targets = _targets_for(changed_libs, targets)
+    body = f"Hello Team,\n\n"
+    body += f"Shared library versions have been updated in the cl-clpss repository.\n\n"
+    body += f"PR Author: {pr_author}\n"
+    body += f"PR URL: {pr_url}\n\n"
+    body += f"Changed Libraries:\n"
+    
+    for lib, old_ver, new_ver in changed_libs:
+        body += f"• {lib}: {old_ver} → {new_ver} ({kinds[lib]})\n"
+    
+    escalated = escalated_libraries(kinds)
+    if escalated:
+        names = ", ".join(f"{library_display_name(lib)} ({kinds[lib]})" for lib in escalated)
+        body += f"\nESCALATED - critical library change: {names}\n"
+    
+    if targets:
+        body += f"\nPlease update the corresponding versions in:\n"
+        for target in targets:
+            body += f"- {target.row} {_describe_target(target, changed_libs)}\n"
+        body += f"\nKeeping these aligned prevents runtime incompatibilities.\n\n"
+    else:
+        body += f"\nNo other repository consumes these libraries.\n\n"
+    body += f"Best regards,\n"
+    body += f"Automated CI/CD System"
+    
+    return body
+
+
+def _target_rows(lib: str, targets: List[Target]) -> List[str]:
+    """Rows among targets (see _targets_for) that must align lib"""
+    return [t.row for t in targets if not t.libraries or lib in t.libraries]
+
+
+def get_pr_info() -> Tuple[str, str]:
+    """Get PR author and URL from GitHub environment"""
+    pr_author = os.environ.get('GITHUB_ACTOR', 'Unknown')
+    repo = os.environ.get('GITHUB_REPOSITORY', 'unknown/unknown')
+    pr_number = os.environ.get('GITHUB_PR_NUMBER', '0')
+    pr_url = f"https://github.com/{repo}/pull/{pr_number}"
+    
+    return pr_author, pr_url
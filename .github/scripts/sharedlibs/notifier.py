@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Deliver shared library change notifications by email and Teams webhook.
+
+Recipients come from email_config: PRIMARY_EMAIL and TEAM_EMAILS get every
+change, LIBRARY_TEAMS get the changes of their libraries, and
+ESCALATION_EMAILS get the changes that needs_escalation() flags. Addresses
+are deduplicated across those lists and grouped by the set of changes they
+must see, so each distinct message is rendered once and sent once (with all
+of its recipients) over a single SMTP connection. Teams webhooks are posted
+concurrently from an asyncio loop, at most --webhook-concurrency at a time.
+
+Usage (in the workflow, after check_version_changes.py):
+    SHAREDLIBS_CHANGES='[["Util", "2.1.1", "3.0.0"]]' python .github/scripts/notifier.py
+    python .github/scripts/notifier.py --changes '[["Util", "2.1.1", "3.0.0"]]' --dry-run
+
+SMTP settings are read from SMTP_HOST, SMTP_PORT, SMTP_USERNAME,
+SMTP_PASSWORD and SMTP_SECURITY (ssl, starttls or none; ssl on port 465).
+TEAMS_WEBHOOK_URL may hold several URLs separated by whitespace or commas.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .messages import (classify_changes, find_update_targets, generate_email_body, generate_notification_message,
+                       get_pr_info)
+from .email_config import (ESCALATION_EMAILS, LIBRARY_TEAMS, LIBRARY_WEBHOOKS, PRIMARY_EMAIL,
+                          TEAM_EMAILS)
+from .identity import canonical, identity_index
+from .impact_index import Target
+from .spans import add_profile_argument, emit, profiled, span
+from .versioning import needs_escalation
+
+if TYPE_CHECKING:
+    from email.message import EmailMessage
+
+SUBJECT = "🚨 Shared Library Version Updated - cl-clpss Repository"
+DEFAULT_WEBHOOK_CONCURRENCY = 4
+DEFAULT_WEBHOOK_TIMEOUT = 10.0
+
+Change = Tuple[str, str, str]
+
+
+class Delivery(NamedTuple):
+    """One distinct message: the changes it covers and everyone who receives it"""
+    libraries: Tuple[str, ...]
+    targets: Tuple[str, ...]
+    escalated: bool
+
+
+class SmtpSettings(NamedTuple):
+    host: str
+    port: int
+    username: Optional[str] = None
+    password: Optional[str] = None
+    security: str = 'ssl'
+    sender: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> Optional['SmtpSettings']:
+        host = os.environ.get('SMTP_HOST')
+        if not host:
+            return None
+        port = int(os.environ.get('SMTP_PORT', '465'))
+        security = os.environ.get('SMTP_SECURITY') or ('ssl' if port == 465 else 'starttls')
+        username = os.environ.get('SMTP_USERNAME') or None
+        return cls(host, port, username, os.environ.get('SMTP_PASSWORD') or None, security,
+                   os.environ.get('SMTP_FROM') or username)
+
+
+def _group(targets: Dict[str, Tuple[str, List[str]]], changed_libs: List[Change],
+           escalated: Iterable[str]) -> List[Delivery]:
+    """Turn {key: (target, [libs])} into one Delivery per distinct library set"""
+    order = {lib: i for i, (lib, _, _) in enumerate(changed_libs)}
+    escalated = set(escalated)
+    groups: Dict[Tuple[str, ...], List[str]] = {}
+    for target, libs in targets.values():
+        key = tuple(sorted(set(libs), key=order.__getitem__))
+        if key:
+            groups.setdefault(key, []).append(target)
+    return [Delivery(libs, tuple(group), any(lib in escalated for lib in libs))
+            for libs, group in groups.items()]
+
+
+def plan_emails(changed_libs: List[Change], kinds: Dict[str, str]) -> List[Delivery]:
+    """Deduplicated recipients grouped by the changes each one must see"""
+    all_libs = [lib for lib, _, _ in changed_libs]
+    escalated = [lib for lib in all_libs if needs_escalation(lib, kinds[lib])]
+    # Case-insensitive address -> (address as first written, libraries)
+    recipients: Dict[str, Tuple[str, List[str]]] = {}
+
+    def add(address: str, libs: Iterable[str]) -> None:
+        entry = recipients.setdefault(address.strip().lower(), (address.strip(), []))
+        entry[1].extend(libs)
+
+    for address in [PRIMARY_EMAIL] + TEAM_EMAILS:
+        add(address, all_libs)
+    teams = identity_index().rekey(LIBRARY_TEAMS)
+    for lib in all_libs:
+        for address in teams.get(canonical(lib), []):
+            add(address, [lib])
+    for address in ESCALATION_EMAILS:
+        add(address, escalated)
+    return _group(recipients, changed_libs, escalated)
+
+
+def plan_webhooks(changed_libs: List[Change], kinds: Dict[str, str], urls: Iterable[str]) -> List[Delivery]:
+    """Channel webhooks get every change; LIBRARY_WEBHOOKS get their library's"""
+    all_libs = [lib for lib, _, _ in changed_libs]
+    escalated = [lib for lib in all_libs if needs_escalation(lib, kinds[lib])]
+    hooks: Dict[str, Tuple[str, List[str]]] = {}
+    for url in urls:
+        hooks.setdefault(url, (url, []))[1].extend(all_libs)
+    library_hooks = identity_index().rekey(LIBRARY_WEBHOOKS)
+    for lib in all_libs:
+        for url in library_hooks.get(canonical(lib), []):
+            hooks.setdefault(url, (url, []))[1].append(lib)
+    return _group(hooks, changed_libs, escalated)
+
+
+def _subset(changed_libs: List[Change], libraries: Tuple[str, ...]) -> List[Change]:
+    wanted = set(libraries)
+    return [change for change in changed_libs if change[0] in wanted]
+
+
+def render_email(delivery: Delivery, changed_libs: List[Change], kinds: Dict[str, str],
+                 pr_author: str, pr_url: str, sender: str, targets: Optional[List[Target]] = None) -> 'EmailMessage':
+    from email.message import EmailMessage
+
+    message = EmailMessage()
+    message['Subject'] = f"[ESCALATED] {SUBJECT}" if delivery.escalated else SUBJECT
+    message['From'] = sender
+    message['To'] = ', '.join(delivery.targets)
+    body = generate_email_body(_subset(changed_libs, delivery.libraries), pr_author, pr_url, kinds, targets)
+    body += "\n\n---\nThis is an automated notification. Please do not reply to this email."
+    message.set_content(body)
+    return message
+
+
+def render_webhook(delivery: Delivery, changed_libs: List[Change], kinds: Dict[str, str],
+                   targets: Optional[List[Target]] = None) -> bytes:
+    text = generate_notification_message(_subset(changed_libs, delivery.libraries), kinds, targets)
+    card = {
+        "@type": "MessageCard",
+        "@context": "http://schema.org/extensions",
+        "summary": "Shared library version changes",
+        "themeColor": "D70000" if delivery.escalated else "FFA500",
+        "text": text,
+    }
+    return json.dumps(card).encode('utf-8')
+
+
+def send_emails(messages: List['EmailMessage'], settings: SmtpSettings) -> int:
+    """Send every message over one SMTP connection; returns the number sent"""
+    if not messages:
+        return 0
+    import smtplib
+    import ssl
+
+    if settings.security == 'ssl':
+        server = smtplib.SMTP_SSL(settings.host, settings.port, context=ssl.create_default_context())
+    else:
+        server = smtplib.SMTP(settings.host, settings.port)
+    with server:
+        if settings.security == 'starttls':
+            server.starttls(context=ssl.create_default_context())
+        if settings.username and settings.password:
+            server.login(settings.username, settings.password)
+        for message in messages:
+            server.send_message(message)
+    return len(messages)
+
+
+async def _post(url: str, body: bytes, timeout: float) -> int:
+    """POST body to url with a minimal HTTP/1.1 client; returns the status code"""
+    import asyncio
+    import ssl
+
+    parts = urlsplit(url)
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port, ssl=ssl.create_default_context() if secure else None),
+        timeout)
+    try:
+        request = (f"POST {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                   f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                   f"Connection: close\r\n\r\n").encode('latin-1') + body
+        writer.write(request)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        match = re.match(rb'HTTP/\d(?:\.\d)? (\d{3})', status_line)
+        if not match:
+            raise ConnectionError(f"malformed response from {parts.netloc}")
+        return int(match.group(1))
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, ssl.SSLError):
+            pass
+
+
+async def post_webhooks(jobs: List[Tuple[str, bytes]], concurrency: int = DEFAULT_WEBHOOK_CONCURRENCY,
+                        timeout: float = DEFAULT_WEBHOOK_TIMEOUT) -> List[Tuple[str, Optional[int], Optional[str]]]:
+    """Post all (url, body) jobs, at most `concurrency` in flight; returns (url, status, error)"""
+    import asyncio
+
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(url: str, body: bytes):
+        async with limit:
+            try:
+                return url, await _post(url, body, timeout), None
+            except (OSError, asyncio.TimeoutError, ConnectionError) as e:
+                return url, None, str(e) or type(e).__name__
+
+    return await asyncio.gather(*(one(url, body) for url, body in jobs))
+
+
+def webhook_urls_from_env() -> List[str]:
+    return [url for url in re.split(r'[\s,]+', os.environ.get('TEAMS_WEBHOOK_URL', '')) if url]
+
+
+def dispatch(changed_libs: List[Change], settings: Optional[SmtpSettings], webhook_urls: List[str],
+             pr_author: str, pr_url: str, concurrency: int = DEFAULT_WEBHOOK_CONCURRENCY,
+             dry_run: bool = False) -> Dict[str, int]:
+    """Plan, render and deliver all notifications for changed_libs"""
+    with span('plan'):
+        kinds = classify_changes(changed_libs)
+        email_plan = plan_emails(changed_libs, kinds)
+        webhook_plan = plan_webhooks(changed_libs, kinds, webhook_urls)
+        targets = find_update_targets(changed_libs)
+    stats = {'emails': 0, 'email_recipients': sum(len(d.targets) for d in email_plan),
+             'webhooks': 0, 'webhook_failures': 0}
+
+    for delivery in email_plan:
+        print(f"  ✉️  {', '.join(delivery.libraries)} → {', '.join(delivery.targets)}"
+              f"{' (escalated)' if delivery.escalated else ''}")
+    for delivery in webhook_plan:
+        print(f"  💬 {', '.join(delivery.libraries)} → {len(delivery.targets)} webhook(s)")
+    if dry_run:
+        return stats
+
+    if settings is None:
+        print("SMTP_HOST not set; skipping email delivery")
+    else:
+        sender = settings.sender or PRIMARY_EMAIL
+        with span('render emails'):
+            messages = [render_email(d, changed_libs, kinds, pr_author, pr_url, sender, targets)
+                        for d in email_plan]
+        with span('send emails'):
+            stats['emails'] = send_emails(messages, settings)
+
+    jobs = []
+    for delivery in webhook_plan:
+        body = render_webhook(delivery, changed_libs, kinds, targets)
+        jobs.extend((url, body) for url in delivery.targets)
+    if jobs:
+        import asyncio
+
+        with span('post webhooks'):
+            results = asyncio.run(post_webhooks(jobs, concurrency))
+        for url, status, error in results:
+            ok = status is not None and 200 <= status < 300
+            stats['webhooks' if ok else 'webhook_failures'] += 1
+            if not ok:
+                host = urlsplit(url).hostname
+                print(f"❌ Webhook post to {host} failed: {error or f'HTTP {status}'}")
+    return stats
+
+
+def notify(args) -> int:
+    """Send the notifications for the parsed command line; 0 when everything was delivered"""
+    try:
+        changed_libs = [tuple(change) for change in json.loads(args.changes or '[]')]
+    except ValueError as e:
+        print(f"Invalid --changes JSON: {e}")
+        return 2
+    if not changed_libs:
+        print("No shared library version changes to notify.")
+        return 0
+
+    import smtplib  # only for its exception type; delivery modules load on first use
+
+    pr_author, pr_url = get_pr_info()
+    print(f"Notifying about {len(changed_libs)} changed libraries:")
+    try:
+        stats = dispatch(changed_libs, SmtpSettings.from_env(), webhook_urls_from_env(), pr_author, pr_url,
+                         args.webhook_concurrency, args.dry_run)
+    except (smtplib.SMTPException, OSError) as e:
+        print(f"❌ Email delivery failed: {e}")
+        return 1
+    if args.dry_run:
+        print(f"Dry run: {stats['email_recipients']} email recipients, nothing sent")
+        return 0
+    print(f"Sent {stats['emails']} emails to {stats['email_recipients']} recipients, "
+          f"{stats['webhooks']} webhook posts ({stats['webhook_failures']} failed)")
+    return 1 if stats['webhook_failures'] else 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Send shared library change notifications")
+    parser.add_argument('--changes', default=os.environ.get('SHAREDLIBS_CHANGES', ''),
+                        help="JSON list of [library, old, new] (default: $SHAREDLIBS_CHANGES)")
+    parser.add_argument('--webhook-concurrency', type=int, default=DEFAULT_WEBHOOK_CONCURRENCY,
+                        help="maximum concurrent Teams webhook posts")
+    parser.add_argument('--dry-run', action='store_true', help="print the delivery plan without sending")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+
+    with profiled(args.profile):
+        status = notify(args)
+    emit("Shared library notification timings")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
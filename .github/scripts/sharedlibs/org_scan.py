@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Parallel org-wide scan of build files listed in a manifest.
+
+Manifest format (paths are relative to the manifest's directory):
+
+    {
+      "repos": [
+        {"name": "cl-clpss", "root": "cl-clpss", "files": ["pom.xml"]},
+        {"name": "cl-jobserver", "root": "cl-jobserver",
+         "files": ["ivy.xml", "modules/scheduler/ivy.xml"]},
+        {"name": "cl-ccl1", "root": "cl-ccl1"}
+      ]
+    }
+
+A repo without "files" is walked for every pom.xml and ivy.xml (see
+discovery.py). "provides" lists the shared libraries a repo builds, for the
+impact index (see impact_index.py).
+
+Build files are sharded and parsed on a concurrent.futures thread or process
+pool, with at most a few shards per worker in flight. Each worker returns
+compact {row: {library: version}} maps which are merged, in input order, into
+one table keyed like the existing report: the repo name for a file at the
+repo root, and "repo/module/dir" for nested modules.
+"""
+
+import itertools
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .dependency_stream import stream_versions
+from .identity import identity_index
+from .discovery import walk_build_files
+
+DEFAULT_SHARD_SIZE = 64
+# Shards submitted per worker before the oldest one is merged
+PENDING_PER_WORKER = 2
+
+
+class ScanTask(NamedTuple):
+    """One build file to parse, and the report row it belongs to"""
+    row: str
+    path: str
+    kind: str
+
+
+def build_file_kind(path: str) -> Optional[str]:
+    """Return 'maven' or 'ivy' from a build file name, None if unknown"""
+    name = os.path.basename(path)
+    if name == 'pom.xml' or name.endswith('.pom'):
+        return 'maven'
+    if name == 'ivy.xml' or name.endswith('-ivy.xml'):
+        return 'ivy'
+    return None
+
+
+def row_name(repo: str, relative_file: str) -> str:
+    """Report row for a build file: the repo for root files, 'repo/dir' for modules"""
+    module_dir = os.path.dirname(relative_file.replace('\\', '/'))
+    return f"{repo}/{module_dir}" if module_dir else repo
+
+
+def iter_manifest_tasks(manifest_path: Path) -> Iterator[ScanTask]:
+    """
+    Lazily expand a manifest into one ScanTask per build file. Repos without a
+    "files" list are walked with discovery.walk_build_files, so tasks for the
+    first modules are produced before the walk of a large repo finishes.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base = manifest_path.parent
+    for repo in manifest.get('repos', []):
+        name = repo['name']
+        root = base / repo.get('root', name)
+        entries = repo.get('files')
+        if entries is None:
+            entries = walk_build_files(str(root))
+        for entry in entries:
+            if isinstance(entry, dict):
+                relative, kind = entry['path'], entry.get('type')
+            else:
+                relative, kind = entry, None
+            kind = kind or build_file_kind(relative)
+            if kind is None:
+                raise ValueError(f"Cannot tell the build file type of {name}/{relative}")
+            yield ScanTask(row_name(name, relative), str(root / relative), kind)
+
+
+def load_manifest(manifest_path: Path) -> List[ScanTask]:
+    """Read a manifest and expand it into one ScanTask per build file"""
+    return list(iter_manifest_tasks(manifest_path))
+
+
+def tasks_for_paths(manifest_path: Path, paths: Iterable[str]) -> List[ScanTask]:
+    """
+    ScanTasks for individual build files of the manifest's repos, without
+    walking any repo: a path belongs to the repo whose root contains it, and
+    must be listed in that repo's "files" when it has one. Other paths are
+    skipped.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base = manifest_path.parent
+    repos = []
+    for repo in manifest.get('repos', []):
+        root = base / repo.get('root', repo['name'])
+        listed = None
+        if repo.get('files') is not None:
+            listed = {}
+            for entry in repo['files']:
+                relative, kind = (entry['path'], entry.get('type')) if isinstance(entry, dict) else (entry, None)
+                listed[os.path.normpath(relative)] = kind
+        repos.append((repo['name'], root, os.path.abspath(root), listed))
+
+    tasks = []
+    for path in paths:
+        absolute = os.path.abspath(path)
+        for name, root, absolute_root, listed in repos:
+            if os.path.commonpath([absolute, absolute_root]) != absolute_root:
+                continue
+            relative = os.path.relpath(absolute, absolute_root)
+            if listed is not None and relative not in listed:
+                break
+            kind = (listed or {}).get(relative) or build_file_kind(relative)
+            if kind is not None:
+                tasks.append(ScanTask(row_name(name, relative), str(root / relative), kind))
+            break
+    return tasks
+
+
+def load_provides(manifest_path: Path) -> Dict[str, List[str]]:
+    """{repo: shared libraries it builds} from the manifest's "provides" lists"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {repo['name']: list(repo['provides']) for repo in manifest.get('repos', []) if repo.get('provides')}
+
+
+def scan_shard(shard: List[ScanTask], tracked: Tuple[str, ...]) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
+    """
+    Worker entry point: parse a shard of build files and return their version
+    maps, plus the dependency names the identity index couldn't resolve (a
+    process worker's index isn't the parent's, so they'd be lost otherwise).
+    Missing or unparsable files produce an empty map for their row.
+    """
+    result: Dict[str, Dict[str, str]] = {}
+    for task in shard:
+        versions = result.setdefault(task.row, {})
+        if not os.path.exists(task.path):
+            continue
+        try:
+            for lib, version in stream_versions(task.path, task.kind, tracked).items():
+                versions.setdefault(lib, version)
+        except ET.ParseError as e:
+            print(f"Error parsing {task.path}: {e}", file=sys.stderr)
+    return result, identity_index().take_unknown()
+
+
+def _shards(tasks: Iterable[ScanTask], shard_size: int) -> Iterator[List[ScanTask]]:
+    shard = []
+    for task in tasks:
+        shard.append(task)
+        if len(shard) == shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def make_executor(kind: str, workers: Optional[int]) -> Executor:
+    """Create a 'process' or 'thread' pool with the given worker count"""
+    if kind == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=workers)
+    raise ValueError(f"Unknown executor type: {kind}")
+
+
+def scan(tasks: Iterable[ScanTask], tracked: Iterable[str], workers: Optional[int] = None,
+         executor: str = 'process', shard_size: int = DEFAULT_SHARD_SIZE,
+         on_result: Optional[Callable[[Dict[str, Dict[str, str]]], None]] = None
+         ) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Parse every task on a pool and merge the per-shard results into
+    {row: {library: version}}, ordered like the input.
+
+    tasks may be a generator (e.g. a discovery walk): shards are submitted as
+    they fill up, so parsing overlaps with producing the tasks, but no more
+    than PENDING_PER_WORKER per worker are in flight; the oldest is merged
+    before another is submitted, so memory doesn't grow with the manifest.
+    workers=1 runs inline without a pool, which is also the baseline for
+    measuring how the scan scales. With on_result, each shard's
+    {row: {library: version}} is handed to it in input order instead of
+    being merged, and scan() returns None; a row whose files straddle two
+    shards arrives twice, and the first file's versions win.
+    """
+    tracked = tuple(tracked)
+    order: Dict[str, None] = {}
+    merged: Dict[str, Dict[str, str]] = {}
+
+    def ordered(source: Iterable[ScanTask]) -> Iterator[ScanTask]:
+        for task in source:
+            order[task.row] = None
+            yield task
+
+    def merge(shard_result: Tuple[Dict[str, Dict[str, str]], List[str]]) -> None:
+        result, unknown = shard_result
+        identity_index().add_unknown(unknown)
+        if on_result is not None:
+            on_result(result)
+            return
+        for row, versions in result.items():
+            row_versions = merged.setdefault(row, {})
+            for lib, version in versions.items():
+                row_versions.setdefault(lib, version)
+
+    shards = _shards(ordered(tasks) if on_result is None else tasks, shard_size)
+    if workers == 1:
+        for shard in shards:
+            merge(scan_shard(shard, tracked))
+    else:
+        first = next(shards, None)
+        second = next(shards, None) if first is not None else None
+        if second is None:
+            # Too small to be worth starting a pool
+            if first is not None:
+                merge(scan_shard(first, tracked))
+        else:
+            window = PENDING_PER_WORKER * (workers or os.cpu_count() or 1)
+            with make_executor(executor, workers) as pool:
+                pending = deque()
+                for shard in itertools.chain((first, second), shards):
+                    pending.append(pool.submit(scan_shard, shard, tracked))
+                    if len(pending) >= window:
+                        # Merge in submission order so "first file wins" stays deterministic
+                        merge(pending.popleft().result())
+                while pending:
+                    merge(pending.popleft().result())
+
+    if on_result is not None:
+        return None
+    return {row: merged.get(row, {}) for row in order}
+
+
+def scan_manifest(manifest_path: Path, tracked: Iterable[str], workers: Optional[int] = None,
+                  executor: str = 'process') -> Dict[str, Dict[str, str]]:
+    """Expand a manifest (walking repos as needed) and scan it; see scan()"""
+    return scan(iter_manifest_tasks(manifest_path), tracked, workers=workers, executor=executor)
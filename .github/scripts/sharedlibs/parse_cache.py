@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache of extracted {library: version} maps.
+
+Entries are keyed by the git blob SHA of the build file (computed locally for
+worktree files, so a file and its committed blob share one entry), the file
+type and the tracked library set. The cache lives in a SQLite database under
+.cache/sharedlibs, is bounded by least-recently-used eviction and is dropped
+wholesale whenever CACHE_SCHEMA, the extraction rules version or the library
+aliases (the fingerprint of the identity index) change.
+
+Environment:
+    SHAREDLIBS_CACHE=0                disable the cache
+    SHAREDLIBS_CACHE_DIR=<dir>        database location (default .cache/sharedlibs)
+    SHAREDLIBS_CACHE_MAX_ENTRIES=<n>  LRU bound (default 50000)
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from .config import DEFAULT_CACHE_DIR
+from .dependency_stream import EXTRACTION_RULES_VERSION, Source, stream_versions
+from .identity import identity_index
+from .spans import record_file
+
+CACHE_SCHEMA = 1
+DEFAULT_MAX_ENTRIES = 50_000
+_CHUNK = 1 << 20
+
+
+def blob_sha(data: bytes) -> str:
+    """SHA-1 of data as git would store it (same as `git hash-object`)"""
+    h = hashlib.sha1(b'blob %d\0' % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+def file_blob_sha(path: Union[str, Path]) -> str:
+    """git blob SHA-1 of a file, hashed in chunks without loading it whole"""
+    h = hashlib.sha1(b'blob %d\0' % os.path.getsize(path))
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(sha: str, kind: str, tracked: Iterable[str]) -> str:
+    """Key for a blob parsed as kind for the given tracked libraries"""
+    libs = hashlib.sha1('\0'.join(sorted(set(tracked))).encode()).hexdigest()[:16]
+    return f"{sha}:{kind}:{libs}"
+
+
+class ParseCache:
+    """SQLite-backed LRU map from cache_key() to a {library: version} dict"""
+
+    def __init__(self, path: Union[str, Path], max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared by the event server's worker threads; _lock serializes access
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._puts = 0
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS entries ('
+                         'key TEXT PRIMARY KEY, versions TEXT NOT NULL, last_used REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+        schema = f"{CACHE_SCHEMA}.{EXTRACTION_RULES_VERSION}.{identity_index().fingerprint()}"
+        if self._meta('schema') != schema:
+            self._db.execute('DELETE FROM entries')
+            self._db.execute('DELETE FROM meta')
+            self._set_meta('schema', schema)
+        self._db.commit()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self._db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """Return the cached versions for key (and mark it used), or None"""
+        with self._lock:
+            row = self._db.execute('SELECT versions FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._dirty = True
+            self._db.execute('UPDATE entries SET last_used = ? WHERE key = ?', (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, versions: Dict[str, str]) -> None:
+        """Store versions for key"""
+        with self._lock:
+            self._dirty = True
+            self._puts += 1
+            self._db.execute('INSERT OR REPLACE INTO entries (key, versions, last_used) VALUES (?, ?, ?)',
+                             (key, json.dumps(versions, sort_keys=True), time.time()))
+
+    def __len__(self) -> int:
+        return self._db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries beyond max_entries; return how many"""
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        self._db.execute('DELETE FROM entries WHERE key IN '
+                         '(SELECT key FROM entries ORDER BY last_used LIMIT ?)', (excess,))
+        return excess
+
+    def flush(self) -> None:
+        """
+        Commit pending writes so other processes can write too; long-running
+        processes call this after each unit of work. Entries stored since the
+        last flush may push the cache over max_entries, so LRU eviction runs
+        here too, not only in close()
+        """
+        with self._lock:
+            if self._puts:
+                self._puts = 0
+                self.evict()
+            if self._dirty:
+                self._db.commit()
+                self._dirty = False
+
+    def lifetime_stats(self) -> Dict[str, int]:
+        """Hit/miss totals across every run that used this database, including this one"""
+        return {
+            'hits': int(self._meta('total_hits') or 0) + self.hits,
+            'misses': int(self._meta('total_misses') or 0) + self.misses,
+        }
+
+    def close(self) -> None:
+        """Evict, fold this run's counters into the lifetime totals and commit"""
+        if self._db is None:
+            return
+        totals = self.lifetime_stats()
+        self._set_meta('total_hits', totals['hits'])
+        self._set_meta('total_misses', totals['misses'])
+        self.evict()
+        self._db.commit()
+        self._db.close()
+        self._db = None
+
+
+_cache: Optional[ParseCache] = None
+_cache_opened = False
+
+
+def get_cache() -> Optional[ParseCache]:
+    """Process-wide cache from the environment, opened on first use; None when disabled"""
+    global _cache, _cache_opened
+    if not _cache_opened:
+        _cache_opened = True
+        if os.environ.get('SHAREDLIBS_CACHE', '1').lower() in ('0', 'false', 'off', 'no'):
+            return None
+        path = Path(os.environ.get('SHAREDLIBS_CACHE_DIR', DEFAULT_CACHE_DIR)) / 'parse-cache.sqlite'
+        max_entries = int(os.environ.get('SHAREDLIBS_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+        try:
+            _cache = ParseCache(path, max_entries)
+        except sqlite3.Error as e:
+            print(f"Parse cache unavailable ({e}), continuing without it", file=sys.stderr)
+            return None
+        atexit.register(_cache.close)
+    return _cache
+
+
+def cached_versions(source: Source, kind: str, tracked: Iterable[str],
+                    sha: Optional[str] = None) -> Dict[str, str]:
+    """
+    stream_versions() behind the parse cache. source is a path or blob bytes;
+    pass sha when it is already known (e.g. from `git cat-file`).
+    """
+    start = time.perf_counter()
+    tracked = list(tracked)
+    cache = get_cache()
+    if cache is None:
+        versions = stream_versions(source, kind, tracked)
+        record_file(_label(source, sha), time.perf_counter() - start)
+        return versions
+
+    if sha is None:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            sha = blob_sha(bytes(source))
+        else:
+            sha = file_blob_sha(source)
+    key = cache_key(sha, kind, tracked)
+    versions = cache.get(key)
+    hit = versions is not None
+    if not hit:
+        versions = stream_versions(source, kind, tracked)
+        cache.put(key, versions)
+    record_file(_label(source, sha), time.perf_counter() - start, hit)
+    return versions
+
+
+def _label(source: Source, sha: Optional[str]) -> str:
+    """Path of a worktree file, or the (short) blob SHA of in-memory content"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"blob:{sha[:12]}" if sha else f"blob:{len(source)} bytes"
+    return str(source)
+
+
+def report_cache_stats() -> None:
+    """Print hit/miss counts to stderr and, under Actions, to GITHUB_OUTPUT"""
+    if _cache is None or _cache._db is None:
+        return
+    lifetime = _cache.lifetime_stats()
+    print(f"Parse cache: {_cache.hits} hits, {_cache.misses} misses this run "
+          f"({lifetime['hits']} hits, {lifetime['misses']} misses lifetime)", file=sys.stderr)
+    if 'GITHUB_OUTPUT' in os.environ:
+        with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+            f.write(f"parse_cache_hits={_cache.hits}\n")
+            f.write(f"parse_cache_misses={_cache.misses}\n")
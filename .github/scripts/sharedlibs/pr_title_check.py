@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Enforce the PR title format and check that its Jira ticket exists.
+
+Replaces the bash step of pr-title-check.yml. The title pattern is compiled
+once; ticket lookups go through a TTL cache persisted under .cache/sharedlibs
+(so `edited`/`synchronize` events for the same PR don't hit Jira again) and
+every ticket not in the cache is fetched with a single `key in (...)` JQL
+search over one kept-alive HTTPS connection.
+
+Usage (in the workflow; GITHUB_EVENT_PATH points at the pull_request payload):
+    python .github/scripts/pr_title_check.py
+    python .github/scripts/pr_title_check.py --event .github/workflows/test-events/pr_valid_title.json
+    python .github/scripts/pr_title_check.py --title "CCL-12345 add description" --title "GG-7 fix"
+
+Environment:
+    JIRA_BASE_URL    default https://intactfinancialgrp.atlassian.net
+    JIRA_USER, JIRA_TOKEN
+    SHAREDLIBS_CACHE_DIR, SHAREDLIBS_JIRA_TTL (seconds a found ticket stays cached)
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+from urllib.parse import urlencode, urlsplit
+
+from .config import DEFAULT_CACHE_DIR
+
+TITLE_PATTERN = re.compile(r'^(GG|OCS|SUPP|CCL|CEDT)-[0-9]+\s.+')
+TICKET_PATTERN = re.compile(r'^(?:GG|OCS|SUPP|CCL|CEDT)-[0-9]+')
+BOT_PATTERN = re.compile(r'^(ci-builder|renovate(\[bot\])?|bot)$')
+CODEOWNERS_PATTERN = re.compile(r'(^|/|\\)CODEOWNERS$')
+
+DEFAULT_JIRA_URL = "https://intactfinancialgrp.atlassian.net"
+DEFAULT_TTL = 24 * 3600
+MISSING_TTL = 300  # a missing ticket may be created any minute
+MAX_BATCH = 50
+CACHE_FORMAT = 1
+
+FORMAT_HELP = """Error: PR title must follow one of the following formats:
+GG-<digits> (e.g., GG-12345 Add feature)
+OCS-<digits> (e.g., OCS-123 Fix bug)
+SUPP-<digits> (e.g., SUPP-1234 Update docs)
+CCL-<digits> (e.g., CCL-12345 New feature)
+CEDT-<digits> (e.g., CEDT-1234 New feature)"""
+
+
+class Ticket(NamedTuple):
+    key: str
+    exists: bool
+    summary: Optional[str] = None
+    created: Optional[str] = None
+
+
+def ticket_of(title: str) -> Optional[str]:
+    """Ticket key of a well-formed title, None if the title doesn't match"""
+    if not TITLE_PATTERN.match(title):
+        return None
+    return TICKET_PATTERN.match(title).group(0)
+
+
+class TicketCache:
+    """JSON file of {key: [exists, summary, created, fetched_at]} with per-entry TTL"""
+
+    def __init__(self, path: Optional[Union[str, Path]], ttl: float = DEFAULT_TTL,
+                 missing_ttl: float = MISSING_TTL):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.entries: Dict[str, list] = {}
+        self._dirty = False
+        if self.path is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('format') == CACHE_FORMAT:
+                    self.entries = data.get('tickets', {})
+            except (OSError, ValueError):
+                pass
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Ticket]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        exists, summary, created, fetched_at = entry
+        ttl = self.ttl if exists else self.missing_ttl
+        if (now if now is not None else time.time()) - fetched_at > ttl:
+            return None
+        return Ticket(key, exists, summary, created)
+
+    def put(self, ticket: Ticket, now: Optional[float] = None) -> None:
+        self.entries[ticket.key] = [ticket.exists, ticket.summary, ticket.created,
+                                    now if now is not None else time.time()]
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache atomically, dropping expired entries"""
+        if self.path is None or not self._dirty:
+            return
+        now = time.time()
+        live = {key: entry for key, entry in self.entries.items()
+                if now - entry[3] <= (self.ttl if entry[0] else self.missing_ttl)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'format': CACHE_FORMAT, 'tickets': live}, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+class JiraError(Exception):
+    """A Jira search that didn't return HTTP 200"""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.body = body
+
+
+class JiraClient:
+    """
+    Ticket lookups through a TicketCache. Cache misses are batched into one
+    `key in (...)` JQL search per MAX_BATCH keys, all on one keep-alive
+    connection; cache hits never touch the network.
+    """
+
+    def __init__(self, base_url: str, user: Optional[str] = None, token: Optional[str] = None,
+                 cache: Optional[TicketCache] = None, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        self.secure = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.cache = cache if cache is not None else TicketCache(None)
+        self.requests = 0
+        self.connections = 0
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._headers = {'Accept': 'application/json'}
+        if user and token:
+            credentials = base64.b64encode(f"{user}:{token}".encode()).decode()
+            self._headers['Authorization'] = f"Basic {credentials}"
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+            self._conn = cls(self.host, self.port, timeout=self.timeout)
+            self.connections += 1
+        return self._conn
+
+    def _get(self, path: str) -> tuple:
+        """GET on the kept-alive connection, reconnecting once if the server dropped it"""
+        for attempt in (0, 1):
+            conn = self._connection()
+            try:
+                conn.request('GET', path, headers=self._headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if attempt:
+                    raise
+                continue
+            self.requests += 1
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+            return response.status, body
+
+    def _search(self, keys: List[str]) -> Dict[str, Ticket]:
+        query = urlencode({
+            'jql': f"key in ({', '.join(keys)})",
+            'fields': 'summary,created',
+            'maxResults': len(keys),
+            # Report unknown keys as warnings instead of failing the whole query
+            'validateQuery': 'warn',
+        })
+        status, body = self._get(f"{self.prefix}/rest/api/2/search?{query}")
+        if status != 200:
+            raise JiraError(status, body.decode('utf-8', errors='replace'))
+        found = {}
+        for issue in json.loads(body).get('issues', []):
+            fields = issue.get('fields') or {}
+            found[issue['key']] = Ticket(issue['key'], True, fields.get('summary'), fields.get('created'))
+        return found
+
+    def lookup(self, keys: Iterable[str]) -> Dict[str, Ticket]:
+        """Ticket for every key, from the cache when fresh, else from one batched search"""
+        keys = list(dict.fromkeys(keys))
+        results = {}
+        pending = []
+        for key in keys:
+            ticket = self.cache.get(key)
+            if ticket is not None:
+                results[key] = ticket
+            else:
+                pending.append(key)
+
+        for start in range(0, len(pending), MAX_BATCH):
+            batch = pending[start:start + MAX_BATCH]
+            found = self._search(batch)
+            for key in batch:
+                ticket = found.get(key, Ticket(key, False))
+                self.cache.put(ticket)
+                results[key] = ticket
+        return results
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def client_from_env() -> JiraClient:
+    cache_dir = Path(os.environ.get('SHAREDLIBS_CACHE_DIR', DEFAULT_CACHE_DIR))
+    ttl = float(os.environ.get('SHAREDLIBS_JIRA_TTL', DEFAULT_TTL))
+    return JiraClient(os.environ.get('JIRA_BASE_URL', DEFAULT_JIRA_URL), os.environ.get('JIRA_USER'),
+                      os.environ.get('JIRA_TOKEN'), TicketCache(cache_dir / 'jira-tickets.json', ttl))
+
+
+def check_titles(titles: List[str], client: JiraClient) -> int:
+    """Validate every title and its ticket; 0 when all are valid"""
+    failures = 0
+    keys = {}
+    for title in titles:
+        key = ticket_of(title)
+        if key is None:
+            print(FORMAT_HELP)
+            print(f"Your title: {title}")
+            failures += 1
+        else:
+            print(f"PR title format is valid: {title}")
+            keys[title] = key
+    if not keys:
+        return 1
+
+    try:
+        tickets = client.lookup(keys.values())
+    except JiraError as e:
+        print(f"Error: Jira JQL search failed for {', '.join(keys.values())} ({e}).")
+        print(e.body)
+        return 1
+    except OSError as e:
+        print(f"Error: Jira JQL search failed for {', '.join(keys.values())} ({e}).")
+        return 1
+    finally:
+        client.cache.save()
+        client.close()
+
+    for key in dict.fromkeys(keys.values()):
+        ticket = tickets[key]
+        if not ticket.exists:
+            print(f"Error: Jira ticket {key} does not exist or is inaccessible.")
+            failures += 1
+            continue
+        print(f"Jira ticket {key} is valid.")
+        print(f"Summary      : {ticket.summary}")
+        print(f"Created Date : {ticket.created}")
+    return 1 if failures else 0
+
+
+def _changed_files(payload: dict, base_ref: Optional[str]) -> List[str]:
+    """Files the PR touches: from the payload when present, else git diff against the base"""
+    if 'pull_request_files' in payload:
+        return [f.get('filename', '') for f in payload['pull_request_files']]
+    if not base_ref:
+        return []
+    import subprocess
+
+    result = subprocess.run(['git', 'diff', '--name-only', f'origin/{base_ref}'],
+                            capture_output=True, text=True)
+    return result.stdout.splitlines() if result.returncode == 0 else []
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the PR title format and its Jira ticket")
+    parser.add_argument('--event', default=os.environ.get('GITHUB_EVENT_PATH'),
+                        help="pull_request event payload (default: $GITHUB_EVENT_PATH)")
+    parser.add_argument('--title', action='append', help="check these titles instead of an event (repeatable)")
+    args = parser.parse_args(argv)
+
+    if args.title:
+        return check_titles(args.title, client_from_env())
+    if not args.event:
+        parser.error("--event or --title is required outside GitHub Actions")
+
+    with open(args.event, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    pr = payload.get('pull_request', {})
+
+    author = pr.get('user', {}).get('login', '')
+    if BOT_PATTERN.match(author):
+        print(f"Skipping check: PR created by bot user ({author})")
+        return 0
+    base_ref = pr.get('base', {}).get('ref') or os.environ.get('GITHUB_BASE_REF')
+    if any(CODEOWNERS_PATTERN.search(name) for name in _changed_files(payload, base_ref)):
+        print("Skipping check: CODEOWNERS file modified")
+        return 0
+
+    return check_titles([pr.get('title', '')], client_from_env())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
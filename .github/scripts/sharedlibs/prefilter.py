@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Byte-level prefilter that keeps build files without any tracked library away
+from the XML parser.
+
+Most files in an org-wide scan declare none of the tracked artifacts, and
+for those even an early-exit iterparse reads the whole document. A library
+can only be extracted if one of its spellings (identity.py: the ID, its
+display name and aliases, in any letter case) occurs in the file, so the
+raw bytes are lowercased and searched for every spelling first. Each
+spelling is one C-level substring search (bytes.find); for the few dozen
+names tracked that is about twice as fast as one compiled alternation, and
+several times faster than a case-insensitive one, which the re engine has
+to try at every byte. Small files are read once and the same bytes are
+handed to the parser; files of MMAP_THRESHOLD bytes or more are
+memory-mapped and lowercased WINDOW bytes at a time, so only one window is
+ever copied into a Python object.
+
+The search is conservative: a file is parsed whenever it contains a character
+reference (&#...;, which could spell a name) or isn't in an ASCII-compatible
+encoding (a UTF-16/32 byte order mark or NUL bytes at the start).
+
+SHAREDLIBS_PREFILTER=0 parses every file.
+"""
+
+import mmap
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+
+MMAP_THRESHOLD = 1 << 20
+WINDOW = 1 << 20
+
+ENABLED = os.environ.get('SHAREDLIBS_PREFILTER', '1') != '0'
+
+
+@lru_cache(maxsize=8)
+def _needles(names: Tuple[str, ...]) -> Tuple[bytes, ...]:
+    from .identity import identity_index
+
+    index = identity_index()
+    spellings = {spelling.encode('utf-8').lower()
+                 for name in names if name for spelling in index.spellings(index.resolve(name) or name)}
+    return tuple(sorted(spellings)) + (b'&#',)
+
+
+def tracked_needles(names: Iterable[str]) -> Tuple[bytes, ...]:
+    """The lowercase byte strings to look for: every spelling of the named libraries plus '&#'"""
+    return _needles(tuple(sorted(names)))
+
+
+def may_contain(data: Union[bytes, bytearray, mmap.mmap], needles: Tuple[bytes, ...]) -> bool:
+    """False only if data certainly declares none of the (lowercase) needles, in any letter case"""
+    head = bytes(data[:4])
+    if head[:2] in (b'\xff\xfe', b'\xfe\xff') or b'\x00' in head:
+        return True  # UTF-16/32: names aren't stored as these bytes
+    # Windows overlap by one needle length, so a name across a boundary is still seen
+    overlap = max(map(len, needles)) - 1
+    for start in range(0, len(data), WINDOW):
+        window = data[start:start + WINDOW + overlap].lower()
+        if any(window.find(needle) != -1 for needle in needles):
+            return True
+    return False
+
+
+def prefilter_file(path: Union[str, Path], names: Iterable[str]) -> Tuple[bool, Optional[bytes]]:
+    """
+    (may contain a tracked name, content) for a build file. content is the
+    file's bytes when it was small enough to read, so the parser can reuse
+    it; None for memory-mapped (large) files, which the parser should
+    stream from the path.
+    """
+    needles = tracked_needles(names)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return False, b''
+        if size < MMAP_THRESHOLD:
+            data = f.read()
+            return may_contain(data, needles), data
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return may_contain(mapped, needles), None
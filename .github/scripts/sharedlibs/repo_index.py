@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Offline index of a local Maven repository and Ivy cache, for resolving
+dynamic versions to the concrete ones actually available.
+
+Ivy's rev="latest.integration", Maven ranges such as [2.0,3.0), LATEST /
+RELEASE and x.y-SNAPSHOT can't be compared literally: two repos on
+[2.0,3.0) and 2.1.1 may well build against the same jar. Reading
+maven-metadata*.xml files one at a time for every comparison is slow, so the
+repositories are scanned once into a compact JSON snapshot:
+
+    groupId:artifactId (org:module) -> versions sorted by Maven order,
+                                       snapshot timestamps, release, latest
+
+    ~/.m2/repository  ($SHAREDLIBS_MAVEN_REPO)   maven-metadata*.xml of the
+                      artifact and its -SNAPSHOT directories, plus every
+                      <version>/<artifactId>-<version>.pom directory
+    ~/.ivy2/cache     ($SHAREDLIBS_IVY_CACHE)    ivy-<rev>.xml of each module
+
+Each artifact entry carries the newest mtime of its directory, metadata
+files and snapshot directories. A refresh still walks the tree, but only
+re-reads the artifacts whose stamp changed; unchanged ones are reused from
+the snapshot, and artifacts that disappeared are dropped.
+
+resolve() answers from memory: the highest indexed version a constraint
+accepts, or the timestamped version of a snapshot. compare and
+check-versions resolve the dynamic versions they find before looking for
+mismatches (resolve_rows); the index is only loaded when there are any.
+
+Usage:
+    python -m sharedlibs repo-index                      # refresh .cache/sharedlibs/repo-index.json
+    python -m sharedlibs repo-index --maven /opt/m2 --show Util
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .identity import identity_index
+from .versioning import parse_constraint, parse_version, sort_versions
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_SUFFIX = '-SNAPSHOT'
+
+_IVY_FILE = re.compile(r'^ivy-(.+)\.xml$')
+
+
+class Artifact(NamedTuple):
+    """What the local repositories hold of one groupId:artifactId"""
+    versions: Tuple[str, ...]  # Maven order, lowest first
+    snapshots: Dict[str, str]  # 1.0-SNAPSHOT -> 20240131.101500-3
+    release: Optional[str] = None
+    latest: Optional[str] = None
+
+
+class Resolution(NamedTuple):
+    row: str
+    library: str
+    spec: str
+    version: str
+
+
+def needs_index(version: Optional[str]) -> bool:
+    """Whether a declared version is dynamic (a range, latest.*, LATEST/RELEASE, x.y.+) or a snapshot"""
+    if not version:
+        return False
+    return (version in ('LATEST', 'RELEASE') or version.endswith(SNAPSHOT_SUFFIX)
+            or parse_constraint(version) is not None)
+
+
+def _dir_stamp(path: str) -> int:
+    """Newest mtime of a directory and the maven-metadata*.xml files in it"""
+    try:
+        with os.scandir(path) as it:
+            stamps = [entry.stat().st_mtime_ns for entry in it
+                      if entry.name.startswith('maven-metadata') and entry.name.endswith('.xml')]
+        return max(stamps + [os.stat(path).st_mtime_ns])
+    except OSError:
+        return 0
+
+
+def _read_metadata(path: str) -> Tuple[List[str], Optional[str], Optional[str], Optional[str]]:
+    """(versions, release, latest, snapshot timestamp-buildNumber) of a maven-metadata*.xml"""
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return [], None, None, None
+    versioning = root.find('versioning')
+    if versioning is None:
+        return [], None, None, None
+    versions = [v.text.strip() for v in versioning.findall('versions/version') if v.text and v.text.strip()]
+    timestamp = versioning.findtext('snapshot/timestamp')
+    build = versioning.findtext('snapshot/buildNumber')
+    snapshot = f"{timestamp.strip()}-{build.strip()}" if timestamp and build else None
+    release = (versioning.findtext('release') or '').strip() or None
+    latest = (versioning.findtext('latest') or '').strip() or None
+    return versions, release, latest, snapshot
+
+
+def _newest(*candidates: Optional[str]) -> Optional[str]:
+    present = [c for c in candidates if c]
+    return max(present, key=parse_version) if present else None
+
+
+def _snapshot_stamp(directory: str, artifact: str, base: str) -> Optional[str]:
+    """timestamp-buildNumber of the newest build of a -SNAPSHOT directory"""
+    newest = None
+    names = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        pass
+    for name in names:
+        if name.startswith('maven-metadata') and name.endswith('.xml'):
+            newest = max(filter(None, (newest, _read_metadata(os.path.join(directory, name))[3])), default=None)
+    if newest is None:
+        # Remote snapshots without metadata still have timestamped file names
+        pattern = re.compile(re.escape(f'{artifact}-{base}-') + r'(\d{8}\.\d{6}-\d+)\.pom$')
+        stamps = [m.group(1) for m in map(pattern.match, names) if m]
+        newest = max(stamps, default=None)
+    return newest
+
+
+class _ArtifactDir(NamedTuple):
+    key: str
+    path: str
+    stamp: int
+    metadata: Tuple[str, ...]
+    versions: Tuple[str, ...]  # version directory names
+
+
+def _walk_maven(root: str) -> Iterator[_ArtifactDir]:
+    """Artifact directories of a Maven repository layout, with their stamps (no file is read)"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        artifact = os.path.basename(directory)
+        metadata, versions, others = [], [], []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if os.path.exists(os.path.join(entry.path, f'{artifact}-{entry.name}.pom')):
+                    versions.append(entry)
+                else:
+                    others.append(entry.path)
+            elif entry.name.startswith('maven-metadata') and entry.name.endswith('.xml'):
+                metadata.append(entry)
+        # Snapshot directories may only hold metadata and timestamped files
+        versions += [e for e in entries if e.name.endswith(SNAPSHOT_SUFFIX) and e.path in others]
+        others = [path for path in others if not path.endswith(SNAPSHOT_SUFFIX)]
+        if metadata or versions:
+            group = os.path.relpath(os.path.dirname(directory), root).replace(os.sep, '.')
+            stamp = max([entry.stat().st_mtime_ns for entry in metadata]
+                        + [_dir_stamp(entry.path) for entry in versions if entry.name.endswith(SNAPSHOT_SUFFIX)]
+                        + [os.stat(directory).st_mtime_ns])
+            yield _ArtifactDir(f'{group}:{artifact}', directory, stamp,
+                               tuple(entry.path for entry in metadata), tuple(entry.name for entry in versions))
+        stack.extend(others)
+
+
+def _read_maven(found: _ArtifactDir) -> Artifact:
+    artifact = found.key.rpartition(':')[2]
+    versions = set(found.versions)
+    release = latest = None
+    for path in found.metadata:
+        listed, rel, lat, _ = _read_metadata(path)
+        versions.update(listed)
+        release, latest = _newest(release, rel), _newest(latest, lat)
+    snapshots = {}
+    for version in found.versions:
+        if version.endswith(SNAPSHOT_SUFFIX):
+            stamp = _snapshot_stamp(os.path.join(found.path, version), artifact, version[:-len(SNAPSHOT_SUFFIX)])
+            if stamp:
+                snapshots[version] = stamp
+    return Artifact(tuple(sort_versions(versions)), snapshots, release, latest)
+
+
+def _walk_ivy(root: str) -> Iterator[_ArtifactDir]:
+    """<org>/<module> directories of an Ivy cache, with their stamps"""
+    try:
+        orgs = [entry for entry in os.scandir(root) if entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return
+    for org in orgs:
+        try:
+            modules = [entry for entry in os.scandir(org.path) if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for module in modules:
+            yield _ArtifactDir(f'{org.name}:{module.name}', module.path, module.stat().st_mtime_ns, (), ())
+
+
+def _read_ivy(found: _ArtifactDir) -> Artifact:
+    try:
+        names = os.listdir(found.path)
+    except OSError:
+        names = []
+    revisions = [m.group(1) for m in map(_IVY_FILE.match, names) if m and not m.group(1).endswith('.original')]
+    return Artifact(tuple(sort_versions(revisions)), {})
+
+
+_LAYOUTS = {'maven': (_walk_maven, _read_maven), 'ivy': (_walk_ivy, _read_ivy)}
+
+
+class RepoIndex:
+    """groupId:artifactId -> Artifact for a set of local repository roots"""
+
+    def __init__(self, roots: Dict[str, str]):
+        self.roots = {str(path): kind for path, kind in roots.items()}
+        # root -> key -> (stamp, artifact)
+        self.entries: Dict[str, Dict[str, Tuple[int, Artifact]]] = {root: {} for root in self.roots}
+        self._libraries: Optional[Dict[str, Artifact]] = None
+
+    def refresh(self) -> Tuple[int, int]:
+        """Walk every root and re-read changed artifacts; returns (read, reused)"""
+        read = reused = 0
+        for root, kind in self.roots.items():
+            walk, load = _LAYOUTS[kind]
+            old = self.entries.get(root, {})
+            new = {}
+            for found in walk(root):
+                cached = old.get(found.key)
+                if cached is not None and cached[0] == found.stamp:
+                    new[found.key] = cached
+                    reused += 1
+                else:
+                    new[found.key] = (found.stamp, load(found))
+                    read += 1
+            self.entries[root] = new
+        self._libraries = None
+        return read, reused
+
+    def artifact(self, key: str) -> Optional[Artifact]:
+        for entries in self.entries.values():
+            if key in entries:
+                return entries[key][1]
+        return None
+
+    def _by_library(self) -> Dict[str, Artifact]:
+        """Tracked library -> everything indexed under any of its coordinates"""
+        if self._libraries is None:
+            resolve = identity_index().resolve
+            merged: Dict[str, Tuple[set, dict, list, list]] = {}
+            for entries in self.entries.values():
+                for key, (_, artifact) in entries.items():
+                    group, _, name = key.rpartition(':')
+                    library = resolve(name, group)
+                    if library is None:
+                        continue
+                    versions, snapshots, releases, latests = merged.setdefault(library, (set(), {}, [], []))
+                    versions.update(artifact.versions)
+                    for version, stamp in artifact.snapshots.items():
+                        snapshots[version] = max(stamp, snapshots.get(version, stamp))
+                    releases.append(artifact.release)
+                    latests.append(artifact.latest)
+            self._libraries = {library: Artifact(tuple(sort_versions(versions)), snapshots,
+                                                 _newest(*releases), _newest(*latests))
+                               for library, (versions, snapshots, releases, latests) in merged.items()}
+        return self._libraries
+
+    def versions(self, library: str) -> Tuple[str, ...]:
+        artifact = self._by_library().get(library)
+        return artifact.versions if artifact else ()
+
+    def resolve(self, library: str, spec: str) -> Optional[str]:
+        """The concrete version spec stands for in the local repositories; None if unknown or already concrete"""
+        artifact = self._by_library().get(library)
+        if artifact is None or not spec:
+            return None
+        if spec.endswith(SNAPSHOT_SUFFIX):
+            stamp = artifact.snapshots.get(spec)
+            return f"{spec[:-len(SNAPSHOT_SUFFIX)]}-{stamp}" if stamp else None
+        releases = [v for v in artifact.versions if not v.endswith(SNAPSHOT_SUFFIX)]
+        if spec == 'LATEST':
+            return artifact.latest or (artifact.versions[-1] if artifact.versions else None)
+        if spec == 'RELEASE':
+            return artifact.release or (releases[-1] if releases else None)
+        constraint = parse_constraint(spec)
+        if constraint is None:
+            return None
+        for version in reversed(artifact.versions):
+            if constraint.matches(version):
+                return version
+        return None
+
+    def to_json(self) -> dict:
+        roots = {root: {'kind': kind,
+                        'artifacts': {key: [stamp, list(a.versions), a.snapshots, a.release, a.latest]
+                                      for key, (stamp, a) in self.entries[root].items()}}
+                 for root, kind in self.roots.items()}
+        return {'format': SNAPSHOT_FORMAT, 'roots': roots}
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the snapshot atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], roots: Dict[str, str]) -> 'RepoIndex':
+        """The snapshot's entries for roots (missing, unreadable or other roots start empty)"""
+        index = cls(roots)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get('format') != SNAPSHOT_FORMAT:
+            return index
+        for root, saved in data.get('roots', {}).items():
+            if index.roots.get(root) != saved.get('kind'):
+                continue
+            index.entries[root] = {key: (stamp, Artifact(tuple(versions), snapshots, release, latest))
+                                   for key, (stamp, versions, snapshots, release, latest)
+                                   in saved.get('artifacts', {}).items()}
+        return index
+
+
+def default_ivy_cache() -> Optional[Path]:
+    """$SHAREDLIBS_IVY_CACHE, else ~/.ivy2/cache if it exists"""
+    configured = os.environ.get('SHAREDLIBS_IVY_CACHE')
+    if configured:
+        return Path(configured)
+    path = Path.home() / '.ivy2' / 'cache'
+    return path if path.is_dir() else None
+
+
+def default_roots() -> Dict[str, str]:
+    from .maven_model import default_local_repository
+
+    roots = {}
+    maven, ivy = default_local_repository(), default_ivy_cache()
+    if maven is not None:
+        roots[str(maven)] = 'maven'
+    if ivy is not None:
+        roots[str(ivy)] = 'ivy'
+    return roots
+
+
+def default_index_path() -> Path:
+    from .config import DEFAULT_REPO_INDEX
+
+    return Path(os.environ.get('SHAREDLIBS_REPO_INDEX') or DEFAULT_REPO_INDEX)
+
+
+def open_index(path: Union[str, Path, None] = None, roots: Optional[Dict[str, str]] = None) -> RepoIndex:
+    """Load, refresh and save the index of roots (default: the local Maven repository and Ivy cache)"""
+    path = default_index_path() if path is None else path
+    index = RepoIndex.load(path, default_roots() if roots is None else roots)
+    read, _ = index.refresh()
+    if read or not Path(path).exists():
+        index.save(path)
+    return index
+
+
+def resolve_rows(rows: Dict[str, Dict[str, str]], index: Optional[RepoIndex] = None) -> List[Resolution]:
+    """
+    Replace the dynamic and snapshot versions in {row: {library: version}}
+    by concrete ones, in place. The index is only opened when some version
+    needs it; versions it can't resolve are left as they are.
+    """
+    pending = [(row, lib, spec) for row, versions in rows.items()
+               for lib, spec in versions.items() if needs_index(spec)]
+    if not pending:
+        return []
+    if index is None:
+        index = open_index()
+    resolutions = []
+    for row, lib, spec in pending:
+        version = index.resolve(lib, spec)
+        if version is not None:
+            rows[row][lib] = version
+            resolutions.append(Resolution(row, lib, spec, version))
+    return resolutions
+
+
+def report_resolutions(resolutions: Iterable[Resolution]) -> None:
+    for resolution in resolutions:
+        print(f"Resolved {resolution.library} {resolution.spec} → {resolution.version} in {resolution.row}",
+              file=sys.stderr)
+
+
+def add_resolve_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--no-resolve', dest='resolve', action='store_false',
+                        help="compare ranges, latest.* and -SNAPSHOT versions literally instead of resolving "
+                             "them through the local repository index")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Index a local Maven repository and Ivy cache for "
+                                                 "resolving dynamic versions")
+    parser.add_argument('--maven', type=Path, action='append', default=[], help="Maven repository root (repeatable)")
+    parser.add_argument('--ivy', type=Path, action='append', default=[], help="Ivy cache root (repeatable)")
+    parser.add_argument('--index', type=Path, help="snapshot path (default: $SHAREDLIBS_REPO_INDEX or "
+                                                   ".cache/sharedlibs/repo-index.json)")
+    parser.add_argument('--show', metavar='LIBRARY', action='append', default=[],
+                        help="print the indexed versions of a library")
+    args = parser.parse_args(argv)
+
+    roots = {str(path): 'maven' for path in args.maven}
+    roots.update({str(path): 'ivy' for path in args.ivy})
+    roots = roots or default_roots()
+    if not roots:
+        parser.error("no local repository found: pass --maven/--ivy or set SHAREDLIBS_MAVEN_REPO")
+    path = args.index or default_index_path()
+    index = RepoIndex.load(path, roots)
+    read, reused = index.refresh()
+    index.save(path)
+    artifacts = sum(len(entries) for entries in index.entries.values())
+    print(f"Indexed {artifacts} artifacts in {len(roots)} roots ({read} read, {reused} unchanged) → {path}")
+    for library in args.show:
+        library = identity_index().resolve(library) or library
+        print(f"  {library}: {', '.join(index.versions(library)) or '(not found)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Structured, streaming output for compare and check-changes.
+
+The human-readable report (LIB_VERSION_MISMATCH / LIB_VERSION_CHANGED and
+the PR comment) stays the default. `--format ndjson` and `--format sarif`
+write machine-readable records instead, to stdout or --output:
+
+    ndjson  one JSON object per line, written and flushed as each record is
+            produced: {"type": "row"} as scan shards finish, then
+            {"type": "mismatch"} per row of every misaligned library,
+            {"type": "change"} per changed library and a final
+            {"type": "summary"}
+    sarif   a SARIF 2.1.0 log for code-scanning annotations: the header goes
+            out first, each result is written and flushed as it comes, and
+            the closing brackets are written by close(), or when the command
+            fails midway, on the way out of structured_output()
+
+While records go to stdout, everything the command would otherwise print
+(the text report, progress, annotations) is sent to stderr, so the stream
+holds nothing but records and stays readable in the job log.
+
+Neither writer keeps the records it has written, so memory stays constant
+however many records an org-wide scan produces; only the dependency line
+numbers of the last few hundred build files are cached for SARIF regions.
+"""
+
+import json
+import re
+import sys
+from contextlib import contextmanager, redirect_stdout
+from functools import lru_cache
+from typing import IO, Dict, Iterable, Iterator, Optional
+
+from . import __version__
+
+FORMATS = ('text', 'ndjson', 'sarif')
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+RULES = {
+    'LIB_VERSION_MISMATCH': "Shared library version differs across repositories",
+    'LIB_VERSION_CHANGED': "Shared library version changed",
+}
+
+_IVY_DEPENDENCY = re.compile(r'<dependency\b[^>]*>')
+_IVY_ATTR = re.compile(r'''(\w+)\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+
+
+@lru_cache(maxsize=256)
+def _declaration_lines(path: str) -> Dict[str, int]:
+    """{library: line of its first declaration} in a build file ({} if unreadable)"""
+    from .diff_hunks import dependency_lines
+    from .identity import canonical
+    from .org_scan import build_file_kind
+
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    except OSError:
+        return {}
+    if build_file_kind(path) == 'ivy':
+        lines = {}
+        for match in _IVY_DEPENDENCY.finditer(text):
+            attrs = {key: double or single for key, double, single in _IVY_ATTR.findall(match.group(0))}
+            if attrs.get('name'):
+                lines.setdefault(canonical(attrs['name'], attrs.get('org')), text.count('\n', 0, match.start()) + 1)
+        return lines
+    from .config import SHARED_LIBRARIES
+
+    return {lib: span[0] for lib, span in dependency_lines(text, SHARED_LIBRARIES).items()}
+
+
+class NdjsonWriter:
+    """One JSON record per line"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.records = 0
+
+    def _write(self, record: dict) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.stream.flush()
+        self.records += 1
+
+    def rows(self, result: Dict[str, Dict[str, str]]) -> None:
+        """Versions of rows as soon as they are scanned"""
+        for row, versions in result.items():
+            self._write({'type': 'row', 'row': row, 'versions': versions})
+
+    def mismatch(self, library: str, column: Dict[str, str], files: Optional[Dict[str, str]] = None) -> None:
+        distinct = sorted(set(column.values()))
+        for row, version in column.items():
+            record = {'type': 'mismatch', 'library': library, 'row': row, 'version': version, 'versions': distinct}
+            if files and row in files:
+                record['file'] = files[row]
+            self._write(record)
+
+    def change(self, library: str, old: str, new: str, kind: str, escalate: bool = False,
+               file: Optional[str] = None, line: Optional[int] = None, targets: Iterable[str] = ()) -> None:
+        self._write({'type': 'change', 'library': library, 'old': old, 'new': new, 'kind': kind,
+                     'escalate': escalate, 'file': file, 'line': line, 'targets': list(targets)})
+
+    def close(self, **summary) -> int:
+        self._write({'type': 'summary', **summary})
+        return self.records
+
+
+class SarifWriter:
+    """A SARIF log whose results are streamed between a pre-written header and close()"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.records = 0
+        self.closed = False
+        rules = [{'id': rule, 'shortDescription': {'text': text}} for rule, text in RULES.items()]
+        header = {'version': '2.1.0', '$schema': SARIF_SCHEMA,
+                  'runs': [{'tool': {'driver': {'name': 'sharedlibs', 'version': __version__, 'rules': rules}},
+                            'results': []}]}
+        # Everything up to the opening bracket of results
+        text = json.dumps(header, ensure_ascii=False)
+        self.stream.write(text[:text.rindex('[]') + 1])
+        self.stream.flush()
+
+    def _result(self, rule: str, level: str, message: str, file: Optional[str], line: Optional[int]) -> None:
+        result = {'ruleId': rule, 'level': level, 'message': {'text': message}}
+        if file:
+            location = {'artifactLocation': {'uri': file.replace('\\', '/')}}
+            if line:
+                location['region'] = {'startLine': line}
+            result['locations'] = [{'physicalLocation': location}]
+        self.stream.write((',' if self.records else '') + '\n' + json.dumps(result, ensure_ascii=False))
+        self.stream.flush()
+        self.records += 1
+
+    def rows(self, result: Dict[str, Dict[str, str]]) -> None:
+        """Scanned rows aren't findings"""
+
+    def mismatch(self, library: str, column: Dict[str, str], files: Optional[Dict[str, str]] = None) -> None:
+        others = sorted(set(column.values()))
+        for row, version in column.items():
+            file = files.get(row) if files else None
+            line = _declaration_lines(file).get(library) if file else None
+            rest = ', '.join(v for v in others if v != version)
+            self._result('LIB_VERSION_MISMATCH', 'warning',
+                         f"{library} is {version} in {row}; other repositories use {rest}", file, line)
+
+    def change(self, library: str, old: str, new: str, kind: str, escalate: bool = False,
+               file: Optional[str] = None, line: Optional[int] = None, targets: Iterable[str] = ()) -> None:
+        targets = list(targets)
+        follow = f" Align {', '.join(targets)}." if targets else ""
+        self._result('LIB_VERSION_CHANGED', 'warning' if escalate else 'note',
+                     f"{library}: {old} → {new} ({kind}).{follow}", file, line)
+
+    def close(self, **summary) -> int:
+        """Close the results array and the document; later calls do nothing"""
+        if not self.closed:
+            self.closed = True
+            self.stream.write('\n]}]}\n')
+            self.stream.flush()
+        return self.records
+
+
+def open_writer(fmt: str, stream: Optional[IO[str]] = None):
+    """The writer for an --format value other than 'text'"""
+    stream = stream or sys.stdout
+    if fmt == 'ndjson':
+        return NdjsonWriter(stream)
+    if fmt == 'sarif':
+        return SarifWriter(stream)
+    raise ValueError(f"Unknown report format: {fmt}")
+
+
+@contextmanager
+def structured_output(fmt: str, output: str = '-') -> Iterator:
+    """
+    The writer for fmt (None for 'text') on stdout or the output path; the
+    caller close()s it with its summary. A SARIF log the caller didn't get
+    to close (an exception midway) is closed here, so it stays valid JSON.
+    """
+    if fmt == 'text':
+        yield None
+        return
+    if output == '-':
+        stream = sys.stdout
+        with redirect_stdout(sys.stderr), _closing_sarif(open_writer(fmt, stream)) as writer:
+            yield writer
+        return
+    with open(output, 'w', encoding='utf-8') as stream, _closing_sarif(open_writer(fmt, stream)) as writer:
+        yield writer
+
+
+@contextmanager
+def _closing_sarif(writer):
+    try:
+        yield writer
+    finally:
+        # NDJSON needs nothing: every record already is a complete line
+        if isinstance(writer, SarifWriter):
+            writer.close()
+
+
+def add_format_arguments(parser) -> None:
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="report format: text (default), ndjson records or a SARIF log")
+    parser.add_argument('--output', default='-', metavar='PATH',
+                        help="write ndjson/sarif output here instead of stdout")
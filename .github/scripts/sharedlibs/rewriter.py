@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Format-preserving version rewriter for pom.xml and ivy.xml.
+
+Writing a build file back through ElementTree re-serializes the whole
+document: comments, attribute quoting, namespace prefixes and indentation
+change and the diff of an alignment PR becomes unreadable. Here each file is
+parsed once with expat, which reports the byte offset of every event, and
+the exact byte span of each tracked library's version is recorded:
+
+    pom.xml  the text of <version> in a <dependency>, or of the <properties>
+             entry when the version is a ${property} defined in the same file
+    ivy.xml  the value of the rev="..." attribute of a <dependency>
+
+A bump is then a splice of the new version into the original buffer, so the
+diff is exactly the changed tokens. All bumps of one file come from a single
+parse, and `sharedlibs align` applies a whole target version set to every
+build file of a manifest in one pass.
+
+Usage:
+    python -m sharedlibs align --manifest org.json --set Util=3.0.0 --set common=4.2.0 --dry-run
+    python -m sharedlibs align --manifest org.json --like cl-clpss      # versions of that row
+    python -m sharedlibs align cl-ccl1/pom.xml cl-jobserver/ivy.xml --set Util=3.0.0
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from xml.parsers import expat
+
+from .config import SHARED_LIBRARIES
+from .identity import canonical, identity_index
+
+_START_TAG = re.compile(rb'<(?:[^>"\']|"[^"]*"|\'[^\']*\')*>')
+_REV = re.compile(rb'\srev\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+_PLACEHOLDER = re.compile(r'^\$\{([^}]+)\}$')
+
+
+class VersionSlot(NamedTuple):
+    """Where one declaration of a library's version lives in the raw bytes"""
+    library: str
+    start: int
+    end: int
+    value: str
+    property: Optional[str] = None  # set when the span is a <properties> entry the version refers to
+    # start/end are -1 when the property isn't defined in the file
+
+
+class Edit(NamedTuple):
+    slot: VersionSlot
+    new: str
+
+
+def _local(tag: str) -> str:
+    return tag.rpartition(':')[2]
+
+
+def _token_span(data: bytes, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """The span of data[start:end] without surrounding whitespace; None if it holds markup or entities"""
+    raw = data[start:end]
+    stripped = raw.strip()
+    if not stripped or b'<' in stripped or b'&' in stripped:
+        return None
+    offset = start + (len(raw) - len(raw.lstrip()))
+    return offset, offset + len(stripped)
+
+
+def index_pom(data: bytes, tracked: Iterable[str]) -> List[VersionSlot]:
+    """Version slots of the tracked libraries declared in a POM, in document order"""
+    wanted = set(tracked)
+    parser = expat.ParserCreate()
+    stack: List[str] = []
+    text_start: List[int] = []
+    properties: Dict[str, Tuple[int, int, str]] = {}
+    dependency: Optional[Dict[str, object]] = None
+    found: List[Tuple[str, int, int, str]] = []
+
+    def start(tag, attrs):
+        nonlocal dependency
+        name = _local(tag)
+        if name == 'dependency' and stack and stack[-1] == 'dependencies':
+            dependency = {'depth': len(stack)}
+        stack.append(name)
+        # Content starts right after this start tag
+        text_start.append(_START_TAG.match(data, parser.CurrentByteIndex).end())
+
+    def end(tag):
+        nonlocal dependency
+        name = stack.pop()
+        content_start = text_start.pop()
+        content_end = parser.CurrentByteIndex
+        if (dependency is not None and len(stack) == dependency['depth'] + 1
+                and name in ('groupId', 'artifactId', 'version')):
+            span = _token_span(data, content_start, content_end)
+            if span:
+                dependency[name] = span
+        elif dependency is not None and len(stack) == dependency['depth']:
+            artifact, version, group = dependency.get('artifactId'), dependency.get('version'), dependency.get('groupId')
+            if artifact and version:
+                library = canonical(data[artifact[0]:artifact[1]].decode('utf-8'),
+                                    data[group[0]:group[1]].decode('utf-8') if group else None)
+                if library in wanted:
+                    found.append((library, version[0], version[1], data[version[0]:version[1]].decode('utf-8')))
+            dependency = None
+        elif stack and stack[-1] == 'properties':
+            span = _token_span(data, content_start, content_end)
+            if span:
+                properties.setdefault(name, (span[0], span[1], data[span[0]:span[1]].decode('utf-8')))
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.Parse(data, True)
+
+    slots = []
+    for library, start_offset, end_offset, value in found:
+        placeholder = _PLACEHOLDER.match(value)
+        if placeholder and placeholder.group(1) in properties:
+            prop_start, prop_end, prop_value = properties[placeholder.group(1)]
+            slots.append(VersionSlot(library, prop_start, prop_end, prop_value, placeholder.group(1)))
+        elif placeholder:
+            # Defined in a parent or on the command line: nothing in this file to splice
+            slots.append(VersionSlot(library, -1, -1, value, placeholder.group(1)))
+        else:
+            slots.append(VersionSlot(library, start_offset, end_offset, value))
+    return slots
+
+
+def index_ivy(data: bytes, tracked: Iterable[str]) -> List[VersionSlot]:
+    """rev="..." slots of the tracked libraries declared in an ivy.xml, in document order"""
+    wanted = set(tracked)
+    parser = expat.ParserCreate()
+    slots = []
+
+    def start(tag, attrs):
+        if _local(tag) != 'dependency' or 'rev' not in attrs:
+            return
+        library = canonical(attrs.get('name'), attrs.get('org'))
+        if library not in wanted:
+            return
+        tag_match = _START_TAG.match(data, parser.CurrentByteIndex)
+        rev = _REV.search(tag_match.group(0)) if tag_match else None
+        if rev is None:
+            return
+        group = 1 if rev.group(1) is not None else 2
+        begin = tag_match.start() + rev.start(group)
+        value = rev.group(group)
+        if b'&' not in value:
+            slots.append(VersionSlot(library, begin, begin + len(value), value.decode('utf-8')))
+
+    parser.StartElementHandler = start
+    parser.Parse(data, True)
+    return slots
+
+
+def index_versions(data: bytes, kind: str, tracked: Iterable[str]) -> List[VersionSlot]:
+    """Version slots of a 'maven' or 'ivy' build file; raises expat.ExpatError when malformed"""
+    head = data[:4]
+    if head[:2] in (b'\xff\xfe', b'\xfe\xff') or b'\x00' in head:
+        raise ValueError("only ASCII-compatible encodings can be rewritten in place")
+    if kind in ('maven', 'pom', 'pom.xml'):
+        return index_pom(data, tracked)
+    if kind in ('ivy', 'ivy.xml'):
+        return index_ivy(data, tracked)
+    raise ValueError(f"Unknown build file type: {kind}")
+
+
+def plan_edits(slots: Iterable[VersionSlot], targets: Dict[str, str]) -> List[Edit]:
+    """One edit per slot whose value differs from the target (a shared property is edited once)"""
+    edits: Dict[Tuple[int, int], Edit] = {}
+    for slot in slots:
+        new = targets.get(slot.library)
+        if new is not None and new != slot.value and slot.start >= 0:
+            edits.setdefault((slot.start, slot.end), Edit(slot, new))
+    return sorted(edits.values(), key=lambda edit: edit.slot.start)
+
+
+def splice(data: bytes, edits: List[Edit]) -> bytes:
+    """Apply sorted, non-overlapping edits to data"""
+    pieces = []
+    position = 0
+    for edit in edits:
+        pieces.append(data[position:edit.slot.start])
+        pieces.append(edit.new.encode('utf-8'))
+        position = edit.slot.end
+    pieces.append(data[position:])
+    return b''.join(pieces)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, path.stat().st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class FileResult(NamedTuple):
+    path: str
+    edits: List[Edit]
+    lines: List[int]
+    error: Optional[str] = None
+    external: List[VersionSlot] = []  # targeted versions that come from a property defined elsewhere
+
+
+def rewrite_file(path: Union[str, Path], kind: str, targets: Dict[str, str], dry_run: bool = False) -> FileResult:
+    """Read, index and splice one build file (written back unless dry_run)"""
+    path = Path(path)
+    try:
+        data = path.read_bytes()
+        slots = index_versions(data, kind, targets)
+    except (OSError, ValueError, expat.ExpatError) as e:
+        return FileResult(str(path), [], [], str(e))
+    edits = plan_edits(slots, targets)
+    lines = [data.count(b'\n', 0, edit.slot.start) + 1 for edit in edits]
+    if edits and not dry_run:
+        _write_atomic(path, splice(data, edits))
+    return FileResult(str(path), edits, lines, external=[slot for slot in slots if slot.start < 0])
+
+
+def align(files: Iterable[Tuple[str, str]], targets: Dict[str, str], dry_run: bool = False) -> List[FileResult]:
+    """Rewrite every (path, kind) to the target versions; one read and one parse per file"""
+    from . import prefilter
+
+    results = []
+    for path, kind in files:
+        if prefilter.ENABLED:
+            found, _ = prefilter.prefilter_file(path, targets)
+            if not found:
+                continue
+        results.append(rewrite_file(path, kind, targets, dry_run))
+    return results
+
+
+def parse_assignments(values: List[str]) -> Dict[str, str]:
+    """{canonical library: version} from LIBRARY=VERSION values; untracked names are rejected"""
+    index = identity_index()
+    targets = {}
+    for value in values or []:
+        name, sep, version = value.partition('=')
+        name, version = name.strip(), version.strip()
+        if not sep or not name or not version:
+            raise argparse.ArgumentTypeError(f"expected LIBRARY=VERSION, got {value!r}")
+        library = index.resolve(name)
+        if library is None:
+            close = index.suggest(name)
+            hint = f"; did you mean {close!r}?" if close else ""
+            raise argparse.ArgumentTypeError(f"{name!r} is not a tracked library{hint}")
+        targets[library] = version
+    return targets
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Align shared library versions in build files, "
+                                                 "changing only the version tokens")
+    parser.add_argument('files', nargs='*', type=Path, help="pom.xml / ivy.xml files to rewrite")
+    parser.add_argument('--manifest', type=Path, help="rewrite every build file of this org manifest")
+    parser.add_argument('--set', action='append', dest='assignments', metavar='LIBRARY=VERSION', default=[],
+                        help="target version (repeatable)")
+    parser.add_argument('--like', metavar='ROW',
+                        help="with --manifest: take the target versions from this row (e.g. cl-clpss)")
+    parser.add_argument('--dry-run', action='store_true', help="print the edits without writing")
+    args = parser.parse_args(argv)
+
+    from .org_scan import build_file_kind, load_manifest
+
+    try:
+        targets = parse_assignments(args.assignments)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    files = [(str(path), build_file_kind(str(path))) for path in args.files]
+    if args.manifest:
+        tasks = load_manifest(args.manifest)
+        if args.like:
+            from .org_scan import scan
+            reference = scan([t for t in tasks if t.row == args.like], SHARED_LIBRARIES, workers=1).get(args.like)
+            if not reference:
+                parser.error(f"no tracked library versions found for row {args.like!r}")
+            # Placeholders the row resolves through its own model can't be copied as-is
+            targets = {**{lib: v for lib, v in reference.items() if '${' not in v}, **targets}
+            tasks = [t for t in tasks if t.row != args.like]
+        files += [(t.path, t.kind) for t in tasks]
+    if not targets:
+        parser.error("nothing to align: pass --set LIBRARY=VERSION or --manifest with --like")
+    unknown = [path for path, kind in files if kind is None]
+    if unknown:
+        parser.error(f"cannot tell the build file type of {', '.join(unknown)}")
+
+    results = align(files, targets, args.dry_run)
+    changed = 0
+    for result in results:
+        if result.error:
+            print(f"❌ {result.path}: {result.error}")
+            continue
+        for edit, line in zip(result.edits, result.lines):
+            via = f" (property {edit.slot.property})" if edit.slot.property else ""
+            print(f"{result.path}:{line}: {edit.slot.library} {edit.slot.value} → {edit.new}{via}")
+        for slot in result.external:
+            print(f"⚠️  {result.path}: {slot.library} uses {slot.value}, which is not defined in this file")
+        changed += bool(result.edits)
+    verb = "would change" if args.dry_run else "changed"
+    print(f"\n{verb} {changed} of {len(files)} build files", file=sys.stderr)
+    return 1 if any(result.error for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
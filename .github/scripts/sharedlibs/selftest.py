@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+`sharedlibs selftest`: check the parsers, the Maven model, version ordering,
+mismatch detection and message rendering on built-in samples.
+
+Needs no checkout, network or git, so it verifies that a copy of the zipapp
+works with the interpreter it runs on before CI depends on it.
+"""
+
+import argparse
+import posixpath
+import sys
+from typing import Callable, List, Optional, Tuple
+
+from .config import SHARED_LIBRARIES
+
+SAMPLE_PARENT = b"""<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <groupId>com.example</groupId><artifactId>parent</artifactId><version>1</version>
+  <properties><common.version>4.2.0</common.version></properties>
+</project>"""
+
+SAMPLE_POM = b"""<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <parent><groupId>com.example</groupId><artifactId>parent</artifactId><version>1</version></parent>
+  <artifactId>app</artifactId>
+  <dependencies>
+    <dependency><groupId>com.example</groupId><artifactId>Util</artifactId><version>2.1.1</version></dependency>
+    <dependency><groupId>com.example</groupId><artifactId>common</artifactId><version>${common.version}</version></dependency>
+    <dependency><groupId>org.other</groupId><artifactId>unrelated</artifactId><version>9.9</version></dependency>
+  </dependencies>
+</project>"""
+
+SAMPLE_IVY = b"""<ivy-module version="2.0">
+  <info organisation="com.example" module="jobs"/>
+  <dependencies>
+    <dependency org="com.example" name="Util" rev="3.0.0"/>
+    <dependency org="com.example" name="common" rev="4.2.0"/>
+  </dependencies>
+</ivy-module>"""
+
+
+class _MemoryLoader:
+    """MavenResolver loader over the sample POMs"""
+
+    files = {'pom.xml': SAMPLE_POM, '../pom.xml': SAMPLE_PARENT}
+
+    def read(self, location: str) -> Optional[bytes]:
+        return self.files.get(location)
+
+    def join(self, base: str, relative: str) -> str:
+        return posixpath.join(posixpath.dirname(base), relative)
+
+
+def check_streaming() -> str:
+    from .backends import available_backends, select_backend
+    from .dependency_stream import stream_versions
+
+    pom = stream_versions(SAMPLE_POM, 'maven', SHARED_LIBRARIES)
+    ivy = stream_versions(SAMPLE_IVY, 'ivy', SHARED_LIBRARIES)
+    assert pom == {'Util': '2.1.1', 'common': '${common.version}'}, pom
+    assert ivy == {'Util': '3.0.0', 'common': '4.2.0'}, ivy
+    for backend in available_backends():
+        assert backend.pom_versions(SAMPLE_POM, SHARED_LIBRARIES) == pom, backend.name
+        assert backend.ivy_versions(SAMPLE_IVY, SHARED_LIBRARIES) == ivy, backend.name
+    return f"pom.xml and ivy.xml extraction ({select_backend().name} parser)"
+
+
+def check_maven_model() -> str:
+    from .maven_model import MavenResolver, needs_resolution
+
+    assert needs_resolution(SAMPLE_POM)
+    resolver = MavenResolver(_MemoryLoader())
+    versions = resolver.resolve_versions('pom.xml', SHARED_LIBRARIES)
+    assert versions == {'Util': '2.1.1', 'common': '4.2.0'}, versions
+    return "parent properties resolved offline"
+
+
+def check_versioning() -> str:
+    from .versioning import classify_change, sort_versions
+
+    assert sort_versions(['1.10', '1.2', '1.2-SNAPSHOT', '1.2.0.1']) == ['1.2-SNAPSHOT', '1.2', '1.2.0.1', '1.10']
+    assert classify_change('2.1.1', '3.0.0') == 'major'
+    assert classify_change('2.1.1', '2.1.0') == 'downgrade'
+    assert classify_change('[2.0,3.0)', '2.5.0') == 'range-satisfied'
+    assert classify_change('1.0', '1.0.0') == 'none'
+    return "ordering and bump classification"
+
+
+def check_mismatches() -> str:
+    from .compare_shared_lib_versions import find_mismatches
+    from .version_matrix import CompactMatrix, VersionMatrix
+
+    rows = {'cl-clpss': {'Util': '2.1.1', 'common': '4.2.0'}, 'cl-jobserver': {'Util': '3.0.0', 'common': '4.2.0'}}
+    expected = [('Util', {'cl-clpss': '2.1.1', 'cl-jobserver': '3.0.0'})]
+    assert find_mismatches(rows, SHARED_LIBRARIES) == expected
+    matrix = [(lib, dict(column)) for lib, column in VersionMatrix.build(rows, SHARED_LIBRARIES).mismatches()]
+    assert matrix == expected, matrix
+    assert CompactMatrix.build(rows, SHARED_LIBRARIES).mismatches() == expected
+    return "mismatch detection (scan, matrix and compact matrix)"
+
+
+def check_rendering() -> str:
+    from .check_version_changes import generate_email_body, generate_notification_message
+
+    changes = [('Util', '2.1.1', '3.0.0')]
+    message = generate_notification_message(changes)
+    body = generate_email_body(changes, 'selftest', 'https://example.com/pull/1')
+    assert '**Util**: `2.1.1` → `3.0.0` (major)' in message, message
+    assert 'Util: 2.1.1 → 3.0.0 (major)' in body, body
+    return "PR comment and email rendering"
+
+
+CHECKS: List[Tuple[str, Callable[[], str]]] = [
+    ("Streaming extraction", check_streaming),
+    ("Maven model", check_maven_model),
+    ("Version ordering", check_versioning),
+    ("Mismatches", check_mismatches),
+    ("Rendering", check_rendering),
+]
+
+
+def main(argv: List[str] = None) -> int:
+    argparse.ArgumentParser(description="Check the sharedlibs parsers and comparison on built-in samples"
+                            ).parse_args(argv)
+    passed = 0
+    for name, check in CHECKS:
+        try:
+            detail = check()
+        except Exception as e:  # any failure is a failed check, reported with its cause
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+        else:
+            print(f"✅ {name}: {detail}")
+            passed += 1
+    print(f"\n📊 Results: {passed}/{len(CHECKS)} checks passed (Python {sys.version.split()[0]})")
+    return 0 if passed == len(CHECKS) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
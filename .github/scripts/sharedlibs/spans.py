@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Lightweight timing spans for the shared library checks.
+
+Stages are wrapped in `with span('name'):` and every parsed build file is
+recorded with record_file(); at the end of a run emit() writes the spans as
+JSON to GITHUB_OUTPUT (`timings=`) and as a table to GITHUB_STEP_SUMMARY, or
+to stderr outside Actions. A span costs two perf_counter() calls and a list
+append, so they stay on; set SHAREDLIBS_SPANS=0 to turn them off entirely.
+
+--profile (see add_profile_argument/profiled) additionally runs the command
+under cProfile and dumps the pstats file for `python -m pstats` or snakeviz.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ENABLED = os.environ.get('SHAREDLIBS_SPANS', '1') != '0'
+SLOWEST_FILES = 10
+DEFAULT_PROFILE = 'sharedlibs.pstats'
+
+_origin = time.perf_counter()
+_depth = 0
+_spans: List[Tuple[str, int, float, float]] = []  # (name, depth, start, seconds)
+_files: List[Tuple[str, float, bool]] = []  # (file, seconds, cached)
+
+
+class span:
+    """Context manager timing one stage; nested spans are indented in the table"""
+
+    __slots__ = ('name', '_start', '_index')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> 'span':
+        global _depth
+        if ENABLED:
+            # Reserve the slot now so spans stay in start order
+            self._index = len(_spans)
+            _spans.append((self.name, _depth, 0.0, 0.0))
+            _depth += 1
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _depth
+        if ENABLED:
+            end = time.perf_counter()
+            _depth -= 1
+            _spans[self._index] = (self.name, _depth, self._start - _origin, end - self._start)
+
+
+def record_file(file: str, seconds: float, cached: bool = False) -> None:
+    """Record how long reading one build file took (cached = parse cache hit)"""
+    if ENABLED:
+        _files.append((file, seconds, cached))
+
+
+def reset() -> None:
+    global _origin, _depth
+    _spans.clear()
+    _files.clear()
+    _depth = 0
+    _origin = time.perf_counter()
+
+
+def timings() -> Dict[str, object]:
+    """Spans and a per-file parse summary as a JSON-serialisable dict"""
+    slowest = sorted(_files, key=lambda f: f[1], reverse=True)[:SLOWEST_FILES]
+    return {
+        'spans': [{'name': name, 'depth': depth, 'start_ms': round(start * 1000, 3),
+                   'ms': round(seconds * 1000, 3)} for name, depth, start, seconds in _spans],
+        'files': {
+            'count': len(_files),
+            'cached': sum(1 for f in _files if f[2]),
+            'total_ms': round(sum(f[1] for f in _files) * 1000, 3),
+            'slowest': [{'file': file, 'ms': round(seconds * 1000, 3), 'cached': cached}
+                        for file, seconds, cached in slowest],
+        },
+    }
+
+
+def summary_table(title: str, data: Optional[Dict[str, object]] = None) -> str:
+    """Markdown table of the spans and the slowest files"""
+    data = data if data is not None else timings()
+    lines = [f"### ⏱️ {title}", "", "| Stage | ms |", "|---|---:|"]
+    for s in data['spans']:
+        indent = '&nbsp;&nbsp;' * s['depth']
+        lines.append(f"| {indent}{s['name']} | {s['ms']:.1f} |")
+    files = data['files']
+    if files['count']:
+        lines += ["", f"{files['count']} build files read in {files['total_ms']:.1f} ms "
+                      f"({files['cached']} from the parse cache)", "", "| File | ms | cached |", "|---|---:|:---:|"]
+        for f in files['slowest']:
+            lines.append(f"| `{f['file']}` | {f['ms']:.1f} | {'✓' if f['cached'] else ''} |")
+    return '\n'.join(lines) + '\n'
+
+
+def emit(title: str) -> None:
+    """Write the timings to GITHUB_OUTPUT and GITHUB_STEP_SUMMARY, or to stderr"""
+    if not ENABLED or not (_spans or _files):
+        return
+    data = timings()
+    if 'GITHUB_OUTPUT' in os.environ:
+        with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+            f.write(f"timings={json.dumps(data, separators=(',', ':'))}\n")
+    if 'GITHUB_STEP_SUMMARY' in os.environ:
+        with open(os.environ['GITHUB_STEP_SUMMARY'], 'a', encoding='utf-8') as f:
+            f.write(summary_table(title, data) + '\n')
+    else:
+        for s in data['spans']:
+            print(f"{'  ' * s['depth']}{s['name']}: {s['ms']:.1f} ms", file=sys.stderr)
+        if data['files']['count']:
+            print(f"{data['files']['count']} build files read in {data['files']['total_ms']:.1f} ms",
+                  file=sys.stderr)
+
+
+def add_profile_argument(parser) -> None:
+    """Add --profile [PATH] to an argparse parser"""
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_PROFILE, metavar='PATH',
+                        help=f"run under cProfile and dump pstats to PATH (default: {DEFAULT_PROFILE})")
+
+
+@contextmanager
+def profiled(path: Optional[str], top: int = 25) -> Iterator[None]:
+    """Run the block under cProfile when path is set; dump pstats there and print the top entries"""
+    if not path:
+        yield
+        return
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"Profile written to {path}", file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(top)
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Version-drift history of the shared libraries from one streamed `git log -p`.
+
+For each repository a single `git log -p --reverse` over pom.xml/ivy.xml is
+read line by line. A running {file: {library: version}} state (plus POM
+property values, so `${common.version}` bumps are seen) is updated from each
+hunk; nothing is checked out and no revision is re-parsed as a whole. Ivy
+<dependency> tags may span several lines and use either quote style. Memory
+is bounded by the number of tracked files, libraries and properties, not by
+the length of the history: the logs of all repos are merged by commit time
+and each version change is printed as it is read, followed by the period
+during which the repos disagreed as soon as they agree again.
+
+Usage:
+    python .github/scripts/version_history.py                     # this repo
+    python .github/scripts/version_history.py --repo cl-clpss --repo cl-ccl1 \\
+        --repo cl-jobserver --repo cl-jobschedular
+"""
+
+import argparse
+import heapq
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .config import SHARED_LIBRARIES
+from .identity import canonical
+from .maven_model import interpolate
+
+DEFAULT_PATHS = ['pom.xml', 'ivy.xml']
+COMMIT_MARKER = '\x01'
+CONTEXT_LINES = 6
+
+_ARTIFACT = re.compile(r'<artifactId>\s*([^<\s]+)\s*</artifactId>')
+_GROUP = re.compile(r'<groupId>\s*([^<\s]+)\s*</groupId>')
+_VERSION = re.compile(r'<version>\s*([^<\s]+)\s*</version>')
+_PROPERTY = re.compile(r'^\s*<([A-Za-z_][\w.\-]*)>\s*([^<]*?)\s*</\1>\s*$')
+_IVY_DEP_START = re.compile(r'<dependency(?=[\s/>]|$)')
+_ATTR = re.compile(r'''(\w+)\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+_POM_TAGS = frozenset(('groupId', 'artifactId', 'version', 'scope', 'type', 'classifier', 'optional',
+                       'packaging', 'name', 'description', 'url', 'modelVersion', 'relativePath',
+                       'id', 'phase', 'goal', 'module', 'directory', 'finalName'))
+
+
+class Event(NamedTuple):
+    """A library changed version in one file of one repo"""
+    timestamp: int
+    commit: str
+    repo: str
+    path: str
+    library: str
+    version: Optional[str]  # None when removed
+
+
+class _Side:
+    """Tracks the dependency being read on one side (old or new) of a hunk"""
+    __slots__ = ('artifact', 'group', 'pending')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.artifact = None
+        self.group = None
+        self.pending = None
+
+
+class _IvySide:
+    """The <dependency> tag being read on one side of a hunk, which may span lines"""
+    __slots__ = ('tag', 'touched')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tag: Optional[str] = None
+        self.touched = False
+
+
+class FileState:
+    """Running state of one build file"""
+    __slots__ = ('declared', 'properties', 'effective')
+
+    def __init__(self):
+        self.declared: Dict[str, str] = {}
+        self.properties: Dict[str, str] = {}
+        self.effective: Dict[str, str] = {}
+
+
+class _CommitChanges:
+    """Per-file changes collected while reading one commit's hunks"""
+    __slots__ = ('added', 'removed', 'props_added', 'props_removed')
+
+    def __init__(self):
+        self.added: Dict[str, str] = {}
+        self.removed: Set[str] = set()
+        self.props_added: Dict[str, str] = {}
+        self.props_removed: Set[str] = set()
+
+
+def _stream_log(repo: Path, paths: List[str]) -> Iterator[str]:
+    """Yield `git log -p` output lines oldest commit first"""
+    cmd = ['git', '-C', str(repo), 'log', '--reverse', '--first-parent', '-m', '-p', '--no-color',
+           '--no-ext-diff', f'-U{CONTEXT_LINES}', f'--format={COMMIT_MARKER}%H %ct']
+    if len(paths) == 1:
+        cmd.append('--follow')
+    cmd.append('--')
+    cmd.extend(paths)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for raw in proc.stdout:
+            yield raw.decode('utf-8', errors='replace').rstrip('\n')
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+
+def _handle_pom_line(text: str, side: _Side, changed: Optional[_CommitChanges], adding: bool,
+                     tracked: Set[str]) -> None:
+    """Update one side's dependency tracking; record a change for +/- lines"""
+    if '<dependency>' in text or '<dependency ' in text:
+        side.reset()
+    group = _GROUP.search(text)
+    if group:
+        side.group = group.group(1)
+    artifact = _ARTIFACT.search(text)
+    if artifact:
+        side.artifact = artifact.group(1)
+    version = _VERSION.search(text)
+    if version:
+        side.pending = (version.group(1), changed is not None)
+
+    if side.artifact is not None and side.pending is not None:
+        value, was_changed = side.pending
+        side.pending = None
+        # The groupId, when it came first, picks out group-qualified aliases
+        library = canonical(side.artifact, side.group)
+        if was_changed and library in tracked:
+            if adding:
+                changed.added[library] = value
+            else:
+                changed.removed.add(library)
+    if '</dependency>' in text:
+        side.reset()
+
+    if changed is not None:
+        prop = _PROPERTY.match(text)
+        if prop and prop.group(1) not in _POM_TAGS:
+            if adding:
+                changed.props_added[prop.group(1)] = prop.group(2)
+            else:
+                changed.props_removed.add(prop.group(1))
+
+
+def _handle_ivy_line(text: str, side: _IvySide, changed: _CommitChanges, is_change: bool, adding: bool,
+                     tracked: Set[str]) -> None:
+    """
+    Collect one side's <dependency> tags line by line; a tag any +/- line of
+    which belongs to records a change once it is complete
+    """
+    while text:
+        if side.tag is None:
+            start = _IVY_DEP_START.search(text)
+            if start is None:
+                return
+            text = text[start.start():]
+            side.tag = ''
+        end = text.find('>')
+        side.tag += (text if end < 0 else text[:end + 1]) + ' '
+        side.touched |= is_change
+        if end < 0:
+            return
+        text = text[end + 1:]
+        tag, touched = side.tag, side.touched
+        side.reset()
+        if not touched:
+            continue
+        attrs = {key: double or single for key, double, single in _ATTR.findall(tag)}
+        name, rev = canonical(attrs.get('name'), attrs.get('org')), attrs.get('rev')
+        if name in tracked and rev:
+            if adding:
+                changed.added[name] = rev
+            else:
+                changed.removed.add(name)
+
+
+def _apply(state: FileState, changes: _CommitChanges, tracked: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Fold a commit's changes into the file state; return {library: new effective version}"""
+    for lib in changes.removed - changes.added.keys():
+        state.declared.pop(lib, None)
+    state.declared.update(changes.added)
+    for name in changes.props_removed - changes.props_added.keys():
+        state.properties.pop(name, None)
+    state.properties.update(changes.props_added)
+
+    updates = {}
+    for lib in tracked:
+        declared = state.declared.get(lib)
+        value = interpolate(declared, state.properties) if declared is not None else None
+        if value != state.effective.get(lib):
+            updates[lib] = value
+            if value is None:
+                state.effective.pop(lib, None)
+            else:
+                state.effective[lib] = value
+    return updates
+
+
+def history_events(repo: Path, tracked: Iterable[str], paths: List[str] = None,
+                   repo_name: Optional[str] = None) -> Iterator[Event]:
+    """Stream version change events for one repository, oldest first"""
+    tracked = list(tracked)
+    wanted = set(tracked)
+    name = repo_name or Path(repo).resolve().name
+    states: Dict[str, FileState] = {}
+
+    commit, timestamp = None, 0
+    current_path: Optional[str] = None
+    changes: Dict[str, _CommitChanges] = {}
+    old_side, new_side = _Side(), _Side()
+    old_ivy, new_ivy = _IvySide(), _IvySide()
+
+    def flush() -> Iterator[Event]:
+        for path, file_changes in changes.items():
+            if file_changes is None:
+                # File deleted: everything it declared goes away
+                state = states.pop(path, None)
+                for lib in (state.effective if state else {}):
+                    yield Event(timestamp, commit, name, path, lib, None)
+                continue
+            state = states.setdefault(path, FileState())
+            for lib, version in _apply(state, file_changes, tracked).items():
+                yield Event(timestamp, commit, name, path, lib, version)
+        changes.clear()
+
+    for line in _stream_log(Path(repo), paths or DEFAULT_PATHS):
+        if line.startswith(COMMIT_MARKER):
+            yield from flush()
+            sha, _, ts = line[1:].partition(' ')
+            commit, timestamp = sha, int(ts or 0)
+            current_path = None
+            continue
+        if line.startswith('diff --git '):
+            current_path = line.rsplit(' b/', 1)[-1]
+            changes.setdefault(current_path, _CommitChanges())
+            continue
+        if current_path is None:
+            continue
+        if line.startswith('+++ ') or line.startswith('--- '):
+            if line == '+++ /dev/null':
+                changes[current_path] = None
+            continue
+        if line.startswith('@@'):
+            old_side.reset()
+            new_side.reset()
+            old_ivy.reset()
+            new_ivy.reset()
+            continue
+        file_changes = changes.get(current_path)
+        if file_changes is None or not line:
+            continue
+
+        marker, text = line[0], line[1:]
+        is_ivy = current_path.endswith('ivy.xml')
+        if marker == '+':
+            if is_ivy:
+                _handle_ivy_line(text, new_ivy, file_changes, True, True, wanted)
+            else:
+                _handle_pom_line(text, new_side, file_changes, True, wanted)
+        elif marker == '-':
+            if is_ivy:
+                _handle_ivy_line(text, old_ivy, file_changes, True, False, wanted)
+            else:
+                _handle_pom_line(text, old_side, file_changes, False, wanted)
+        elif marker == ' ':
+            if is_ivy:
+                _handle_ivy_line(text, old_ivy, file_changes, False, False, wanted)
+                _handle_ivy_line(text, new_ivy, file_changes, False, True, wanted)
+            else:
+                _handle_pom_line(text, old_side, None, False, wanted)
+                _handle_pom_line(text, new_side, None, True, wanted)
+    yield from flush()
+
+
+def _date(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def build_timelines(events: Iterable[Event]) -> Dict[str, Dict[Tuple[str, str], List[Event]]]:
+    """Group events into {library: {(repo, path): [events]}}"""
+    timelines: Dict[str, Dict[Tuple[str, str], List[Event]]] = {}
+    for event in events:
+        timelines.setdefault(event.library, {}).setdefault((event.repo, event.path), []).append(event)
+    return timelines
+
+
+Period = Tuple[int, Optional[int], Dict[str, str]]  # (start, end or None if still open, {row: version at start})
+
+
+class AlignmentTracker:
+    """Current version of one library in every row, and the misaligned period in progress"""
+    __slots__ = ('current', 'open')
+
+    def __init__(self):
+        self.current: Dict[str, str] = {}
+        self.open: Optional[Period] = None
+
+    def update(self, event: Event) -> Optional[Period]:
+        """Apply an event (in time order); return the misaligned period it closes, if any"""
+        row = f"{event.repo}:{event.path}"
+        if event.version is None:
+            self.current.pop(row, None)
+        else:
+            self.current[row] = event.version
+        aligned = len(set(self.current.values())) <= 1
+        if not aligned and self.open is None:
+            self.open = (event.timestamp, None, dict(self.current))
+        elif aligned and self.open is not None:
+            closed, self.open = (self.open[0], event.timestamp, self.open[2]), None
+            return closed
+        return None
+
+
+def misaligned_periods(rows: Dict[Tuple[str, str], List[Event]]) -> List[Period]:
+    """Periods during which the rows of one library disagreed"""
+    tracker = AlignmentTracker()
+    periods = []
+    for event in sorted((e for events in rows.values() for e in events), key=lambda e: e.timestamp):
+        opened = tracker.open is None
+        closed = tracker.update(event)
+        if closed is not None:
+            periods[-1] = closed
+        elif opened and tracker.open is not None:
+            periods.append(tracker.open)
+    return periods
+
+
+def merged_events(repos: Iterable[Path], tracked: Iterable[str], paths: List[str] = None) -> Iterator[Event]:
+    """Events of every repo merged by commit time; each repo's log is read only as far as needed"""
+    tracked = list(tracked)
+    return heapq.merge(*(history_events(repo, tracked, paths) for repo in repos), key=lambda e: e.timestamp)
+
+
+def _describe_period(library: str, period: Period, now: int) -> str:
+    start, end, versions = period
+    days = ((end or now) - start) / 86400
+    until = _date(end) if end else "now"
+    detail = ", ".join(f"{row}={v}" for row, v in versions.items())
+    return f"  ⚠️  {library} misaligned {_date(start)} → {until} ({days:.1f} days): {detail}"
+
+
+def print_report(timelines: Dict[str, Dict[Tuple[str, str], List[Event]]], libraries: List[str]) -> None:
+    """Print the per-library timeline and misalignment periods"""
+    now = int(time.time())
+    for lib in libraries:
+        rows = timelines.get(lib)
+        if not rows:
+            continue
+        print(f"{lib}")
+        for (repo, path), events in rows.items():
+            steps = " → ".join(f"{e.version or 'REMOVED'} ({_date(e.timestamp)}, {e.commit[:7]})" for e in events)
+            print(f"  {repo} ({path}): {steps}")
+        for period in misaligned_periods(rows):
+            print(_describe_period(lib, period, now))
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Shared library version history from git log")
+    parser.add_argument('--repo', action='append', type=Path,
+                        help="repository to read (repeatable; default: current directory)")
+    parser.add_argument('--path', action='append', dest='paths',
+                        help="build file path inside each repo (repeatable; default: pom.xml, ivy.xml)")
+    args = parser.parse_args(argv)
+
+    repos = args.repo or [Path('.')]
+    start = time.perf_counter()
+    trackers: Dict[str, AlignmentTracker] = {}
+    now = int(time.time())
+    count = 0
+    try:
+        for event in merged_events(repos, SHARED_LIBRARIES, args.paths):
+            count += 1
+            print(f"{_date(event.timestamp)} {event.commit[:7]} {event.repo} ({event.path}): "
+                  f"{event.library} {event.version or 'REMOVED'}", flush=True)
+            closed = trackers.setdefault(event.library, AlignmentTracker()).update(event)
+            if closed is not None:
+                print(_describe_period(event.library, closed, now), flush=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Git operation failed: {e}")
+        return 1
+
+    for lib in SHARED_LIBRARIES:
+        tracker = trackers.get(lib)
+        if tracker is not None and tracker.open is not None:
+            print(_describe_period(lib, tracker.open, now))
+    print(f"\n{count} version changes across {len(repos)} repos in "
+          f"{time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
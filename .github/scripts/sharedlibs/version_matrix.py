@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained repo x library version matrix.
+
+compare_shared_lib_versions used to rebuild the whole matrix and rescan every
+library column on each run. VersionMatrix keeps, per library, a count of how
+many repos use each version, so replacing one repo's row only touches the
+columns whose value actually changed and the set of mismatched libraries is
+always up to date. The matrix is persisted as a JSON snapshot between runs,
+counts and the build files of each row included, so loading it recounts
+nothing and an incremental run finds the rows of changed files without
+expanding the manifest.
+
+CompactMatrix is the one-shot form for org-wide scans: repos, libraries and
+versions are interned to integer IDs and each library is one array column of
+version codes, so thousands of repos cost a few bytes per cell instead of a
+dict entry, and mismatches are a per-column distinct count (NumPy when it is
+installed and the matrix is large, otherwise set() over each array).
+"""
+
+import json
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+SNAPSHOT_FORMAT = 2
+# Below this many cells importing NumPy costs more than the set() fallback saves
+NUMPY_MIN_CELLS = 200_000
+
+Mismatch = Tuple[str, Dict[str, str]]
+
+
+class VersionMatrix:
+    """
+    {repo: {library: version}} rows plus per-library version counts.
+
+    mismatches() returns exactly what find_mismatches() would on the same
+    rows: libraries in tracking order, repos in row order. files records the
+    (path, kind) build files scanned into each row, for incremental rescans.
+    """
+
+    def __init__(self, libraries: Iterable[str]):
+        self.libraries = list(libraries)
+        self._tracked = set(self.libraries)
+        self.rows: Dict[str, Dict[str, str]] = {}
+        self.files: Dict[str, List[Tuple[str, str]]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {lib: {} for lib in self.libraries}
+        self._mismatched: Set[str] = set()
+
+    @classmethod
+    def build(cls, all_versions: Dict[str, Dict[str, str]], libraries: Iterable[str]) -> 'VersionMatrix':
+        """Full rebuild from {repo: {library: version}}"""
+        matrix = cls(libraries)
+        for repo, versions in all_versions.items():
+            matrix.update_repo(repo, versions)
+        return matrix
+
+    def _add(self, lib: str, version: str) -> None:
+        counts = self._counts[lib]
+        counts[version] = counts.get(version, 0) + 1
+
+    def _discard(self, lib: str, version: str) -> None:
+        counts = self._counts[lib]
+        counts[version] -= 1
+        if not counts[version]:
+            del counts[version]
+
+    def update_repo(self, repo: str, versions: Dict[str, str]) -> Set[str]:
+        """
+        Replace repo's row and re-check only the libraries whose value changed.
+        Returns the set of affected libraries.
+        """
+        new = {lib: v for lib, v in versions.items() if lib in self._tracked}
+        old = self.rows.get(repo, {})
+        affected = set()
+        for lib in old.keys() | new.keys():
+            before, after = old.get(lib), new.get(lib)
+            if before == after:
+                continue
+            if before is not None:
+                self._discard(lib, before)
+            if after is not None:
+                self._add(lib, after)
+            affected.add(lib)
+
+        self.rows[repo] = new
+        for lib in affected:
+            if len(self._counts[lib]) > 1:
+                self._mismatched.add(lib)
+            else:
+                self._mismatched.discard(lib)
+        return affected
+
+    def remove_repo(self, repo: str) -> Set[str]:
+        """Drop repo from the matrix; returns the affected libraries"""
+        if repo not in self.rows:
+            return set()
+        affected = self.update_repo(repo, {})
+        del self.rows[repo]
+        self.files.pop(repo, None)
+        return affected
+
+    def column(self, lib: str) -> Dict[str, str]:
+        """{repo: version} for one library, in row order"""
+        return {repo: row[lib] for repo, row in self.rows.items() if lib in row}
+
+    def is_mismatched(self, lib: str) -> bool:
+        return lib in self._mismatched
+
+    def mismatches(self, libraries: Optional[Iterable[str]] = None) -> List[Mismatch]:
+        """[(lib, {repo: version})] for mismatched libraries, optionally restricted to some"""
+        if libraries is None:
+            wanted = self.libraries
+        else:
+            subset = set(libraries)
+            wanted = [lib for lib in self.libraries if lib in subset]
+        return [(lib, self.column(lib)) for lib in wanted if lib in self._mismatched]
+
+    def to_json(self) -> dict:
+        return {'format': SNAPSHOT_FORMAT, 'libraries': self.libraries, 'rows': self.rows,
+                'counts': self._counts, 'files': self.files}
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the snapshot atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], libraries: Iterable[str]) -> Optional['VersionMatrix']:
+        """
+        Read a snapshot; None if it is missing, unreadable or was built for a
+        different library list (a full rebuild is needed then). The saved
+        counts are used as they are: only the mismatched set is derived.
+        """
+        libraries = list(libraries)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('format') != SNAPSHOT_FORMAT or data.get('libraries') != libraries:
+            return None
+        matrix = cls(libraries)
+        matrix.rows = data.get('rows', {})
+        matrix.files = {row: [tuple(entry) for entry in entries] for row, entries in data.get('files', {}).items()}
+        counts = data.get('counts', {})
+        matrix._counts = {lib: counts.get(lib, {}) for lib in libraries}
+        matrix._mismatched = {lib for lib, versions in matrix._counts.items() if len(versions) > 1}
+        return matrix
+
+
+class Interner:
+    """Dense integer IDs for strings; ID 0 is reserved for "absent"."""
+    __slots__ = ('ids', 'names')
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[Optional[str]] = [None]
+
+    def intern(self, name: str) -> int:
+        code = self.ids.get(name)
+        if code is None:
+            code = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.names) - 1
+
+
+class CompactMatrix:
+    """
+    Read-only repo x library matrix of interned version codes.
+
+    columns[i][j] is the version code of library i in repo j (0 when the repo
+    doesn't use it). mismatches() returns the same list as find_mismatches()
+    and VersionMatrix.mismatches() on the same rows.
+    """
+    __slots__ = ('libraries', 'repos', 'versions', 'columns')
+
+    def __init__(self, libraries: Iterable[str]):
+        self.libraries = Interner()
+        for lib in libraries:
+            self.libraries.intern(lib)
+        self.repos = Interner()
+        self.versions = Interner()
+        self.columns: List[array] = [array('i') for _ in range(len(self.libraries))]
+
+    @classmethod
+    def build(cls, all_versions: Dict[str, Dict[str, str]], libraries: Iterable[str]) -> 'CompactMatrix':
+        matrix = cls(libraries)
+        for repo, versions in all_versions.items():
+            matrix.add_repo(repo, versions)
+        return matrix
+
+    def add_repo(self, repo: str, versions: Dict[str, str]) -> None:
+        """Append a row; untracked libraries are ignored"""
+        if repo in self.repos.ids:
+            raise ValueError(f"duplicate row {repo!r}")
+        self.repos.intern(repo)
+        lib_ids, intern = self.libraries.ids, self.versions.intern
+        row = [0] * len(self.columns)
+        for lib, version in versions.items():
+            index = lib_ids.get(lib)
+            if index is not None and version is not None:
+                row[index - 1] = intern(version)
+        for column, code in zip(self.columns, row):
+            column.append(code)
+
+    def distinct_counts(self) -> List[int]:
+        """Number of distinct versions (absent not counted) per library column"""
+        if not self.columns or not len(self.repos):
+            return [0] * len(self.columns)
+        if len(self.columns) * len(self.repos) >= NUMPY_MIN_CELLS:
+            try:
+                import numpy
+            except ImportError:
+                pass
+            else:
+                codes = numpy.sort(numpy.vstack([numpy.frombuffer(c, dtype=numpy.intc) for c in self.columns]),
+                                   axis=1)
+                # Distinct values are the first one plus every step; a leading 0 is "absent"
+                counts = 1 + numpy.count_nonzero(numpy.diff(codes, axis=1), axis=1) - (codes[:, 0] == 0)
+                return counts.tolist()
+        return [len(set(column)) - (0 in column) for column in self.columns]
+
+    def column(self, lib: str) -> Dict[str, str]:
+        """{repo: version} for one library, in row order"""
+        index = self.libraries.ids.get(lib)
+        if index is None:
+            return {}
+        repos, versions = self.repos.names, self.versions.names
+        return {repos[row]: versions[code] for row, code in enumerate(self.columns[index - 1], 1) if code}
+
+    def mismatches(self, libraries: Optional[Iterable[str]] = None) -> List[Mismatch]:
+        """[(lib, {repo: version})] for libraries with more than one version"""
+        wanted = None if libraries is None else set(libraries)
+        return [(lib, self.column(lib))
+                for lib, count in zip(self.libraries.names[1:], self.distinct_counts())
+                if count > 1 and (wanted is None or lib in wanted)]
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Version ordering, Ivy/Maven range matching and bump classification.
+
+Versions are ordered the way Maven's ComparableVersion orders them: the
+string is split into numbers and qualifiers at '.', '-' and digit/letter
+transitions, known qualifiers rank alpha < beta < milestone < rc < snapshot
+< release < sp, and trailing zeros are insignificant (1.0 == 1.0.0). Ivy
+revisions are compared with the same rules. Parsed versions and constraints
+are memoized and their canonical strings interned, so sorting or comparing
+thousands of versions parses each distinct string once.
+
+classify_change() turns an (old, new) pair from get_changed_libraries() into
+one of CHANGE_KINDS; needs_escalation() decides, with
+email_config.CRITICAL_LIBRARIES, whether the notification must be escalated.
+"""
+
+import re
+import sys
+from functools import lru_cache, total_ordering
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .email_config import ARTIFACT_LIBRARIES, CRITICAL_LIBRARIES
+from .identity import canonical
+
+CHANGE_KINDS = ('major', 'minor', 'patch', 'downgrade', 'range-satisfied', 'added', 'removed', 'none')
+ESCALATED_KINDS = frozenset(('major', 'downgrade', 'removed'))
+
+# Markers used by get_changed_libraries() for a missing side
+NOT_FOUND = "NOT_FOUND"
+REMOVED = "REMOVED"
+
+_QUALIFIERS = ('alpha', 'beta', 'milestone', 'rc', 'snapshot', '', 'sp')
+_QUALIFIER_RANK = {q: str(i) for i, q in enumerate(_QUALIFIERS)}
+_RELEASE_RANK = _QUALIFIER_RANK['']
+_ALIASES = {'ga': '', 'final': '', 'release': '', 'cr': 'rc'}
+_SHORT_ALIASES = {'a': 'alpha', 'b': 'beta', 'm': 'milestone'}
+
+# Items are int (number), str (qualifier, aliases applied) or tuple (a '-' sub-list)
+Item = Union[int, str, tuple]
+
+
+def _qualifier_key(value: str) -> str:
+    rank = _QUALIFIER_RANK.get(value)
+    return rank if rank is not None else f"{len(_QUALIFIERS)}-{value}"
+
+
+def _compare_item(left: Item, right: Optional[Item]) -> int:
+    """Maven Item.compareTo; right is None past the end of the shorter list"""
+    if right is None:
+        if isinstance(left, int):
+            return 1 if left else 0
+        if isinstance(left, str):
+            key = _qualifier_key(left)
+            return (key > _RELEASE_RANK) - (key < _RELEASE_RANK)
+        return _compare_item(left[0], None) if left else 0
+
+    if isinstance(left, int):
+        if isinstance(right, int):
+            return (left > right) - (left < right)
+        return 1
+    if isinstance(left, str):
+        if isinstance(right, int):
+            return -1
+        if isinstance(right, str):
+            a, b = _qualifier_key(left), _qualifier_key(right)
+            return (a > b) - (a < b)
+        return -1
+    if isinstance(right, int):
+        return -1
+    if isinstance(right, str):
+        return 1
+    return _compare_list(left, right)
+
+
+def _compare_list(left: tuple, right: tuple) -> int:
+    for i in range(max(len(left), len(right))):
+        a = left[i] if i < len(left) else None
+        b = right[i] if i < len(right) else None
+        if a is None:
+            result = 0 if b is None else -_compare_item(b, None)
+        else:
+            result = _compare_item(a, b)
+        if result:
+            return result
+    return 0
+
+
+def _is_null(item: Item) -> bool:
+    if isinstance(item, int):
+        return item == 0
+    if isinstance(item, str):
+        return item == ''
+    return not item
+
+
+def _normalize(items: list) -> None:
+    """Drop trailing null items (0, '', empty sub-lists) like ListItem.normalize"""
+    for i in range(len(items) - 1, -1, -1):
+        item = items[i]
+        if _is_null(item):
+            del items[i]
+        elif not isinstance(item, list):
+            break
+
+
+def _parse_item(is_digit: bool, text: str, followed_by_digit: bool = False) -> Item:
+    if is_digit:
+        return int(text)
+    if followed_by_digit and len(text) == 1:
+        text = _SHORT_ALIASES.get(text, text)
+    return sys.intern(_ALIASES.get(text, text))
+
+
+def _freeze(items: list) -> tuple:
+    return tuple(_freeze(i) if isinstance(i, list) else i for i in items)
+
+
+def _render(items: tuple) -> str:
+    out = []
+    for item in items:
+        if out:
+            out.append('-' if isinstance(item, tuple) else '.')
+        out.append(_render(item) if isinstance(item, tuple) else str(item))
+    return ''.join(out)
+
+
+@total_ordering
+class ComparableVersion:
+    """A parsed version; obtain instances through parse_version() so they are shared"""
+    __slots__ = ('value', 'canonical', 'items', '_numeric')
+
+    def __init__(self, value: str):
+        self.value = value
+        self.items = self._parse(value.lower())
+        self.canonical = sys.intern(_render(self.items))
+        # Normalized all-number versions order like plain tuples
+        self._numeric = all(isinstance(item, int) for item in self.items)
+
+    @staticmethod
+    def _parse(version: str) -> tuple:
+        root: list = []
+        current = root
+        stack = [root]
+        is_digit = False
+        start = 0
+        for i, c in enumerate(version):
+            if c == '.':
+                current.append(0 if i == start else _parse_item(is_digit, version[start:i]))
+                start = i + 1
+            elif c == '-':
+                current.append(0 if i == start else _parse_item(is_digit, version[start:i]))
+                start = i + 1
+                sub: list = []
+                current.append(sub)
+                current = sub
+                stack.append(sub)
+            elif c.isdigit():
+                if not is_digit and i > start:
+                    current.append(_parse_item(False, version[start:i], followed_by_digit=True))
+                    start = i
+                    sub = []
+                    current.append(sub)
+                    current = sub
+                    stack.append(sub)
+                is_digit = True
+            else:
+                if is_digit and i > start:
+                    current.append(_parse_item(True, version[start:i]))
+                    start = i
+                    sub = []
+                    current.append(sub)
+                    current = sub
+                    stack.append(sub)
+                is_digit = False
+        if len(version) > start:
+            current.append(_parse_item(is_digit, version[start:]))
+        while stack:
+            _normalize(stack.pop())
+        return _freeze(root)
+
+    @property
+    def release(self) -> Tuple[int, ...]:
+        """Leading numeric components, e.g. (2, 1, 3) for 2.1.3-SNAPSHOT"""
+        numbers = []
+        for item in self.items:
+            if not isinstance(item, int):
+                break
+            numbers.append(item)
+        return tuple(numbers)
+
+    def __eq__(self, other):
+        if not isinstance(other, ComparableVersion):
+            return NotImplemented
+        return self.canonical == other.canonical
+
+    def __lt__(self, other):
+        if not isinstance(other, ComparableVersion):
+            return NotImplemented
+        if self._numeric and other._numeric:
+            return self.items < other.items
+        return _compare_list(self.items, other.items) < 0
+
+    def __hash__(self):
+        return hash(self.canonical)
+
+    def __repr__(self):
+        return f"ComparableVersion({self.value!r})"
+
+
+@lru_cache(maxsize=16384)
+def parse_version(value: str) -> ComparableVersion:
+    return ComparableVersion(value.strip())
+
+
+def compare_versions(a: str, b: str) -> int:
+    """-1, 0 or 1 by Maven ordering"""
+    return _compare_list(parse_version(a).items, parse_version(b).items)
+
+
+def sort_versions(versions: Iterable[str]) -> List[str]:
+    return sorted(versions, key=parse_version)
+
+
+class Restriction(NamedTuple):
+    lower: Optional[ComparableVersion]
+    lower_inclusive: bool
+    upper: Optional[ComparableVersion]
+    upper_inclusive: bool
+
+    def contains(self, version: ComparableVersion) -> bool:
+        if self.lower is not None:
+            if version < self.lower or (version == self.lower and not self.lower_inclusive):
+                return False
+        if self.upper is not None:
+            if version > self.upper or (version == self.upper and not self.upper_inclusive):
+                return False
+        return True
+
+
+class Constraint(NamedTuple):
+    """A dynamic version: a (union of) range(s), an Ivy 'x.y.+' prefix or latest.<status>"""
+    spec: str
+    restrictions: Tuple[Restriction, ...] = ()
+    prefix: Optional[str] = None
+    latest: Optional[str] = None
+
+    def matches(self, version: str) -> bool:
+        if self.latest is not None:
+            # latest.integration takes anything; release/milestone skip snapshots
+            return self.latest == 'integration' or 'snapshot' not in version.lower()
+        if self.prefix is not None:
+            return version.startswith(self.prefix)
+        parsed = parse_version(version)
+        return any(r.contains(parsed) for r in self.restrictions)
+
+    @property
+    def floor(self) -> Optional[ComparableVersion]:
+        """Lowest bound of the constraint, used to classify changes to or from it"""
+        if self.prefix is not None:
+            return parse_version(self.prefix.rstrip('.-') or '0')
+        lowers = [r.lower for r in self.restrictions if r.lower is not None]
+        return min(lowers) if lowers else None
+
+
+# [1.0,2.0)  (,1.0]  [1.2]  and Ivy's ]1.0,2.0[ exclusive brackets
+_RESTRICTION = re.compile(r'\s*([\[\]\(])([^\[\]\(\),]*)(?:,([^\[\]\(\),]*))?([\]\[\)])\s*(?:,|$)')
+
+
+@lru_cache(maxsize=4096)
+def parse_constraint(spec: str) -> Optional[Constraint]:
+    """Constraint for a dynamic version spec, None for a plain version"""
+    spec = spec.strip()
+    if spec.startswith('latest.'):
+        return Constraint(spec, latest=spec[len('latest.'):])
+    if spec.endswith('+'):
+        return Constraint(spec, prefix=spec[:-1])
+    if not spec or spec[0] not in '[](':
+        return None
+
+    restrictions = []
+    pos = 0
+    while pos < len(spec):
+        match = _RESTRICTION.match(spec, pos)
+        if not match:
+            return None
+        opener, low, high, closer = match.groups()
+        low = low.strip()
+        if high is None:
+            # [1.0] pins exactly one version
+            version = parse_version(low) if low else None
+            restrictions.append(Restriction(version, True, version, True))
+        else:
+            high = high.strip()
+            restrictions.append(Restriction(parse_version(low) if low else None, opener == '[',
+                                            parse_version(high) if high else None, closer == ']'))
+        pos = match.end()
+    return Constraint(spec, tuple(restrictions))
+
+
+def is_dynamic(spec: str) -> bool:
+    return parse_constraint(spec) is not None
+
+
+def satisfies(version: str, spec: str) -> bool:
+    """Whether a concrete version is accepted by spec (a range, prefix, latest.* or plain version)"""
+    constraint = parse_constraint(spec)
+    if constraint is None:
+        return parse_version(version) == parse_version(spec)
+    return constraint.matches(version)
+
+
+def _bump(old: ComparableVersion, new: ComparableVersion) -> str:
+    if new < old:
+        return 'downgrade'
+    old_release, new_release = old.release, new.release
+    for index in range(max(len(old_release), len(new_release))):
+        a = old_release[index] if index < len(old_release) else 0
+        b = new_release[index] if index < len(new_release) else 0
+        if a != b:
+            return ('major', 'minor')[index] if index < 2 else 'patch'
+    return 'patch'
+
+
+@lru_cache(maxsize=4096)
+def classify_change(old: str, new: str) -> str:
+    """
+    Classify an old -> new version change as one of CHANGE_KINDS. A change
+    to or from a range that still accepts the concrete side is
+    'range-satisfied'; otherwise ranges are classified by their lower bound.
+    Versions that compare equal (1.0 -> 1.0.0) are 'none'.
+    """
+    if old == NOT_FOUND:
+        return 'added'
+    if new == REMOVED:
+        return 'removed'
+
+    old_range, new_range = parse_constraint(old), parse_constraint(new)
+    if new_range is not None and old_range is None and new_range.matches(old):
+        return 'range-satisfied'
+    if old_range is not None and new_range is None and old_range.matches(new):
+        return 'range-satisfied'
+
+    old_floor = old_range.floor if old_range is not None else parse_version(old)
+    new_floor = new_range.floor if new_range is not None else parse_version(new)
+    if old_floor is None or new_floor is None:
+        # latest.* or an unbounded range: nothing to compare against
+        return 'range-satisfied'
+    if old_range is None and new_range is None and old_floor == new_floor:
+        # Only the spelling changed; ranges sharing a floor still differ above it
+        return 'none'
+    return _bump(old_floor, new_floor)
+
+
+def library_display_name(lib: str) -> str:
+    """CL_Util-style name used by email_config for an artifact such as Util (or any spelling of it)"""
+    return ARTIFACT_LIBRARIES.get(canonical(lib), lib)
+
+
+@lru_cache(maxsize=1)
+def _critical_libraries() -> frozenset:
+    return frozenset(map(canonical, CRITICAL_LIBRARIES))
+
+
+def needs_escalation(lib: str, kind: str) -> bool:
+    """Critical libraries escalate on major bumps, downgrades and removals"""
+    return canonical(lib) in _critical_libraries() and kind in ESCALATED_KINDS
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Continuous local alignment check: `sharedlibs watch`.
+
+The build files of the given checkouts (default: the four cl-* repositories
+next to each other, as compare reads them) or of a --manifest are discovered
+once, parsed once into a VersionMatrix, and then watched. Each burst of saves
+is debounced into one batch; only the files in the batch are re-parsed, their
+rows are replaced with VersionMatrix.update_repo(), and only the library
+columns whose value changed are re-checked. What changed (versions, libraries
+that became mismatched or aligned again) is printed with the time the update
+took, instead of a full report.
+
+Changes are picked up with inotify through ctypes on Linux: the directories
+holding build files are watched, so editors that save by writing a new file
+and renaming it over the old one are seen too. Where inotify isn't available
+(other platforms, or the per-user watch limit is reached), or with --poll,
+the files' mtime and size are polled instead. Build files created after the
+watch starts are not picked up; restart it to discover them.
+"""
+
+import argparse
+import ctypes
+import errno
+import os
+import select
+import struct
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .config import SHARED_LIBRARIES
+from .dependency_stream import stream_versions
+from .org_scan import ScanTask, build_file_kind, row_name
+from .version_matrix import Mismatch, VersionMatrix
+
+DEFAULT_REPOS = ('cl-clpss', 'cl-ccl1', 'cl-jobserver', 'cl-jobschedular')
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_POLL_INTERVAL = 0.5
+
+# <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_ATTRIB
+
+_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len; then len bytes of NUL-padded name
+
+
+class Change(NamedTuple):
+    """A tracked library whose version in a row changed (None: not declared)"""
+    row: str
+    library: str
+    old: Optional[str]
+    new: Optional[str]
+
+
+class Delta(NamedTuple):
+    """What one batch of saved files changed, and how long the update took"""
+    files: List[str]
+    changes: List[Change]
+    mismatched: List[Mismatch]  # affected libraries that are mismatched now
+    aligned: List[str]  # affected libraries that were mismatched and no longer are
+    ms: float
+
+
+class WatchState:
+    """Per-file versions of the watched build files, merged into matrix rows"""
+
+    def __init__(self, tasks: Iterable[ScanTask], libraries: Iterable[str] = SHARED_LIBRARIES):
+        self.libraries = tuple(libraries)
+        self.tasks: Dict[str, ScanTask] = {}
+        self.row_files: Dict[str, List[str]] = {}
+        for task in tasks:
+            path = os.path.abspath(task.path)
+            if path not in self.tasks:
+                self.tasks[path] = task
+                self.row_files.setdefault(task.row, []).append(path)
+        self.file_versions: Dict[str, Dict[str, str]] = {}
+        self.matrix = VersionMatrix(self.libraries)
+
+    def _parse(self, path: str) -> Dict[str, str]:
+        """Versions in one build file; {} once it is deleted, the last good versions if it doesn't parse"""
+        try:
+            return stream_versions(path, self.tasks[path].kind, self.libraries)
+        except OSError:
+            return {}
+        except ET.ParseError as e:
+            # Usually a save caught half-written; the next save fixes it
+            print(f"Error parsing {path}: {e}", file=sys.stderr)
+            return self.file_versions.get(path, {})
+
+    def _row_versions(self, row: str) -> Dict[str, str]:
+        """The first declaration of each library among the row's files, as org_scan merges them"""
+        versions: Dict[str, str] = {}
+        for path in self.row_files[row]:
+            for lib, version in self.file_versions.get(path, {}).items():
+                versions.setdefault(lib, version)
+        return versions
+
+    def load(self) -> None:
+        """Parse every watched file and build the matrix"""
+        for path in self.tasks:
+            self.file_versions[path] = self._parse(path)
+        for row in self.row_files:
+            self.matrix.update_repo(row, self._row_versions(row))
+
+    def apply(self, paths: Iterable[str]) -> Delta:
+        """Re-parse the given files (others are ignored) and re-check the library columns they changed"""
+        start = time.perf_counter()
+        files = sorted(p for p in {os.path.abspath(p) for p in paths} if p in self.tasks)
+        for path in files:
+            self.file_versions[path] = self._parse(path)
+
+        changes: List[Change] = []
+        affected: Set[str] = set()
+        was_mismatched = set()
+        for row in dict.fromkeys(self.tasks[path].row for path in files):
+            old = self.matrix.rows.get(row, {})
+            new = self._row_versions(row)
+            was_mismatched.update(lib for lib in old.keys() | new.keys() if self.matrix.is_mismatched(lib))
+            changed = self.matrix.update_repo(row, new)
+            affected |= changed
+            changes += [Change(row, lib, old.get(lib), new.get(lib)) for lib in self.libraries if lib in changed]
+
+        mismatched = self.matrix.mismatches(affected)
+        aligned = [lib for lib in self.libraries if lib in was_mismatched and not self.matrix.is_mismatched(lib)]
+        return Delta(files, changes, mismatched, aligned, (time.perf_counter() - start) * 1000)
+
+
+class InotifyWatcher:
+    """Build file changes from inotify (Linux), watching the directories that hold them"""
+    name = 'inotify'
+
+    def __init__(self, paths: Iterable[str]):
+        libc = ctypes.CDLL(None, use_errno=True)
+        # AttributeError where libc has no inotify (not Linux)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.paths = [os.path.abspath(p) for p in paths]
+        self._dirs: Dict[int, Tuple[str, Set[str]]] = {}  # wd: (directory, watched names in it)
+        by_dir: Dict[str, Set[str]] = {}
+        for path in self.paths:
+            by_dir.setdefault(os.path.dirname(path), set()).add(os.path.basename(path))
+        try:
+            for directory, names in by_dir.items():
+                wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory}: "
+                                                      f"{os.strerror(ctypes.get_errno())}")
+                self._dirs[wd] = (directory, names)
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Watched files changed since the last call, waiting up to timeout (None: until one changes)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed: Set[str] = set()
+        # Events for other files in the same directories (editor backups, swap files) don't count
+        while not changed:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                break
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            changed |= self._decode(data)
+        return changed
+
+    def _decode(self, data: bytes) -> Set[str]:
+        changed = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: treat every file as changed
+                return set(self.paths)
+            watched = self._dirs.get(wd)
+            if watched is not None and os.fsdecode(name) in watched[1]:
+                changed.add(os.path.join(watched[0], os.fsdecode(name)))
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Build file changes from polling each file's mtime and size"""
+    name = 'polling'
+
+    def __init__(self, paths: Iterable[str], interval: float = DEFAULT_POLL_INTERVAL):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.interval = interval
+        self._stamps = {path: self._stamp(path) for path in self.paths}
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _poll(self) -> Set[str]:
+        changed = set()
+        for path in self.paths:
+            stamp = self._stamp(path)
+            if stamp != self._stamps[path]:
+                self._stamps[path] = stamp
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Watched files changed since the last call, waiting up to timeout (None: until one changes)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self._poll()
+            if changed:
+                return changed
+            if deadline is None:
+                time.sleep(self.interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(paths: Iterable[str], poll: bool = False, interval: float = DEFAULT_POLL_INTERVAL):
+    """An InotifyWatcher, or a PollingWatcher with poll or where inotify can't be used"""
+    paths = list(paths)
+    if not poll:
+        try:
+            return InotifyWatcher(paths)
+        except (AttributeError, TypeError, OSError) as e:
+            if isinstance(e, OSError) and e.errno == errno.ENOSPC:
+                print("⚠️  inotify watch limit reached (fs.inotify.max_user_watches); polling instead",
+                      file=sys.stderr)
+    return PollingWatcher(paths, interval)
+
+
+def next_batch(watcher, debounce: float = DEFAULT_DEBOUNCE) -> Set[str]:
+    """Block until a file changes, then collect changes until none arrives for debounce seconds"""
+    batch = watcher.wait(None)
+    while True:
+        more = watcher.wait(debounce)
+        if not more:
+            return batch
+        batch |= more
+
+
+def discover_tasks(roots: Iterable[str]) -> List[ScanTask]:
+    """One ScanTask per build file under each checkout, rows named as in an org scan"""
+    from .discovery import walk_build_files
+
+    tasks = []
+    for root in roots:
+        repo = os.path.basename(os.path.abspath(root))
+        for relative in walk_build_files(root):
+            tasks.append(ScanTask(row_name(repo, relative), os.path.join(root, relative), build_file_kind(relative)))
+    return tasks
+
+
+def print_delta(delta: Delta, relative_to: str = '.') -> None:
+    names = ', '.join(os.path.relpath(path, relative_to) for path in delta.files)
+    print(f"⏱  {names}: {delta.ms:.1f} ms")
+    if not delta.changes:
+        print("  no tracked version changed")
+    for change in delta.changes:
+        print(f"  {change.row}: {change.library} {change.old or '(none)'} → {change.new or '(none)'}")
+    for lib, versions in delta.mismatched:
+        listed = ', '.join(f"{row} {version}" for row, version in versions.items())
+        print(f"  ❌ {lib} mismatched: {listed}")
+    for lib in delta.aligned:
+        print(f"  ✅ {lib} aligned again")
+    sys.stdout.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Watch build files and report version mismatches as they are saved")
+    parser.add_argument('roots', nargs='*', help=f"checkouts to watch (default: {', '.join(DEFAULT_REPOS)})")
+    parser.add_argument('--manifest', type=Path, help="watch the build files of an org scan manifest instead")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, metavar='SECONDS',
+                        help="quiet time that ends a burst of saves")
+    parser.add_argument('--poll', action='store_true', help="poll mtimes instead of using inotify")
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL, metavar='SECONDS',
+                        help="polling interval")
+    args = parser.parse_args(argv)
+
+    if args.manifest:
+        from .org_scan import load_manifest
+
+        tasks = load_manifest(args.manifest)
+    else:
+        tasks = discover_tasks(args.roots or [r for r in DEFAULT_REPOS if os.path.isdir(r)])
+    if not tasks:
+        print("No build files to watch", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    state = WatchState(tasks)
+    state.load()
+    watcher = open_watcher(state.tasks, args.poll, args.interval)
+    print(f"👀 Watching {len(state.tasks)} build files in {len(state.row_files)} rows ({watcher.name}), "
+          f"loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for lib, versions in state.matrix.mismatches():
+        listed = ', '.join(f"{row} {version}" for row, version in versions.items())
+        print(f"  ❌ {lib} mismatched: {listed}")
+    sys.stdout.flush()
+    try:
+        while True:
+            print_delta(state.apply(next_batch(watcher, args.debounce)))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
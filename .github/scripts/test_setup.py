@@ -8,16 +8,7 @@ import sys
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
-# Test shared libraries (same as in the real script)
-SHARED_LIBRARIES = [
-    "Util",           # CL_Util
-    "common",         # Clpss_Common
-    "occupancy",      # Clpss_Occupancy
-    "fire-rating",    # FireRating
-    "csm",            # CSM
-    "rating",         # Clpss_RateCLPolicy
-    "compose-print"   # Clpss_ComposePrint
-]
+from sharedlibs.config import SHARED_LIBRARIES
 
 def test_pom_parsing():
     """Test if pom.xml can be parsed correctly"""
@@ -131,6 +122,1273 @@ def test_git_setup():
         print(f"❌ Git error: {e}")
         return False
 
+def test_git_blob_reader():
+    """Test that the cat-file pipe reads committed blobs, not the worktree, and maps missing ones to None"""
+    import subprocess
+    import tempfile
+    from sharedlibs.git_blobs import GitBlobReader
+    from sharedlibs.parse_cache import blob_sha
+    
+    committed = {
+        'pom.xml': b"<project>\n<version>1.0</version>\n</project>\n",
+        'modules/ivy.xml': b'<ivy-module><dependency name="Util" rev="2.1.1"/></ivy-module>',
+        'legacy build/pom.xml': b"<project><version>0.9</version></project>",
+        # Bigger than a pipe buffer, without a trailing newline
+        'big.xml': b"<x>" + b"y" * 300_000 + b"</x>",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        def git(*args):
+            subprocess.run(['git', '-C', tmp, '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                           check=True, capture_output=True)
+        for path, data in committed.items():
+            (Path(tmp) / path).parent.mkdir(parents=True, exist_ok=True)
+            (Path(tmp) / path).write_bytes(data)
+        git('init', '-q')
+        git('add', '.')
+        git('commit', '-q', '-m', 'base')
+        (Path(tmp) / 'pom.xml').write_bytes(b"<project>edited</project>")
+        
+        with GitBlobReader(tmp) as reader:
+            pairs = [('HEAD', path) for path in committed] + [('HEAD', 'missing.xml'), ('no-such-ref', 'pom.xml'),
+                                                              ('HEAD', 'legacy build/missing pom.xml')]
+            try:
+                blobs = reader.read_many(pairs)
+            except (ValueError, subprocess.CalledProcessError) as e:
+                print(f"❌ Reading a batch with a missing path containing spaces failed: {e!r}")
+                return False
+            for path, data in committed.items():
+                blob = blobs[('HEAD', path)]
+                if blob is None or blob.data != data or blob.sha != blob_sha(data):
+                    print(f"❌ {path} read as {blob and blob.data[:40]}")
+                    return False
+            if any(blobs[pair] is not None for pair in pairs[len(committed):]):
+                print("❌ A missing path or ref didn't read as None")
+                return False
+            # The same process keeps serving requests after misses
+            if reader.read('HEAD', 'pom.xml') != committed['pom.xml'] or reader.object_id('HEAD^{tree}') is None:
+                print("❌ Reader unusable after a miss")
+                return False
+    
+    print(f"✅ {len(committed)} blobs read through one cat-file process; missing paths (with and without spaces) and ref gave None")
+    return True
+
+def test_incremental_matrix():
+    """Test that incremental matrix updates match a full rebuild"""
+    import random
+    from sharedlibs.compare_shared_lib_versions import find_mismatches
+    from sharedlibs.version_matrix import CompactMatrix, VersionMatrix
+    
+    rng = random.Random(1234)
+    repos = [f"repo-{i}" for i in range(40)]
+    
+    def random_row():
+        return {lib: f"1.{rng.randint(0, 2)}" for lib in SHARED_LIBRARIES if rng.random() < 0.7}
+    
+    current = {repo: random_row() for repo in repos}
+    matrix = VersionMatrix.build(current, SHARED_LIBRARIES)
+    
+    for step in range(500):
+        repo = rng.choice(repos + ["repo-new"])
+        if rng.random() < 0.1 and repo in current:
+            matrix.remove_repo(repo)
+            del current[repo]
+        else:
+            matrix.update_repo(repo, random_row())
+            current[repo] = matrix.rows[repo]
+        
+        expected = find_mismatches(current, SHARED_LIBRARIES)
+        rebuilt = VersionMatrix.build(current, SHARED_LIBRARIES).mismatches()
+        compact = CompactMatrix.build(current, SHARED_LIBRARIES).mismatches()
+        if matrix.mismatches() != expected or rebuilt != expected or compact != expected:
+            print(f"❌ Incremental matrix diverged from a full rebuild at step {step}")
+            return False
+    
+    print("✅ 500 incremental updates match a full rebuild and the compact matrix")
+    return True
+
+def test_incremental_scan():
+    """Test that --changed rescans rows found through the snapshot, without walking repos, and reports only them"""
+    import contextlib
+    import io
+    import json
+    import tempfile
+    from sharedlibs import org_scan
+    from sharedlibs.compare_shared_lib_versions import main as compare_main
+    from sharedlibs.version_matrix import VersionMatrix
+    
+    def pom(util, common):
+        return (f'<project><dependencies>'
+                f'<dependency><artifactId>Util</artifactId><version>{util}</version></dependency>'
+                f'<dependency><artifactId>common</artifactId><version>{common}</version></dependency>'
+                f'</dependencies></project>')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for repo, common in (('cl-a', '4.1.0'), ('cl-b', '4.2.0'), ('cl-c', '4.1.0')):
+            (root / repo).mkdir()
+            (root / repo / 'pom.xml').write_text(pom('2.1.1', common))
+        manifest = root / 'manifest.json'
+        # Repos without "files" are walked by a full scan
+        manifest.write_text(json.dumps({'repos': [{'name': name} for name in ('cl-a', 'cl-b', 'cl-c')]}))
+        matrix_path = root / 'matrix.json'
+        
+        def run(*extra):
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+                status = compare_main(['--manifest', str(manifest), '--matrix', str(matrix_path), '--workers', '1',
+                                       *extra])
+            return status, out.getvalue()
+        
+        status, text = run()
+        if status != 1 or 'Mismatch for common' not in text:
+            print(f"❌ Full scan reported {status}: {text}")
+            return False
+        
+        (root / 'cl-a' / 'pom.xml').write_text(pom('2.2.0', '4.1.0'))
+        (root / 'cl-c' / 'module').mkdir()
+        (root / 'cl-c' / 'module' / 'pom.xml').write_text(pom('2.1.1', '4.1.0').replace('common', 'other'))
+        walk = org_scan.walk_build_files
+        def no_walk(*args, **kwargs):
+            raise AssertionError("incremental run walked a repo")
+        org_scan.walk_build_files = no_walk
+        try:
+            status, text = run('--changed', str(root / 'cl-a' / 'pom.xml'), str(root / 'cl-c' / 'module' / 'pom.xml'))
+        except AssertionError as e:
+            status, text = None, str(e)
+        finally:
+            org_scan.walk_build_files = walk
+        if status != 1 or 'Mismatch for Util' not in text or 'Mismatch for common' in text \
+                or 'Still mismatched (not re-checked this run): common' not in text:
+            print(f"❌ Incremental run reported {status}: {text}")
+            return False
+        
+        matrix = VersionMatrix.load(matrix_path, SHARED_LIBRARIES)
+        rebuilt = VersionMatrix.build(matrix.rows, SHARED_LIBRARIES)
+        if matrix.mismatches() != rebuilt.mismatches() or matrix.to_json()['counts'] != rebuilt.to_json()['counts'] \
+                or list(matrix.rows) != ['cl-a', 'cl-b', 'cl-c', 'cl-c/module']:
+            print(f"❌ Saved snapshot {matrix.to_json()}")
+            return False
+        
+        # The exit status matches a full rebuild of the same tree, also when the re-checked columns align
+        for repo, util, common in (('cl-a', '2.1.1', '4.1.0'), ('cl-b', '2.1.1', '4.1.0')):
+            (root / repo / 'pom.xml').write_text(pom(util, common))
+            incremental, _ = run('--changed', str(root / repo / 'pom.xml'))
+            snapshot = matrix_path.read_bytes()
+            matrix_path.unlink()
+            full, _ = run()
+            matrix_path.write_bytes(snapshot)
+            if incremental != full:
+                print(f"❌ After aligning {repo}: incremental exit {incremental}, full rebuild exit {full}")
+                return False
+    
+    print("✅ --changed rescanned 2 rows from the snapshot without a walk, reported only Util, "
+          "and exits like a full rebuild")
+    return True
+
+def test_parse_cache():
+    """Test that the parse cache serves hits across runs, evicts LRU entries and drops everything on a schema change"""
+    import tempfile
+    from sharedlibs import parse_cache
+    from sharedlibs.parse_cache import ParseCache, blob_sha, cache_key, file_blob_sha
+    
+    data = b"<project><dependencies><dependency><artifactId>Util</artifactId><version>2.1.1</version></dependency></dependencies></project>"
+    key = cache_key(blob_sha(data), 'maven', SHARED_LIBRARIES)
+    if key != cache_key(blob_sha(data), 'maven', list(reversed(SHARED_LIBRARIES))) \
+            or key == cache_key(blob_sha(data), 'ivy', SHARED_LIBRARIES):
+        print("❌ cache_key depends on tracked order or ignores the kind")
+        return False
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'parse-cache.sqlite'
+        (Path(tmp) / 'pom.xml').write_bytes(data)
+        if file_blob_sha(Path(tmp) / 'pom.xml') != blob_sha(data):
+            print("❌ A worktree file and its blob hash differently")
+            return False
+        cache = ParseCache(path, max_entries=2)
+        cache.put(key, {'Util': '2.1.1'})
+        cache.close()
+        
+        cache = ParseCache(path, max_entries=2)
+        hit, miss = cache.get(key), cache.get('unknown')
+        for i in range(3):
+            cache.put(f"extra-{i}", {})
+        cache.close()
+        if hit != {'Util': '2.1.1'} or miss is not None or (cache.hits, cache.misses) != (1, 1):
+            print(f"❌ Reopened cache returned {hit}, {miss}")
+            return False
+        
+        cache = ParseCache(path)
+        if len(cache) != 2 or cache.get(key) is not None or cache.lifetime_stats() != {'hits': 1, 'misses': 2}:
+            print(f"❌ {len(cache)} entries after eviction to 2, lifetime {cache.lifetime_stats()}")
+            return False
+        cache.close()
+        
+        schema = parse_cache.CACHE_SCHEMA
+        parse_cache.CACHE_SCHEMA = schema + 1
+        try:
+            cache = ParseCache(path)
+            emptied = len(cache)
+            cache.close()
+        finally:
+            parse_cache.CACHE_SCHEMA = schema
+        if emptied:
+            print(f"❌ {emptied} entries survived a schema change")
+            return False
+        
+        # A long-running process only ever flushes: that alone keeps the cache within its bound
+        cache = ParseCache(Path(tmp) / 'server.sqlite', max_entries=10)
+        sizes = []
+        for batch in range(5):
+            for i in range(7):
+                cache.put(f"server-{batch}-{i}", {})
+            cache.flush()
+            sizes.append(len(cache))
+        newest = cache.get("server-4-6")
+        cache.close()
+        if max(sizes) > 10 or newest is None:
+            print(f"❌ Cache sizes after each flush {sizes} (bound 10)")
+            return False
+    
+    print("✅ Hit after reopening, LRU eviction to the bound (also on flush), entries dropped on a schema change")
+    return True
+
+def test_discovery():
+    """Test that the walker honours .gitignore negation, anchoring and nested precedence"""
+    import tempfile
+    from sharedlibs.discovery import walk_build_files
+    
+    files = {
+        'pom.xml': True,
+        'ivy.xml': False,                       # root rule ivy.xml
+        'app/ivy.xml': True,                    # ...re-included by app/.gitignore
+        'modules/keep/pom.xml': True,           # !modules/keep/ undoes modules/*/
+        'modules/drop/pom.xml': False,
+        'modules/keep/sub/pom.xml': False,      # modules/keep/.gitignore
+        'top-only/pom.xml': False,              # /top-only/ is anchored to the root
+        'nested/top-only/pom.xml': True,
+        'target/pom.xml': False,                # pruned without a rule
+        'docs/pom.xml.bak': False,              # not a build file name
+    }
+    ignores = {
+        '.gitignore': "# build outputs\nivy.xml\nmodules/*/\n!modules/keep/\n/top-only/\n",
+        'app/.gitignore': "!ivy.xml\n",
+        'modules/keep/.gitignore': "sub/\n",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for path, text in [(p, '<project/>') for p in files] + list(ignores.items()):
+            (Path(tmp) / path).parent.mkdir(parents=True, exist_ok=True)
+            (Path(tmp) / path).write_text(text)
+        found = sorted(walk_build_files(tmp))
+        everything = sorted(walk_build_files(tmp, use_gitignore=False))
+    
+    expected = sorted(path for path, kept in files.items() if kept)
+    if found != expected:
+        print(f"❌ Found {found}, expected {expected}")
+        return False
+    if 'modules/drop/pom.xml' not in everything or 'target/pom.xml' in everything:
+        print(f"❌ Without .gitignore found {everything}")
+        return False
+    
+    print(f"✅ {len(found)} of {len(files)} files kept; negation, anchoring and nested rules applied")
+    return True
+
+def test_notification_dispatch():
+    """Test that notifications use one SMTP connection and reach every recipient once"""
+    import socketserver
+    import subprocess
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from sharedlibs.email_config import ESCALATION_EMAILS, LIBRARY_TEAMS, PRIMARY_EMAIL, TEAM_EMAILS
+    from sharedlibs.notifier import SmtpSettings, dispatch
+    
+    smtp = {'connections': 0, 'messages': 0, 'rcpt': []}
+    
+    class SmtpStandIn(socketserver.StreamRequestHandler):
+        def handle(self):
+            smtp['connections'] += 1
+            self.wfile.write(b"220 stand-in\r\n")
+            while True:
+                line = self.rfile.readline().decode().strip()
+                verb = line.split(' ')[0].upper()
+                if not line or verb == 'QUIT':
+                    self.wfile.write(b"221 bye\r\n")
+                    return
+                if verb == 'DATA':
+                    self.wfile.write(b"354 go\r\n")
+                    while self.rfile.readline() not in (b".\r\n", b""):
+                        pass
+                    smtp['messages'] += 1
+                elif verb == 'RCPT':
+                    smtp['rcpt'].append(line.split(':', 1)[1].strip('<> ').lower())
+                self.wfile.write(b"250 ok\r\n")
+    
+    posts = []
+    
+    class WebhookStandIn(BaseHTTPRequestHandler):
+        def do_POST(self):
+            posts.append(self.rfile.read(int(self.headers['Content-Length'])))
+            self.send_response(200)
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    smtp_server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SmtpStandIn)
+    http_server = HTTPServer(('127.0.0.1', 0), WebhookStandIn)
+    for server in (smtp_server, http_server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    try:
+        changes = [(lib, "1.0.0", "2.0.0") for lib in SHARED_LIBRARIES]
+        settings = SmtpSettings('127.0.0.1', smtp_server.server_address[1], security='none',
+                                sender='ci@company.com')
+        hook = f"http://127.0.0.1:{http_server.server_address[1]}/hook"
+        stats = dispatch(changes, settings, [f"{hook}/{i}" for i in range(3)], 'tester', 'http://pr')
+    finally:
+        smtp_server.shutdown()
+        http_server.shutdown()
+    
+    expected = {a.lower() for a in [PRIMARY_EMAIL] + TEAM_EMAILS + ESCALATION_EMAILS}
+    expected |= {a.lower() for team in LIBRARY_TEAMS.values() for a in team}
+    if smtp['connections'] != 1:
+        print(f"❌ Expected 1 SMTP connection, got {smtp['connections']}")
+        return False
+    if sorted(smtp['rcpt']) != sorted(expected) or smtp['messages'] != stats['emails']:
+        print(f"❌ Recipients not delivered exactly once: {sorted(smtp['rcpt'])}")
+        return False
+    if len(posts) != 3:
+        print(f"❌ Expected 3 webhook posts, got {len(posts)}")
+        return False
+    
+    # `notify` renders its messages without loading the parsers, the parse cache or git plumbing
+    heavy = ('xml.etree.ElementTree', 'sqlite3', 'subprocess', 'sharedlibs.check_version_changes',
+             'sharedlibs.parse_cache', 'sharedlibs.diff_hunks', 'sharedlibs.maven_model')
+    probe = ("import sys\nfrom sharedlibs.cli import main\n"
+             "for changes in ('[]', '[[\"Util\", \"2.1.1\", \"3.0.0\"]]'):\n"
+             "    main(['notify', '--changes', changes, '--dry-run'])\n"
+             f"print([m for m in {heavy!r} if m in sys.modules])")
+    loaded = subprocess.run([sys.executable, '-c', probe], cwd=Path(__file__).resolve().parent,
+                            capture_output=True, text=True).stdout.strip().splitlines()
+    if not loaded or loaded[-1] != '[]':
+        print(f"❌ notify loaded {loaded[-1] if loaded else 'nothing (it failed)'}")
+        return False
+    
+    print(f"✅ {smtp['messages']} distinct emails to {len(expected)} recipients over 1 SMTP connection, "
+          f"{len(posts)} webhook posts")
+    return True
+
+def test_jira_lookup():
+    """Test that Jira lookups are batched, reuse one connection and skip the network on cache hits"""
+    import json
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import parse_qs, urlsplit
+    from sharedlibs.pr_title_check import JiraClient, TicketCache, check_titles
+    
+    known = {"CCL-12345": "Add description", "GG-7": "Fix build"}
+    seen = {'requests': 0, 'clients': set(), 'jql': []}
+    
+    class FakeJira(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def do_GET(self):
+            seen['requests'] += 1
+            seen['clients'].add(self.client_address)
+            jql = parse_qs(urlsplit(self.path).query)['jql'][0]
+            seen['jql'].append(jql)
+            keys = [k.strip() for k in jql[jql.index('(') + 1:jql.rindex(')')].split(',')]
+            issues = [{"key": k, "fields": {"summary": known[k], "created": "2025-01-01"}}
+                      for k in keys if k in known]
+            body = json.dumps({"issues": issues}).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(('127.0.0.1', 0), FakeJira)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    titles = ["CCL-12345 add description", "GG-7 fix build", "OCS-99 missing ticket"]
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = f"{tmp}/jira-tickets.json"
+            first = check_titles(titles, JiraClient(url, cache=TicketCache(cache_path)))
+            batched = seen['requests'] == 1 and len(seen['clients']) == 1 and "CCL-12345, GG-7, OCS-99" in seen['jql'][0]
+            # A fresh client (a new workflow run) must answer from the persisted cache
+            second = check_titles(titles[:2], JiraClient(url, cache=TicketCache(cache_path)))
+            requests_after_hits = seen['requests']
+            invalid = check_titles(["add description without ticket"], JiraClient(url, cache=TicketCache(cache_path)))
+    finally:
+        server.shutdown()
+    
+    if first != 1 or second != 0 or invalid != 1:
+        print(f"❌ Unexpected results: {first}, {second}, {invalid}")
+        return False
+    if not batched:
+        print(f"❌ Lookups not batched on one connection: {seen['jql']}")
+        return False
+    if requests_after_hits != 1:
+        print(f"❌ Cache hits reached Jira ({requests_after_hits} requests)")
+        return False
+    
+    print("✅ 3 tickets in 1 JQL query over 1 connection, cached tickets skip the network")
+    return True
+
+def test_diff_fast_path():
+    """Test that the diff-hunk fast path only skips edits that can't change a tracked version"""
+    import subprocess
+    import tempfile
+    from sharedlibs.diff_hunks import pom_diff_report
+    from sharedlibs.maven_model import MavenResolver
+    
+    base = """<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <modelVersion>4.0.0</modelVersion>
+  <groupId>com.example</groupId>
+  <artifactId>app</artifactId>
+  <version>1.0.0</version>
+  <properties>
+    <common.version>4.2.0</common.version>
+  </properties>
+  <dependencies>
+    <dependency>
+      <groupId>org.other</groupId>
+      <artifactId>unrelated</artifactId>
+      <version>9.9</version>
+    </dependency>
+    <dependency>
+      <groupId>com.example</groupId>
+      <artifactId>Util</artifactId>
+      <version>2.1.1</version>
+    </dependency>
+    <dependency>
+      <groupId>com.example</groupId>
+      <artifactId>common</artifactId>
+      <version>${common.version}</version>
+    </dependency>
+  </dependencies>
+  <build>
+    <plugins>
+      <plugin>
+        <artifactId>maven-compiler-plugin</artifactId>
+        <version>3.11.0</version>
+      </plugin>
+    </plugins>
+  </build>
+</project>
+"""
+    util_block = ("    <dependency>\n      <groupId>com.example</groupId>\n      <artifactId>Util</artifactId>\n"
+                  "      <version>2.1.1</version>\n    </dependency>\n")
+    # (edit, expected relevant)
+    edits = {
+        "plugin version": (lambda t: t.replace("3.11.0", "3.12.1"), False),
+        "untracked dependency": (lambda t: t.replace("9.9", "10.0"), False),
+        "whitespace and comment": (lambda t: t.replace("  <build>", "\n  <!-- build -->\n    <build>"), False),
+        "tracked version": (lambda t: t.replace("2.1.1", "3.0.0"), True),
+        "property": (lambda t: t.replace("<common.version>4.2.0", "<common.version>4.3.0"), True),
+        "tracked dependency removed": (lambda t: t.replace(util_block, ""), True),
+    }
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        def git(*args):
+            subprocess.run(['git', '-C', tmp, '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                           check=True, capture_output=True)
+        pom = Path(tmp) / 'pom.xml'
+        pom.write_text(base, encoding='utf-8')
+        git('init', '-q')
+        git('add', 'pom.xml')
+        git('commit', '-q', '-m', 'base')
+        (Path(tmp) / 'base.xml').write_text(base, encoding='utf-8')
+        base_versions = MavenResolver().resolve_versions(str(Path(tmp) / 'base.xml'), SHARED_LIBRARIES)
+        
+        for name, (edit, expected) in edits.items():
+            edited = edit(base)
+            pom.write_text(edited, encoding='utf-8')
+            report = pom_diff_report('HEAD', base.encode(), edited.encode(), SHARED_LIBRARIES, repo=tmp)
+            changed = MavenResolver().resolve_versions(str(pom), SHARED_LIBRARIES) != base_versions
+            if report is None or report.relevant != expected or (changed and not report.relevant):
+                print(f"❌ {name}: relevant={report and report.relevant}, expected {expected}, versions changed={changed}")
+                return False
+    
+    print(f"✅ {len(edits)} edits classified; plugin, untracked and whitespace edits skip parsing")
+    return True
+
+def test_fast_path_parent():
+    """Test that the fast path doesn't skip a bump made only in a parent POM inside the repo"""
+    import os
+    import subprocess
+    import tempfile
+    from sharedlibs.check_version_changes import get_changed_libraries
+    
+    parent = """<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <groupId>com.example</groupId>
+  <artifactId>parent</artifactId>
+  <version>1.0.0</version>
+  <packaging>pom</packaging>
+  <properties>
+    <common.version>4.2.0</common.version>
+  </properties>
+</project>
+"""
+    child = """<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <parent>
+    <groupId>com.example</groupId>
+    <artifactId>parent</artifactId>
+    <version>1.0.0</version>
+    <relativePath>parent/pom.xml</relativePath>
+  </parent>
+  <artifactId>app</artifactId>
+  <dependencies>
+    <dependency>
+      <groupId>com.example</groupId>
+      <artifactId>common</artifactId>
+      <version>${common.version}</version>
+    </dependency>
+  </dependencies>
+  <build><plugins><plugin><artifactId>maven-compiler-plugin</artifactId><version>3.11.0</version></plugin></plugins></build>
+</project>
+"""
+    cwd, env = os.getcwd(), dict(os.environ)
+    with tempfile.TemporaryDirectory() as tmp:
+        def git(*args):
+            subprocess.run(['git', '-C', tmp, '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                           check=True, capture_output=True)
+        (Path(tmp) / 'parent').mkdir()
+        (Path(tmp) / 'parent' / 'pom.xml').write_text(parent, encoding='utf-8')
+        (Path(tmp) / 'pom.xml').write_text(child, encoding='utf-8')
+        git('init', '-q')
+        git('add', '.')
+        git('commit', '-q', '-m', 'base')
+        git('update-ref', 'refs/remotes/origin/main', 'HEAD')
+        os.environ.update({'GITHUB_BASE_REF': 'main', 'SHAREDLIBS_DIFF_FAST_PATH': '1'})
+        os.chdir(tmp)
+        try:
+            # Only a plugin changes: still skipped
+            (Path(tmp) / 'pom.xml').write_text(child.replace('3.11.0', '3.12.1'), encoding='utf-8')
+            plugin_only = get_changed_libraries()
+            (Path(tmp) / 'parent' / 'pom.xml').write_text(parent.replace('4.2.0', '5.0.0'), encoding='utf-8')
+            parent_bump = get_changed_libraries()
+        finally:
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(env)
+    
+    if plugin_only or parent_bump != [('common', '4.2.0', '5.0.0')]:
+        print(f"❌ plugin-only edit found {plugin_only}, parent bump found {parent_bump}")
+        return False
+    print("✅ plugin-only edit skipped; common 4.2.0 → 5.0.0 in parent/pom.xml detected")
+    return True
+
+def test_prefilter():
+    """Test that the byte prefilter only drops files that can't declare a tracked library"""
+    import tempfile
+    from sharedlibs import dependency_stream, prefilter
+    
+    dep = "<dependency><groupId>com.example</groupId><artifactId>{}</artifactId><version>1.0</version></dependency>"
+    pom = '<project><dependencies>{}</dependencies><build>{}</build></project>'
+    padding = "<plugin><artifactId>maven-jar-plugin</artifactId></plugin>" * 20000
+    files = {
+        'untracked.xml': pom.format(dep.format('unrelated'), ''),
+        'tracked.xml': pom.format(dep.format('Util'), ''),
+        'large.xml': pom.format(dep.format('unrelated') + dep.format('common'), padding),
+        'large-untracked.xml': pom.format(dep.format('unrelated'), padding),
+        'charref.xml': pom.format(dep.format('&#85;til'), ''),
+        'utf16.xml': '<?xml version="1.0" encoding="UTF-16"?>' + pom.format(dep.format('Util'), ''),
+    }
+    expected_skips = {'untracked.xml', 'large-untracked.xml'}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in files.items():
+            encoding = 'utf-16' if name == 'utf16.xml' else 'utf-8'
+            (Path(tmp) / name).write_bytes(text.encode(encoding))
+        for name in files:
+            path = Path(tmp) / name
+            found, data = prefilter.prefilter_file(path, SHARED_LIBRARIES)
+            if found == (name in expected_skips) or (data is None) != name.startswith('large'):
+                print(f"❌ {name}: prefilter said {found}, content {'mapped' if data is None else 'read'}")
+                return False
+            filtered = dependency_stream.stream_versions(path, 'maven', SHARED_LIBRARIES)
+            parsed = dependency_stream.stream_pom_versions(path, SHARED_LIBRARIES)
+            if filtered != parsed:
+                print(f"❌ {name}: {filtered} with the prefilter, {parsed} without")
+                return False
+    
+    print(f"✅ {len(expected_skips)}/{len(files)} files skipped, extraction unchanged (mmap, char refs, UTF-16)")
+    return True
+
+def test_impact_index():
+    """Test that notifications list exactly the direct and transitive consumers of a bump"""
+    import json
+    import tempfile
+    from sharedlibs.check_version_changes import generate_annotations, generate_notification_message
+    from sharedlibs.compare_shared_lib_versions import scan_into_matrix
+    from sharedlibs.impact_index import ImpactIndex
+    
+    pom = "<project><dependencies>{}</dependencies></project>"
+    dep = "<dependency><groupId>com.example</groupId><artifactId>{}</artifactId><version>1.0</version></dependency>"
+    repos = {
+        'cl-clpss': ('pom.xml', pom.format(dep.format('Util') + dep.format('common'))),
+        'cl-common': ('pom.xml', pom.format(dep.format('Util'))),
+        'cl-ccl1': ('pom.xml', pom.format(dep.format('common'))),
+        'cl-jobserver': ('ivy.xml', '<ivy-module><dependencies><dependency org="com.example" name="Util" rev="1.0"/>'
+                                    '</dependencies></ivy-module>'),
+        'cl-unrelated': ('pom.xml', pom.format(dep.format('other'))),
+    }
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        entries = []
+        for name, (file, text) in repos.items():
+            (root / name).mkdir()
+            (root / name / file).write_text(text, encoding='utf-8')
+            entries.append({'name': name, 'files': [file], **({'provides': ['common']} if name == 'cl-common' else {})})
+        manifest = root / 'manifest.json'
+        manifest.write_text(json.dumps({'repos': entries}), encoding='utf-8')
+        matrix_path, impact_path = root / 'matrix.json', root / 'impact.json'
+    
+        scan_into_matrix(manifest, matrix_path, workers=1, impact_path=impact_path)
+        targets = ImpactIndex.load(impact_path, SHARED_LIBRARIES).targets(['Util'], exclude=['cl-clpss'])
+        got = [(t.row, t.via) for t in targets]
+        expected = [('cl-common', ()), ('cl-ccl1', ('common',)), ('cl-jobserver', ())]
+        if got != expected:
+            print(f"❌ Targets for Util: {got}, expected {expected}")
+            return False
+        message = generate_notification_message([('Util', '1.0', '2.0')], targets=targets)
+        listed = [line.split('**')[1] for line in message.splitlines() if line.startswith('- **')]
+        if listed != ['cl-common', 'cl-ccl1', 'cl-jobserver'] or 'via common' not in message:
+            print(f"❌ Notification lists {listed}")
+            return False
+        annotation = generate_annotations([('Util', '1.0', '2.0')], {'Util': 'major'}, targets, root / 'none.xml')
+        fallback = generate_annotations([('Util', '1.0', '2.0')], {'Util': 'major'}, None, root / 'none.xml')
+        if not annotation[0].endswith("Align cl-common, cl-ccl1, cl-jobserver.") \
+                or not fallback[0].endswith("Align cl-ccl1, cl-jobserver, cl-jobschedular."):
+            print(f"❌ Annotations {annotation}, without an index {fallback}")
+            return False
+    
+        # cl-ccl1 drops common: an incremental refresh removes it from the targets
+        (root / 'cl-ccl1' / 'pom.xml').write_text(pom.format(''), encoding='utf-8')
+        scan_into_matrix(manifest, matrix_path, [str(root / 'cl-ccl1' / 'pom.xml')], workers=1,
+                         impact_path=impact_path)
+        targets = ImpactIndex.load(impact_path, SHARED_LIBRARIES).targets(['Util'], exclude=['cl-clpss'])
+        if [t.row for t in targets] != ['cl-common', 'cl-jobserver']:
+            print(f"❌ Targets after the incremental refresh: {[t.row for t in targets]}")
+            return False
+    
+    print("✅ Direct and transitive consumers listed, incremental refresh drops a removed consumer")
+    return True
+
+def test_rewriter():
+    """Test that aligning versions changes only the version tokens"""
+    import argparse
+    import difflib
+    import tempfile
+    from sharedlibs.dependency_stream import stream_versions
+    from sharedlibs.maven_model import MavenResolver
+    from sharedlibs.rewriter import align, parse_assignments
+    
+    # A misspelt library is an error with a suggestion, not a silent no-op
+    try:
+        parse_assignments(['CL_Util=3.0', 'Utl=3.0'])
+    except argparse.ArgumentTypeError as e:
+        if "did you mean 'Util'" not in str(e):
+            print(f"❌ Unknown library rejected without a suggestion: {e}")
+            return False
+    else:
+        print("❌ --set Utl=3.0 was accepted")
+        return False
+    if parse_assignments(['CL_Util = 3.0']) != {'Util': '3.0'}:
+        print(f"❌ CL_Util=3.0 parsed as {parse_assignments(['CL_Util = 3.0'])}")
+        return False
+    
+    pom = """<?xml version="1.0" encoding="UTF-8"?>
+<!-- formatting, comments and prefixes must survive -->
+<m:project xmlns:m="http://maven.apache.org/POM/4.0.0">
+  <m:properties>
+    <common.version>3.0.5</common.version>
+  </m:properties>
+  <m:dependencies>
+    <m:dependency>
+      <m:artifactId>Util</m:artifactId>
+      <m:version> 2.1.1 </m:version>
+      <m:exclusions><m:exclusion><m:artifactId>csm</m:artifactId></m:exclusion></m:exclusions>
+    </m:dependency>
+    <m:dependency><m:artifactId>common</m:artifactId><m:version>${common.version}</m:version></m:dependency>
+  </m:dependencies>
+</m:project>
+"""
+    ivy = """<ivy-module version="2.0">
+  <dependencies>
+    <dependency org="com.example" name='Util' rev='2.1.1' conf="compile->default"/>
+    <dependency org="com.example"
+                name="common" rev="3.0.5"/>
+  </dependencies>
+</ivy-module>
+"""
+    targets = {'Util': '3.0.0', 'common': '4.2.0'}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pom_path, ivy_path = Path(tmp) / 'pom.xml', Path(tmp) / 'ivy.xml'
+        pom_path.write_text(pom, encoding='utf-8')
+        ivy_path.write_text(ivy, encoding='utf-8')
+        results = align([(str(pom_path), 'maven'), (str(ivy_path), 'ivy')], targets)
+        if any(r.error for r in results) or [len(r.edits) for r in results] != [2, 2]:
+            print(f"❌ Unexpected rewrite results: {results}")
+            return False
+    
+        for path, original in ((pom_path, pom), (ivy_path, ivy)):
+            changed = [line for line in difflib.ndiff(original.splitlines(), path.read_text().splitlines())
+                       if line.startswith(('-', '+'))]
+            if len(changed) != 4:
+                print(f"❌ {path.name}: expected 2 changed lines, diff was {changed}")
+                return False
+        effective = MavenResolver().resolve_versions(str(pom_path), SHARED_LIBRARIES)
+        if effective != targets or stream_versions(ivy_path, 'ivy', SHARED_LIBRARIES) != targets:
+            print(f"❌ Rewritten files don't read back as {targets}: {effective}")
+            return False
+    
+    print("✅ pom.xml (literal and ${property}) and ivy.xml aligned with a 2-line diff each")
+    return True
+
+def test_identity_index():
+    """Test that every spelling of a library resolves to one canonical ID"""
+    import tempfile
+    from sharedlibs import prefilter
+    from sharedlibs.dependency_stream import stream_versions
+    from sharedlibs.identity import IdentityIndex, identity_index
+    from sharedlibs.notifier import plan_emails
+    from sharedlibs.org_scan import ScanTask, scan
+    
+    root = Path(__file__).resolve().parents[2]
+    expected = stream_versions(root / 'pom.xml', 'maven', SHARED_LIBRARIES).keys()
+    for name, kind in (('sample-pom.xml', 'maven'), ('sample-ivy.xml', 'ivy')):
+        found = stream_versions(root / name, kind, SHARED_LIBRARIES)
+        if found.keys() != expected:
+            print(f"❌ {name}: found {sorted(found)}, expected {sorted(expected)}")
+            return False
+    
+    index = IdentityIndex(['Util', 'rating'], {'Util': ['CL_Util', 'com.shared:core']})
+    cases = {('cl_util', None): 'Util', ('UTIL', None): 'Util', ('core', 'com.shared'): 'Util',
+             ('core', 'org.other'): None, ('Cl-Util', None): None, ('RATING', None): 'rating'}
+    for (name, group), library in cases.items():
+        if index.resolve(name, group) != library:
+            print(f"❌ {group}:{name} resolved to {index.resolve(name, group)}, expected {library}")
+            return False
+    if index.near_misses() != {'Cl-Util': 'Util'} or identity_index().resolve('junit') is not None:
+        print(f"❌ near misses: {index.near_misses()}")
+        return False
+    # A new alias must invalidate cached extractions
+    renamed = IdentityIndex(['Util', 'rating'], {'Util': ['CL_Util', 'com.shared:core', 'Cl-Util']})
+    same = IdentityIndex(['Util', 'rating'], {'Util': ['com.shared:core', 'CL_Util']})
+    if renamed.fingerprint() == index.fingerprint() or same.fingerprint() != index.fingerprint():
+        print("❌ identity fingerprint doesn't follow the aliases")
+        return False
+    
+    # A display name in another case still reaches the library's team
+    deliveries = plan_emails([('Cl_Util', '2.1.1', '3.0.0')], {'Cl_Util': 'major'})
+    if not any('core-team@company.com' in delivery.targets and delivery.escalated for delivery in deliveries):
+        print(f"❌ CL_Util team or escalation missing from {deliveries}")
+        return False
+    
+    # The prefilter searches case-insensitively, also across mmap windows
+    padding = "<plugin><artifactId>maven-jar-plugin</artifactId></plugin>" * 40000
+    pom = ("<project><build>" + padding + "</build><dependencies><dependency><artifactId>CLPSS_COMMON</artifactId>"
+           "<version>1.0</version></dependency></dependencies></project>")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'pom.xml'
+        path.write_text(pom)
+        found, data = prefilter.prefilter_file(path, SHARED_LIBRARIES)
+        if not found or data is not None or stream_versions(path, 'maven', SHARED_LIBRARIES) != {'common': '1.0'}:
+            print(f"❌ CLPSS_COMMON in a mapped file: prefilter said {found}")
+            return False
+    
+        # Names first seen in process workers still reach the parent's near misses
+        tasks = []
+        for i in range(4):
+            path = Path(tmp) / f'm{i}.xml'
+            path.write_text("<project><dependencies><dependency><artifactId>Cl.Util</artifactId>"
+                            "<version>1</version></dependency></dependencies></project>")
+            tasks.append(ScanTask(f'r{i}', str(path), 'maven'))
+        scan(tasks, SHARED_LIBRARIES, workers=2, executor='process', shard_size=1)
+        if identity_index().near_misses().get('Cl.Util') != 'Util':
+            print(f"❌ near misses after a process scan: {identity_index().near_misses()}")
+            return False
+    
+    print("✅ Cl_Util / CL_Util / Clpss_RateCLpolicy spellings, org-qualified aliases and near misses resolved")
+    return True
+
+def test_group_qualified_alias():
+    """Test that a bump of a library known only by a group-qualified alias counts everywhere a POM is read"""
+    import subprocess
+    import tempfile
+    from sharedlibs import config
+    from sharedlibs.diff_hunks import dependency_lines, map_changes
+    from sharedlibs.identity import identity_index
+    from sharedlibs.version_history import history_events
+    
+    def pom(version):
+        return ("<project>\n  <dependencies>\n    <dependency>\n      <groupId>com.shared</groupId>\n"
+                "      <artifactId>util-core</artifactId>\n      <version>%s</version>\n    </dependency>\n"
+                "  </dependencies>\n</project>\n" % version)
+    
+    aliases = config.LIBRARY_ALIASES
+    config.LIBRARY_ALIASES = {'Util': ['com.shared:util-core']}
+    identity_index.cache_clear()
+    try:
+        diff = "@@ -6 +6 @@\n-      <version>2.1.1</version>\n+      <version>2.2.0</version>\n"
+        report = map_changes(pom('2.1.1'), pom('2.2.0'), diff, SHARED_LIBRARIES)
+        if not report.relevant or report.touched != ['Util']:
+            print(f"❌ Bump of com.shared:util-core mapped to {report}")
+            return False
+        if dependency_lines(pom('2.2.0'), SHARED_LIBRARIES) != {'Util': (3, 7)}:
+            print(f"❌ Declaration lines {dependency_lines(pom('2.2.0'), SHARED_LIBRARIES)}")
+            return False
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            def git(*args):
+                subprocess.run(['git', '-C', tmp, '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                               check=True, capture_output=True)
+            git('init', '-q')
+            for version in ('2.1.1', '2.2.0'):
+                (Path(tmp) / 'pom.xml').write_text(pom(version))
+                git('add', 'pom.xml')
+                git('commit', '-q', '-m', version)
+            events = [(e.library, e.version) for e in history_events(Path(tmp), SHARED_LIBRARIES)]
+        if events != [('Util', '2.1.1'), ('Util', '2.2.0')]:
+            print(f"❌ History events {events}")
+            return False
+    finally:
+        config.LIBRARY_ALIASES = aliases
+        identity_index.cache_clear()
+    
+    print("✅ com.shared:util-core bump is relevant to the fast path, annotations and history")
+    return True
+
+def test_parser_backends():
+    """Test that every parser backend extracts the same versions and errors"""
+    from bench_parsers import SAMPLES, ROOT, extract_all, synthetic_corpus
+    from sharedlibs.backends import available_backends, select_backend
+    
+    dep = '<dependency><groupId>com.example</groupId><artifactId>{}</artifactId><version>{}</version></dependency>'
+    ns = ' xmlns="http://maven.apache.org/POM/4.0.0"'
+    edge_cases = {
+        'bare': f"<project><dependencies>{dep.format('Util', '1.0')}</dependencies></project>",
+        'other-namespace': f'<project xmlns="urn:x"><dependencies>{dep.format("Util", "1.0")}</dependencies></project>',
+        'deps-last': f"<project{ns}><build><plugins><plugin><dependencies>{dep.format('csm', '0.1')}</dependencies>"
+                     f"</plugin></plugins></build><dependencies>{dep.format('csm', '2.0')}</dependencies></project>",
+        'comments-cdata': "<project><dependencies><dependency><!-- c --><artifactId><![CDATA[common]]></artifactId>"
+                          "<version> 3.1 <!-- x --></version></dependency></dependencies></project>",
+        'entities': '<!DOCTYPE project [<!ENTITY v "4.2">]><project><dependencies>'
+                    + dep.format('&#85;til', '&v;') + "</dependencies></project>",
+        'not-under-dependencies': f"<project><dependency><artifactId>Util</artifactId><version>1</version>"
+                                  f"</dependency><dependencies>{dep.format('rating', '5')}</dependencies></project>",
+        'duplicate-children': "<project><dependencies><dependency><artifactId>Util</artifactId><version>1</version>"
+                              "<version>2</version></dependency></dependencies></project>",
+        'exclusions': "<project><dependencies><dependency><artifactId>occupancy</artifactId><version>7</version>"
+                      "<exclusions><exclusion><artifactId>Util</artifactId></exclusion></exclusions>"
+                      "</dependency></dependencies></project>",
+    }
+    documents = [(name, 'maven', text.encode('utf-8')) for name, text in edge_cases.items()]
+    documents.append(('latin-1', 'maven', ('<?xml version="1.0" encoding="ISO-8859-1"?>'
+                                           + edge_cases['bare'].replace('1.0', '1.0-\xe9')).encode('latin-1')))
+    documents.append(('utf-16', 'maven', ('<?xml version="1.0" encoding="UTF-16"?>' + edge_cases['bare']).encode('utf-16')))
+    documents.append(('ivy-namespaced', 'ivy', b'<ivy-module xmlns="urn:ivy"><dependencies>'
+                                               b'<dependency name="Util" rev="1"/></dependencies></ivy-module>'))
+    documents += synthetic_corpus(40, 32, seed=7)
+    documents += [(name, kind, (ROOT / name).read_bytes()) for name, kind in SAMPLES]
+    malformed = [('maven', b"<project><dependencies>" + dep.format('Util', '1').encode() + b"</dependencies><oops></project>"),
+                 ('ivy', b'<ivy-module><dependencies><dependency name="Util" rev="1"></ivy-module>')]
+    
+    backends = available_backends()
+    reference = extract_all(backends[0], documents)
+    for backend in backends[1:]:
+        results = extract_all(backend, documents)
+        for (name, _, _), expected, got in zip(documents, reference, results):
+            if expected != got:
+                print(f"❌ {backend.name} on {name}: {got}, {backends[0].name}: {expected}")
+                return False
+    for backend in backends:
+        for kind, content in malformed:
+            extract = backend.pom_versions if kind == 'maven' else backend.ivy_versions
+            try:
+                extract(content, SHARED_LIBRARIES + ['unseen'])
+            except ET.ParseError as e:
+                if getattr(e, 'position', None) is None:
+                    print(f"❌ {backend.name}: ParseError without a position for malformed {kind}")
+                    return False
+            else:
+                print(f"❌ {backend.name}: no ParseError for malformed {kind}")
+                return False
+    
+    names = ', '.join(backend.name for backend in backends)
+    print(f"✅ {names} agree on {len(documents)} files and raise ET.ParseError (default: {select_backend().name})")
+    return True
+
+def test_dependency_management():
+    """Test that a project's own dependency wins over an earlier <dependencyManagement> entry"""
+    from sharedlibs.backends import available_backends
+    from sharedlibs.check_version_changes import get_pom_versions
+    from sharedlibs.maven_model import needs_resolution
+    
+    dep = '<dependency><artifactId>{}</artifactId><version>{}</version></dependency>'
+    pom = ('<project xmlns="http://maven.apache.org/POM/4.0.0"><dependencyManagement><dependencies>'
+           + dep.format('common', '3.0.0') + dep.format('Util', '2.0') + '</dependencies></dependencyManagement>'
+           + '<dependencies>' + dep.format('common', '3.1.0') + '</dependencies></project>').encode()
+    expected = {'common': '3.1.0', 'Util': '2.0'}
+    
+    for backend in available_backends():
+        got = backend.pom_versions(pom, SHARED_LIBRARIES)
+        # Only the declared library is tracked: the early exit must not stop at the managed entry
+        early = backend.pom_versions(pom, ['common'])
+        if got != expected or early != {'common': '3.1.0'}:
+            print(f"❌ {backend.name}: {got}, tracking only common: {early}")
+            return False
+    if needs_resolution(pom) or get_pom_versions(pom) != expected:
+        print(f"❌ check-changes read {get_pom_versions(pom)}")
+        return False
+    
+    print("✅ declared common 3.1.0 wins over managed 3.0.0; managed-only Util 2.0 still reported")
+    return True
+
+def test_repo_index():
+    """Test that dynamic versions resolve through an incrementally refreshed local repository index"""
+    import os
+    import tempfile
+    from sharedlibs.compare_shared_lib_versions import find_mismatches
+    from sharedlibs.repo_index import RepoIndex, resolve_rows
+    
+    def metadata(versions=(), release=None, snapshot=None):
+        listed = ''.join(f'<version>{v}</version>' for v in versions)
+        extra = f'<release>{release}</release>' if release else ''
+        if snapshot:
+            extra += f'<snapshot><timestamp>{snapshot[0]}</timestamp><buildNumber>{snapshot[1]}</buildNumber></snapshot>'
+        return f'<metadata><versioning>{extra}<versions>{listed}</versions></versioning></metadata>'
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        m2, ivy = Path(tmp) / 'm2', Path(tmp) / 'ivy'
+        util = m2 / 'com' / 'example' / 'Util'
+        files = {
+            util / 'maven-metadata-central.xml': metadata(['2.0.0', '3.0.0'], release='3.0.0'),
+            util / '2.1.1' / 'Util-2.1.1.pom': '<project/>',
+            m2 / 'com' / 'example' / 'common' / '4.1.0' / 'common-4.1.0.pom': '<project/>',
+            m2 / 'com' / 'example' / 'common' / '4.2.0-SNAPSHOT' / 'maven-metadata-remote.xml':
+                metadata(snapshot=('20240131.101500', '3')),
+            ivy / 'com.shared' / 'Clpss_RateCLpolicy' / 'ivy-6.0.0.xml': '<ivy-module/>',
+            ivy / 'com.shared' / 'Clpss_RateCLpolicy' / 'ivy-6.1.0.xml': '<ivy-module/>',
+        }
+        for path, text in files.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+        roots = {str(m2): 'maven', str(ivy): 'ivy'}
+        index_path = Path(tmp) / 'repo-index.json'
+        index = RepoIndex(roots)
+        first = index.refresh()
+        index.save(index_path)
+        
+        rows = {'cl-jobserver': {'Util': '[2.0,3.0)', 'common': '4.2.0-SNAPSHOT', 'rating': 'latest.integration'},
+                'cl-ccl1': {'Util': '2.1.1', 'common': '4.2.0-20240131.101500-3', 'rating': '6.1.0'}}
+        resolved = resolve_rows(rows, index)
+        if len(resolved) != 3 or find_mismatches(rows, SHARED_LIBRARIES):
+            print(f"❌ resolved {resolved}, rows now {rows}")
+            return False
+        
+        # Reloaded, only the artifact whose directory changed is read again
+        (util / '2.2.0').mkdir()
+        (util / '2.2.0' / 'Util-2.2.0.pom').write_text('<project/>')
+        os.utime(util, ns=(util.stat().st_atime_ns, util.stat().st_mtime_ns + 10**9))
+        reloaded = RepoIndex.load(index_path, roots)
+        second = reloaded.refresh()
+        if first != (3, 0) or second != (1, 2) or reloaded.resolve('Util', '[2.0,3.0)') != '2.2.0':
+            print(f"❌ refreshes read/reused {first} then {second}; [2.0,3.0) -> {reloaded.resolve('Util', '[2.0,3.0)')}")
+            return False
+        if reloaded.resolve('Util', 'RELEASE') != '3.0.0' or resolve_rows({'r': {'Util': '2.1.1'}}, None):
+            print("❌ RELEASE or a concrete version resolved wrongly")
+            return False
+    
+    print("✅ range, latest.integration and SNAPSHOT resolved; refresh re-read 1 of 3 artifacts")
+    return True
+
+def test_report_writer():
+    """Test that compare streams NDJSON records and a valid SARIF log, with text still the default"""
+    import contextlib
+    import io
+    import json
+    import tempfile
+    from sharedlibs.compare_shared_lib_versions import main as compare_main
+    from sharedlibs.org_scan import PENDING_PER_WORKER, ScanTask, scan
+    from sharedlibs.report_writer import structured_output
+    
+    def pom(version):
+        return (f'<project>\n<dependencies>\n<dependency>\n<groupId>com.example</groupId>\n'
+                f'<artifactId>Util</artifactId>\n<version>{version}</version>\n</dependency>\n'
+                f'</dependencies>\n</project>\n')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for repo, version in (('cl-a', '2.1.1'), ('cl-b', '2.1.1'), ('cl-c', '2.2.0')):
+            (Path(tmp) / repo).mkdir()
+            (Path(tmp) / repo / 'pom.xml').write_text(pom(version))
+        manifest = Path(tmp) / 'manifest.json'
+        manifest.write_text(json.dumps({'repos': [{'name': r, 'root': r, 'files': ['pom.xml']}
+                                                  for r in ('cl-a', 'cl-b', 'cl-c')]}))
+        base = ['--manifest', str(manifest), '--workers', '1', '--no-resolve']
+        
+        ndjson, sarif = Path(tmp) / 'report.ndjson', Path(tmp) / 'report.sarif'
+        text = io.StringIO()
+        with contextlib.redirect_stdout(text), contextlib.redirect_stderr(io.StringIO()):
+            statuses = [compare_main(base + ['--format', 'ndjson', '--output', str(ndjson)]),
+                        compare_main(base + ['--format', 'sarif', '--output', str(sarif)]),
+                        compare_main(base)]
+        records = [json.loads(line) for line in ndjson.read_text().splitlines()]
+        types = [r['type'] for r in records]
+        if statuses != [1, 1, 1] or types != ['row'] * 3 + ['mismatch'] * 3 + ['summary']:
+            print(f"❌ statuses {statuses}, NDJSON record types {types}")
+            return False
+        if records[-1] != {'type': 'summary', 'mismatches': 1, 'rows': 3}:
+            print(f"❌ summary record {records[-1]}")
+            return False
+        
+        results = json.loads(sarif.read_text())['runs'][0]['results']
+        regions = {r['locations'][0]['physicalLocation']['region']['startLine'] for r in results}
+        if len(results) != 3 or regions != {3}:
+            print(f"❌ SARIF results {results}")
+            return False
+        if not text.getvalue().startswith("LIB_VERSION_MISMATCH\nMismatch for Util:"):
+            print(f"❌ default output was {text.getvalue()!r}")
+            return False
+        
+        # A command failing midway still leaves a valid SARIF log with what was written
+        partial = Path(tmp) / 'partial.sarif'
+        try:
+            with structured_output('sarif', str(partial)) as report:
+                report.mismatch('Util', {'cl-a': '2.1.1', 'cl-c': '2.2.0'})
+                raise RuntimeError('scan failed')
+        except RuntimeError:
+            pass
+        if len(json.loads(partial.read_text())['runs'][0]['results']) != 2:
+            print(f"❌ SARIF log after an exception: {partial.read_text()!r}")
+            return False
+    
+    # Shards reach on_result in input order while the task source is still being read
+    produced, seen = [], []
+    def tasks():
+        for i in range(200):
+            produced.append(i)
+            yield ScanTask(f'r{i:03}', f'/nonexistent/{i}/pom.xml', 'maven')
+    def on_result(result):
+        seen.append((len(produced), list(result)))
+    returned = scan(tasks(), SHARED_LIBRARIES, workers=2, executor='thread', shard_size=1, on_result=on_result)
+    if returned is not None or [row for _, rows in seen for row in rows] != [f'r{i:03}' for i in range(200)] \
+            or seen[0][0] > 2 * PENDING_PER_WORKER + 1:
+        print(f"❌ scan returned {type(returned)}, first result after {seen[0][0]} tasks")
+        return False
+    
+    print(f"✅ {len(records)} NDJSON records, {len(results)} SARIF results with regions, text report by default; "
+          f"first shard merged after {seen[0][0]} of 200 tasks")
+    return True
+
+def test_watch_mode():
+    """Test that watch mode re-parses only saved files and reports the affected columns"""
+    import os
+    import tempfile
+    from sharedlibs.watch import PollingWatcher, WatchState, discover_tasks, next_batch, open_watcher
+    
+    def pom(util, common):
+        return (f'<project><dependencies>'
+                f'<dependency><artifactId>Util</artifactId><version>{util}</version></dependency>'
+                f'<dependency><artifactId>common</artifactId><version>{common}</version></dependency>'
+                f'</dependencies></project>')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = []
+        for repo in ('cl-a', 'cl-b', 'cl-c'):
+            (Path(tmp) / repo).mkdir()
+            (Path(tmp) / repo / 'pom.xml').write_text(pom('2.1.1', '4.1.0'))
+            roots.append(str(Path(tmp) / repo))
+        state = WatchState(discover_tasks(roots))
+        state.load()
+        target = str(Path(tmp) / 'cl-b' / 'pom.xml')
+        
+        watchers = []
+        for make, util in ((open_watcher, '2.2.0'), (lambda paths: PollingWatcher(paths, interval=0.01), '2.3.0')):
+            # An old mtime, so the polling watcher can't miss a save within the same tick
+            os.utime(target, ns=(0, 0))
+            watcher = make([target])
+            Path(target).write_text(pom(util, '4.1.0'))
+            batch = next_batch(watcher, debounce=0.05)
+            watcher.close()
+            watchers.append(watcher.name)
+            delta = state.apply(batch)
+            if batch != {target} or [(c.row, c.library, c.new) for c in delta.changes] != [('cl-b', 'Util', util)] \
+                    or [lib for lib, _ in delta.mismatched] != ['Util']:
+                print(f"❌ {watcher.name} batch {batch}, delta {delta}")
+                return False
+        
+        Path(target).write_text(pom('2.1.1', '4.2.0'))
+        delta = state.apply([target])
+        changes = [(c.library, c.old, c.new) for c in delta.changes]
+        if changes != [('Util', '2.3.0', '2.1.1'), ('common', '4.1.0', '4.2.0')] or delta.aligned != ['Util'] \
+                or [lib for lib, _ in delta.mismatched] != ['common']:
+            print(f"❌ delta {delta}")
+            return False
+    
+    print(f"✅ {' and '.join(watchers)} watchers saw the saves; delta re-checked 2 columns in {delta.ms:.2f} ms")
+    return True
+
+def test_version_history():
+    """Test that git log hunks yield events for a Maven property bump and for Ivy rev bumps in either quote style"""
+    import os
+    import subprocess
+    import tempfile
+    from sharedlibs.version_history import history_events, merged_events, misaligned_periods, build_timelines
+    
+    def pom(version):
+        return ("<project>\n  <properties>\n    <util.version>%s</util.version>\n  </properties>\n"
+                "  <dependencies>\n    <dependency>\n      <artifactId>Util</artifactId>\n"
+                "      <version>${util.version}</version>\n    </dependency>\n  </dependencies>\n"
+                "</project>\n" % version)
+    
+    def ivy(util, common):
+        # A multi-line tag with single quotes, and a single-line one with double quotes
+        return ("<ivy-module>\n  <dependencies>\n    <dependency org='com.cl'\n"
+                "                name='Util'\n                rev='%s'/>\n"
+                '    <dependency org="com.cl" name="common" rev="%s"/>\n'
+                "  </dependencies>\n</ivy-module>\n" % (util, common))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        repos = {'maven': Path(tmp) / 'maven', 'ivy': Path(tmp) / 'ivy'}
+        
+        def commit(repo, name, content, when):
+            env = dict(os.environ, GIT_AUTHOR_DATE=f"{when} +0000", GIT_COMMITTER_DATE=f"{when} +0000")
+            (repo / name).write_text(content)
+            for args in (['add', name], ['commit', '-q', '-m', when]):
+                subprocess.run(['git', '-C', str(repo), '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                               check=True, capture_output=True, env=env)
+        
+        for repo in repos.values():
+            repo.mkdir()
+            subprocess.run(['git', 'init', '-q', str(repo)], check=True, capture_output=True)
+        commit(repos['maven'], 'pom.xml', pom('2.1.0'), '2024-01-01T00:00:00')
+        commit(repos['ivy'], 'ivy.xml', ivy('2.1.0', '4.0.0'), '2024-01-02T00:00:00')
+        commit(repos['maven'], 'pom.xml', pom('2.2.0'), '2024-01-03T00:00:00')
+        commit(repos['ivy'], 'ivy.xml', ivy('2.2.0', '4.0.0'), '2024-01-05T00:00:00')
+        commit(repos['ivy'], 'ivy.xml', ivy('2.2.0', '4.1.0'), '2024-01-06T00:00:00')
+        
+        got = [(e.library, e.version) for e in history_events(repos['ivy'], SHARED_LIBRARIES)]
+        if got != [('Util', '2.1.0'), ('common', '4.0.0'), ('Util', '2.2.0'), ('common', '4.1.0')]:
+            print(f"❌ Ivy events {got}")
+            return False
+        got = [(e.library, e.version) for e in history_events(repos['maven'], SHARED_LIBRARIES)]
+        if got != [('Util', '2.1.0'), ('Util', '2.2.0')]:
+            print(f"❌ Maven events {got}")
+            return False
+        
+        events = list(merged_events(repos.values(), SHARED_LIBRARIES))
+        if [e.timestamp for e in events] != sorted(e.timestamp for e in events):
+            print("❌ Events of the two repos not merged by commit time")
+            return False
+        periods = misaligned_periods(build_timelines(events)['Util'])
+        if len(periods) != 1 or periods[0][1] - periods[0][0] != 2 * 86400:
+            print(f"❌ Util misaligned periods {periods}")
+            return False
+    
+    print(f"✅ {len(events)} version changes from a property bump and multi-line Ivy tags; one 2-day misalignment")
+    return True
+
+def test_event_server():
+    """Test that the event server answers /events for a sample payload and rejects malformed or oversized requests with a 400"""
+    import asyncio
+    import json
+    import subprocess
+    import tempfile
+    from sharedlibs.event_server import EventServer, WarmState, load_test_events
+    
+    def pom(util):
+        return (f'<project><dependencies>'
+                f'<dependency><artifactId>Util</artifactId><version>{util}</version></dependency>'
+                f'</dependencies></project>')
+    
+    async def exchange(socket_path, request):
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            # The server dropped the connection without answering
+            return None, {}
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':')[1])
+        result = json.loads(await reader.readexactly(length))
+        writer.close()
+        return status, result
+    
+    def post(body, length=None):
+        length = len(body) if length is None else length
+        return (f"POST /events HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n"
+                f"Connection: close\r\n\r\n").encode() + body
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp) / 'repo'
+        repo.mkdir()
+        def git(*args):
+            return subprocess.run(['git', '-C', str(repo), '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                                  check=True, capture_output=True, text=True).stdout.strip()
+        git('init', '-q', '-b', 'main')
+        (repo / 'pom.xml').write_text(pom('2.1.1'))
+        git('add', 'pom.xml')
+        git('commit', '-q', '-m', 'base')
+        (repo / 'pom.xml').write_text(pom('2.2.0'))
+        git('commit', '-q', '-am', 'bump')
+        head = git('rev-parse', 'HEAD')
+        git('update-ref', 'refs/heads/main', 'HEAD~1')
+        
+        sample = load_test_events('main')[0]
+        sample['pull_request']['head'] = {'sha': head}
+        requests = [
+            post(json.dumps(sample).encode()),
+            post(b'{"pull_request": {"base": "main"}}'),
+            post(b'[1, 2]'),
+            post(b'{}', length='two'),
+            b"POST /events HTTP/1.1\r\nX-Padding: " + b'a' * 70000 + b"\r\n\r\n",
+            b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n",
+        ]
+        
+        async def run():
+            server_side = EventServer(WarmState(repo), workers=2)
+            socket_path = str(Path(tmp) / 'events.sock')
+            server = await server_side.start(socket_path=socket_path)
+            try:
+                return [await exchange(socket_path, request) for request in requests]
+            finally:
+                server.close()
+                await server.wait_closed()
+                server_side.close()
+        
+        answers = asyncio.run(run())
+    
+    (status, result), *rejected, (stats_status, stats) = answers
+    if status != 200 or result.get('status') != 'LIB_VERSION_CHANGED' \
+            or result.get('changes') != [['Util', '2.1.1', '2.2.0']]:
+        print(f"❌ Sample payload answered {status} {result}")
+        return False
+    if [s for s, _ in rejected] != [400, 400, 400, 400]:
+        print(f"❌ Malformed requests answered {rejected}")
+        return False
+    if stats_status != 200 or stats.get('events') != 1:
+        print(f"❌ /stats after the bad requests answered {stats_status} {stats}")
+        return False
+    
+    print(f"✅ Sample PR #{result['pr']} reported {result['changes']}; 4 malformed requests got a 400")
+    return True
+
 def main():
     """Run all tests"""
     print("🔧 Testing Shared Library Version Alert System")
@@ -139,7 +1397,28 @@ def main():
     tests = [
         ("Parsing pom.xml", test_pom_parsing),
         ("Workflow files", test_workflow_files),
-        ("Git setup", test_git_setup)
+        ("Git setup", test_git_setup),
+        ("Git blob reader", test_git_blob_reader),
+        ("Incremental version matrix", test_incremental_matrix),
+        ("Incremental scan from a snapshot", test_incremental_scan),
+        ("Parse cache", test_parse_cache),
+        ("Build file discovery", test_discovery),
+        ("Notification dispatch", test_notification_dispatch),
+        ("Jira ticket lookup", test_jira_lookup),
+        ("Diff-hunk fast path", test_diff_fast_path),
+        ("Fast path with a parent POM", test_fast_path_parent),
+        ("Byte prefilter", test_prefilter),
+        ("Impact index", test_impact_index),
+        ("Format-preserving rewriter", test_rewriter),
+        ("Canonical identity index", test_identity_index),
+        ("Group-qualified aliases", test_group_qualified_alias),
+        ("Parser backend parity", test_parser_backends),
+        ("Managed dependency versions", test_dependency_management),
+        ("Local repository index", test_repo_index),
+        ("Streaming report writers", test_report_writer),
+        ("Watch mode", test_watch_mode),
+        ("Version history", test_version_history),
+        ("Event server", test_event_server)
     ]
     
     passed = 0
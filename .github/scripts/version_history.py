@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Entry point kept for existing workflows and docs: `sharedlibs history`.
+The code lives in sharedlibs/version_history.py; importing this module gives that one.
+"""
+
+import sys
+
+if __name__ == "__main__":
+    from sharedlibs.cli import main
+    sys.exit(main(['history', *sys.argv[1:]]))
+
+from sharedlibs import version_history
+
+sys.modules[__name__] = version_history